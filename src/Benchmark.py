@@ -0,0 +1,377 @@
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Widgets are measured without opening windows
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtCore import QEventLoop, QTimer
+from PyQt5.QtWidgets import QApplication
+
+from Database.CarGoOwner import DatabaseManager
+from Database.ConnectionManager import ConnectionManager
+from Database.QueryExecutor import QueryExecutor
+from Laporan.HistoriPeminjaman import HistoriPeminjamanUI
+from Laporan.Pendapatan import PendapatanUI
+from Laporan.StatusKetersediaan import StatusKetersediaanUI
+from Mobil.Mobil import Mobil
+from Mobil.MobilController import MobilController
+from Pelanggan.Pelanggan import Pelanggan
+from Peminjaman.Peminjaman import Peminjaman
+from Peminjaman.peminjamanController import PeminjamanController
+
+BENCHMARK_DIR = Path(__file__).parent.parent / "benchmarks"
+
+# Rentals per dataset; cars and customers scale with them (1 car and 4 customers per 20 rentals)
+DATASETS = {'1k': 1000, '100k': 100000, '1m': 1000000}
+
+# Fixed generator input, so every machine and run measures the same data
+SEED = 2024
+END_DATE = date(2025, 6, 30)
+DAYS = 3 * 365
+
+# Cars carrying a photo, whatever the dataset size; enough to fill every benchmarked page
+MAX_IMAGES = 600
+
+# Longest wait for a background page load before the case is reported as failed
+TIMEOUT_MS = 60000
+
+
+@dataclass
+class Result:
+    """Timings of one case on one dataset, as stored in the history file."""
+    dataset: str
+    case: str
+    cold_ms: float
+    median_ms: float
+    p95_ms: float
+    min_ms: float
+    peak_kib: float
+    repeat: int
+
+
+def dataset_path(name: str, data_dir: Path, rebuild: bool = False) -> Path:
+    """
+    Return the database of a dataset, generating it on first use.
+
+    Args:
+        name: Key of DATASETS
+        data_dir: Directory holding the generated databases
+        rebuild: Generate the database again even if it exists
+
+    Returns:
+        Path to the database file
+    """
+    rentals = DATASETS[name]
+    path = data_dir / f"bench-{name}-seed{SEED}.db"
+    if path.exists() and not rebuild:
+        return path
+
+    data_dir.mkdir(parents=True, exist_ok=True)
+    cars = max(rentals // 20, 60)
+    partial = path.with_name(path.name + '.part')
+    created = DatabaseManager(partial).createDatabase(
+        cars=cars, customers=max(rentals // 5, 60), rentals=rentals, days=DAYS,
+        seed=SEED, end_date=END_DATE, images=min(1.0, MAX_IMAGES / cars)
+    )
+    ConnectionManager.close_all()
+    if not created:
+        raise Exception(f"Error generating benchmark dataset {name}")
+    os.replace(partial, path)
+    return path
+
+
+def wait_for(loader: QueryExecutor):
+    """Run the event loop until the executor's outstanding request has been delivered."""
+    if not loader.loading:
+        return
+    loop = QEventLoop()
+    timer = QTimer()
+    timer.setSingleShot(True)
+    timer.timeout.connect(loop.quit)
+    loader.loadingChanged.connect(loop.quit)
+    timer.start(TIMEOUT_MS)
+    try:
+        loop.exec_()
+    finally:
+        loader.loadingChanged.disconnect(loop.quit)
+        timer.stop()
+    if loader.loading:
+        raise Exception("Error running benchmark: page load timed out")
+
+
+def _pages(total: int, items_per_page: int) -> Dict[str, int]:
+    """First, middle and last page numbers for a row count."""
+    last = max((total + items_per_page - 1) // items_per_page, 1)
+    return {'first': 1, 'middle': (last + 1) // 2, 'last': last}
+
+
+def build_cases(app: QApplication) -> Tuple[List[Tuple[str, Callable[[], Any]]], List[Any]]:
+    """
+    Create the models and views under test against the current database and list the cases.
+
+    Data cases call the model methods directly. Widget cases go through the views the way a
+    page flip does, including the background read and the render on the GUI thread.
+
+    Args:
+        app: Running QApplication
+
+    Returns:
+        Tuple of (name, callable) cases and the widgets to close afterwards
+    """
+    cases = []
+
+    mobil = Mobil()
+    total = mobil.get_mobil_filtered(1, 6)[1]
+    for label, page in _pages(total, 6).items():
+        cases.append((f"Mobil.get_mobil_filtered[{label}]", lambda page=page: mobil.get_mobil_filtered(page, 6)))
+    colors, years = mobil.get_unique_colors(), mobil.get_unique_years()
+    if colors and years:
+        cases.append(("Mobil.get_mobil_filtered[color+year]",
+                      lambda: mobil.get_mobil_filtered(1, 6, years[0], colors[0])))
+
+    pelanggan = Pelanggan()
+    total = pelanggan.getPelanggan(1, 10)[1]
+    for label, page in _pages(total, 10).items():
+        cases.append((f"Pelanggan.getPelanggan[{label}]", lambda page=page: pelanggan.getPelanggan(page, 10)))
+
+    peminjaman = Peminjaman()
+    for task in ("Jadwal Pengembalian", "Pembayaran Rental"):
+        total = peminjaman.FilterNotifikasi(task, 1, 10)[1]
+        for label, page in _pages(total, 10).items():
+            if label != 'middle':
+                cases.append((f"Peminjaman.FilterNotifikasi[{task}, {label}]",
+                               lambda task=task, page=page: peminjaman.FilterNotifikasi(task, page, 10)))
+
+    controller = PeminjamanController()
+    total = controller.fetch_total_peminjaman_count()
+    for label, page in _pages(total, 10).items():
+        cases.append((f"PeminjamanController.fetch_peminjaman[{label}]",
+                       lambda page=page: controller.fetch_peminjaman(page, 10)))
+
+    widgets = []
+    for view_class in (HistoriPeminjamanUI, StatusKetersediaanUI, PendapatanUI):
+        view = view_class()
+        view.show()
+        wait_for(view.loader)
+        widgets.append(view)
+
+        def flip(view=view, page=1):
+            view.current_page = page
+            view.load_data()
+            wait_for(view.loader)
+            app.processEvents()
+
+        total = view.report_paginator().count()
+        for label, page in _pages(total, view.items_per_page).items():
+            if label != 'middle':
+                cases.append((f"{view_class.__name__}.load_data[{label}]", lambda flip=flip, page=page: flip(page=page)))
+
+    grid = MobilController()
+    grid.show()
+    wait_for(grid.loader)
+    widgets.append(grid)
+    cars, total, thumbnails = grid.fetch_mobil(1, None, None)
+
+    # Each call rebinds the first card to the next car of the page
+    card_cars = itertools.cycle(cars)
+
+    def bind_card():
+        car = next(card_cars)
+        grid.cards[0].bind(car, thumbnails.get(car['NomorPlat']))
+
+    if cars:
+        cases.append(("MobilCard.bind", bind_card))
+
+    def show_page(page):
+        grid.current_page = page
+        grid.showMobil(page)
+        wait_for(grid.loader)
+        app.processEvents()
+
+    for label, page in _pages(total, grid.items_per_page).items():
+        if label != 'middle':
+            cases.append((f"MobilController.showMobil[{label}]", lambda page=page: show_page(page)))
+
+    return cases, widgets
+
+
+def measure(dataset: str, name: str, case: Callable[[], Any], repeat: int) -> Result:
+    """
+    Time a case: one cold call, then repeat warm calls, then one call traced for memory.
+
+    Args:
+        dataset: Dataset name
+        name: Case name
+        case: Callable to measure
+        repeat: Number of warm calls
+
+    Returns:
+        The case's Result
+    """
+    def timed():
+        started = time.perf_counter()
+        case()
+        return (time.perf_counter() - started) * 1000
+
+    # The models print while they work; keep that out of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        cold = timed()
+        samples = sorted(timed() for _ in range(repeat))
+
+        tracemalloc.start()
+        try:
+            case()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    return Result(
+        dataset=dataset,
+        case=name,
+        cold_ms=round(cold, 3),
+        median_ms=round(statistics.median(samples), 3),
+        p95_ms=round(samples[min(int(len(samples) * 0.95), len(samples) - 1)], 3),
+        min_ms=round(samples[0], 3),
+        peak_kib=round(peak / 1024, 1),
+        repeat=repeat
+    )
+
+
+def load_history(path: Path) -> List[Dict[str, Any]]:
+    """Read the recorded runs, skipping lines that are not valid JSON."""
+    if not path.exists():
+        return []
+    records = []
+    with open(path, encoding='utf-8') as file:
+        for line in file:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    return records
+
+
+def baseline(history: List[Dict[str, Any]], result: Result, runs: int) -> Optional[float]:
+    """
+    Median warm latency of the last runs of the same case, dataset and machine.
+
+    Returns:
+        Baseline in milliseconds, or None when the case has no history yet
+    """
+    host = platform.node()
+    previous = [record['median_ms'] for record in history
+                if record.get('host') == host and record.get('dataset') == result.dataset
+                and record.get('case') == result.case]
+    if not previous:
+        return None
+    return statistics.median(previous[-runs:])
+
+
+def _commit() -> Optional[str]:
+    """Current git commit of the tree being measured, if it is a git checkout."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=Path(__file__).parent,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    """Command line entry point, run from the repository root: python src/Benchmark.py --help"""
+    parser = argparse.ArgumentParser(
+        description="Measure page loads and rendering against generated databases, record the results "
+                    "and report regressions against earlier runs on this machine."
+    )
+    parser.add_argument('--datasets', nargs='+', choices=list(DATASETS), default=['1k', '100k'],
+                        help="datasets to run (default: 1k 100k); 1m takes a while to generate the first time")
+    parser.add_argument('-k', '--filter', default=None, help="only run cases whose name contains this text")
+    parser.add_argument('--repeat', type=int, default=20, help="warm calls per case (default: 20)")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="slowdown over the baseline reported as a regression (default: 0.25, i.e. 25%%)")
+    parser.add_argument('--baseline-runs', type=int, default=5,
+                        help="earlier runs the baseline is taken from (default: 5)")
+    parser.add_argument('--data-dir', type=Path, default=BENCHMARK_DIR / "data",
+                        help="directory of the generated databases")
+    parser.add_argument('--history', type=Path, default=BENCHMARK_DIR / "history.jsonl",
+                        help="JSON Lines file the results are appended to")
+    parser.add_argument('--rebuild', action='store_true', help="generate the datasets again")
+    parser.add_argument('--no-record', action='store_true', help="compare only, do not append to the history")
+    args = parser.parse_args(argv)
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    history = load_history(args.history)
+    run = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': _commit(),
+        'host': platform.node(),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+    }
+
+    results = []
+    regressions = []
+    for dataset in args.datasets:
+        path = dataset_path(dataset, args.data_dir, args.rebuild)
+        print(f"\n{dataset} ({path.name})")
+        print(f"{'case':<58} {'cold':>9} {'median':>9} {'p95':>9} {'peak KiB':>9}  vs baseline")
+
+        with ConnectionManager.substitute(path):
+            with contextlib.redirect_stdout(io.StringIO()):
+                cases, widgets = build_cases(app)
+            for name, case in cases:
+                if args.filter and args.filter not in name:
+                    continue
+                result = measure(dataset, name, case, args.repeat)
+                results.append(result)
+
+                reference = baseline(history, result, args.baseline_runs)
+                change = ""
+                if reference:
+                    ratio = result.median_ms / reference - 1
+                    change = f"{ratio:+.0%}"
+                    # Ignore jitter of a millisecond or less on fast cases
+                    if ratio > args.threshold and result.median_ms - reference > 1:
+                        change += "  REGRESSION"
+                        regressions.append(result)
+                print(f"{name:<58} {result.cold_ms:9.2f} {result.median_ms:9.2f} {result.p95_ms:9.2f} "
+                      f"{result.peak_kib:9.1f}  {change}")
+
+            for widget in widgets:
+                widget.close()
+                widget.deleteLater()
+            app.processEvents()
+
+    if not args.no_record and results:
+        args.history.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.history, 'a', encoding='utf-8') as file:
+            for result in results:
+                file.write(json.dumps({**run, **asdict(result)}) + "\n")
+        print(f"\nResults appended to {args.history}")
+
+    if regressions:
+        print(f"\n{len(regressions)} case(s) slower than {args.threshold:.0%} over the baseline:")
+        for result in regressions:
+            print(f"  {result.dataset} {result.case}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
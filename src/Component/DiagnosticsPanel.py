@@ -0,0 +1,161 @@
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtGui import QFont
+from PyQt5.QtWidgets import (QCheckBox, QDialog, QDoubleSpinBox, QFileDialog, QHBoxLayout, QHeaderView, QLabel,
+                             QMessageBox, QPlainTextEdit, QPushButton, QSplitter, QTableWidget, QTableWidgetItem,
+                             QVBoxLayout)
+
+from Database.QueryProfiler import QueryProfiler
+
+
+class DiagnosticsPanel(QDialog):
+    """
+    Hidden query diagnostics of MenuUI (Ctrl+Shift+D).
+
+    Shows the QueryProfiler's statement totals per screen, slowest in total first, and the slow
+    log; selecting a slow execution shows its query plan. The report can be saved to a file.
+    """
+
+    # Statements listed in the table
+    LIMIT = 200
+    # How often the open panel picks up new measurements
+    REFRESH_MS = 1000
+
+    STATEMENT_HEADERS = ["Screen", "Calls", "Total ms", "Avg ms", "Max ms", "Rows", "Statement"]
+    SLOW_HEADERS = ["Time", "Screen", "ms", "Rows", "Statement"]
+
+    def __init__(self, parent=None):
+        """Initialize the panel."""
+        super().__init__(parent)
+        self.profiler = QueryProfiler.instance()
+        self.setWindowTitle("Query Diagnostics")
+        self.resize(1100, 700)
+
+        layout = QVBoxLayout(self)
+
+        # Controls
+        controls = QHBoxLayout()
+        self.enabled = QCheckBox("Record queries")
+        self.enabled.setChecked(self.profiler.enabled)
+        self.enabled.toggled.connect(self.set_enabled)
+        controls.addWidget(self.enabled)
+
+        controls.addWidget(QLabel("Slow threshold (ms)"))
+        self.threshold = QDoubleSpinBox()
+        self.threshold.setRange(0, 60000)
+        self.threshold.setDecimals(0)
+        self.threshold.setValue(self.profiler.slow_ms)
+        self.threshold.valueChanged.connect(self.set_threshold)
+        controls.addWidget(self.threshold)
+
+        self.summary = QLabel()
+        controls.addWidget(self.summary)
+        controls.addStretch()
+
+        for text, slot in (("Refresh", self.refresh), ("Reset", self.reset), ("Save Report...", self.save_report)):
+            button = QPushButton(text)
+            button.clicked.connect(slot)
+            controls.addWidget(button)
+        layout.addLayout(controls)
+
+        # Statement totals above, slow log and plan below
+        splitter = QSplitter(Qt.Vertical)
+        self.statements = self._table(self.STATEMENT_HEADERS)
+        splitter.addWidget(self.statements)
+
+        slow_splitter = QSplitter(Qt.Horizontal)
+        self.slow = self._table(self.SLOW_HEADERS)
+        self.slow.itemSelectionChanged.connect(self.show_plan)
+        slow_splitter.addWidget(self.slow)
+        self.plan = QPlainTextEdit()
+        self.plan.setReadOnly(True)
+        self.plan.setFont(QFont("Monospace", 10))
+        self.plan.setPlaceholderText("Select a slow execution to see its query plan")
+        slow_splitter.addWidget(self.plan)
+        splitter.addWidget(slow_splitter)
+        layout.addWidget(splitter)
+
+        self.slow_queries = []
+        self.timer = QTimer(self)
+        self.timer.setInterval(self.REFRESH_MS)
+        self.timer.timeout.connect(self.refresh)
+
+    @staticmethod
+    def _table(headers) -> QTableWidget:
+        table = QTableWidget(0, len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.setEditTriggers(QTableWidget.NoEditTriggers)
+        table.setSelectionBehavior(QTableWidget.SelectRows)
+        table.setSelectionMode(QTableWidget.SingleSelection)
+        table.verticalHeader().setVisible(False)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        table.horizontalHeader().setStretchLastSection(True)
+        return table
+
+    @staticmethod
+    def _fill(table: QTableWidget, rows):
+        table.setRowCount(len(rows))
+        for row, values in enumerate(rows):
+            for column, value in enumerate(values):
+                if isinstance(value, str):
+                    item = QTableWidgetItem(value)
+                else:
+                    item = QTableWidgetItem(f"{value:,.2f}" if isinstance(value, float) else f"{value:,}")
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                table.setItem(row, column, item)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self.timer.start()
+
+    def hideEvent(self, event):
+        self.timer.stop()
+        super().hideEvent(event)
+
+    def refresh(self):
+        """Show the profiler's current statement totals and slow log."""
+        statements = self.profiler.statements()
+        self._fill(self.statements, [
+            (s.screen, s.calls, s.total_ms, s.avg_ms, s.max_ms, s.rows, s.sql) for s in statements[:self.LIMIT]
+        ])
+
+        selected = self.slow.currentRow()
+        self.slow_queries = self.profiler.slow_queries()
+        self.slow.blockSignals(True)
+        self._fill(self.slow, [(q.timestamp, q.screen, q.ms, q.rows, q.sql) for q in self.slow_queries])
+        self.slow.blockSignals(False)
+        if 0 <= selected < len(self.slow_queries):
+            self.slow.selectRow(selected)
+
+        self.summary.setText(f"{len(statements)} statements, {len(self.slow_queries)} slow")
+
+    def show_plan(self):
+        row = self.slow.currentRow()
+        if not 0 <= row < len(self.slow_queries):
+            self.plan.clear()
+            return
+        query = self.slow_queries[row]
+        self.plan.setPlainText("\n".join([query.sql, ""] + (query.plan or ["(no plan)"])))
+
+    def set_enabled(self, enabled: bool):
+        self.profiler.enabled = enabled
+
+    def set_threshold(self, value: float):
+        self.profiler.slow_ms = value
+
+    def reset(self):
+        self.profiler.reset()
+        self.plan.clear()
+        self.refresh()
+
+    def save_report(self):
+        """Ask for a file and write the profiler's report to it."""
+        path, _ = QFileDialog.getSaveFileName(self, "Save Query Report", "query-report.txt", "Text (*.txt)")
+        if not path:
+            return
+        try:
+            self.profiler.write_report(path)
+        except OSError as e:
+            QMessageBox.warning(self, "Save Query Report", f"Error saving report: {str(e)}")
+            return
+        QMessageBox.information(self, "Save Query Report", f"Report saved to {path}")
@@ -0,0 +1,105 @@
+from typing import Callable, List, Optional, Sequence
+
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex
+from PyQt5.QtWidgets import QComboBox, QCompleter, QListView
+
+
+class RowListModel(QAbstractListModel):
+    """
+    List model over a sequence of tuples, shown through a label function.
+
+    The rows are used as they are, so a list of thousands of entries is shown without building
+    an item per entry; the first value of a row is its key (Qt.UserRole).
+    """
+
+    def __init__(self, label: Callable[[tuple], str], parent=None):
+        """
+        Initialize an empty model.
+
+        Args:
+            label: Returns the text shown for a row
+            parent: Owning object
+        """
+        super().__init__(parent)
+        self.label = label
+        self._rows: Sequence[tuple] = []
+
+    def set_rows(self, rows: Sequence[tuple]):
+        self.beginResetModel()
+        self._rows = rows
+        self.endResetModel()
+
+    def row(self, number: int) -> tuple:
+        return self._rows[number]
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            return self.label(self._rows[index.row()])
+        if role == Qt.UserRole:
+            return self._rows[index.row()][0]
+        return None
+
+
+class SearchableComboBox(QComboBox):
+    """
+    Editable combobox over a RowListModel with type-to-search.
+
+    Typing filters the entries by any part of their label in a completer popup. A row only
+    counts as chosen while the text matches its label, so half-typed text never passes as a value.
+    """
+
+    # Entries shown in the popups before scrolling
+    VISIBLE_ITEMS = 12
+
+    def __init__(self, label: Callable[[tuple], str], placeholder: str = "", parent=None):
+        """
+        Initialize the combobox.
+
+        Args:
+            label: Returns the text shown for a row
+            placeholder: Hint shown while nothing is typed
+            parent: Parent widget
+        """
+        super().__init__(parent)
+        self.rows = RowListModel(label, self)
+        self.setModel(self.rows)
+        self.setEditable(True)
+        self.setInsertPolicy(QComboBox.NoInsert)
+        self.setMaxVisibleItems(self.VISIBLE_ITEMS)
+        # Sizing to the contents would measure every entry
+        self.setSizeAdjustPolicy(QComboBox.AdjustToMinimumContentsLengthWithIcon)
+        self.view().setUniformItemSizes(True)
+        self.lineEdit().setPlaceholderText(placeholder)
+
+        completer = QCompleter(self.rows, self)
+        completer.setCaseSensitivity(Qt.CaseInsensitive)
+        completer.setFilterMode(Qt.MatchContains)
+        completer.setCompletionMode(QCompleter.PopupCompletion)
+        completer.setMaxVisibleItems(self.VISIBLE_ITEMS)
+        popup = QListView()
+        popup.setUniformItemSizes(True)
+        completer.setPopup(popup)
+        self.setCompleter(completer)
+
+    def set_rows(self, rows: List[tuple]):
+        """Replace the entries and clear the choice."""
+        self.rows.set_rows(rows)
+        self.setCurrentIndex(-1)
+        self.clearEditText()
+
+    def current_row(self) -> Optional[tuple]:
+        """Return the chosen row, or None if the text does not name one."""
+        number = self.currentIndex()
+        if number < 0 or self.currentText() != self.rows.label(self.rows.row(number)):
+            return None
+        return self.rows.row(number)
+
+    def current_key(self) -> str:
+        """Return the key of the chosen row, or an empty string."""
+        row = self.current_row()
+        return row[0] if row is not None else ""
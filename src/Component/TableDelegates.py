@@ -0,0 +1,134 @@
+from typing import Callable
+
+from PyQt5.QtCore import Qt, QEvent, QRect, QRectF, QPoint
+from PyQt5.QtGui import QColor, QFont, QFontMetrics, QPainter, QPen
+from PyQt5.QtWidgets import QApplication, QStyle, QStyleOptionButton, QStyledItemDelegate
+
+
+def _style(option):
+    return option.widget.style() if option.widget else QApplication.style()
+
+
+def _paint_background(painter, option):
+    """Paint the cell background (hover/selection) the way the view's style would."""
+    _style(option).drawPrimitive(QStyle.PE_PanelItemViewItem, option, painter, option.widget)
+
+
+class StatusPillDelegate(QStyledItemDelegate):
+    """
+    Paints a 0/1 status as the rounded green/red pill the tables used to build from a
+    QPushButton inside a container widget for every row.
+    """
+
+    POSITIVE = (QColor('#D1FAE5'), QColor('#10B981'))
+    NEGATIVE = (QColor('#FEE2E2'), QColor('#EF4444'))
+
+    def __init__(self, positive_text: str, negative_text: str, parent=None):
+        """
+        Initialize the delegate.
+
+        Args:
+            positive_text: Label painted when the value is 1
+            negative_text: Label painted otherwise
+            parent: Owning view
+        """
+        super().__init__(parent)
+        self.positive_text = positive_text
+        self.negative_text = negative_text
+
+        self.font = QFont('Poly')
+        self.font.setPixelSize(14)
+        self.font.setWeight(QFont.Medium)
+
+    def paint(self, painter, option, index):
+        _paint_background(painter, option)
+
+        positive = index.data(Qt.EditRole) == 1
+        text = self.positive_text if positive else self.negative_text
+        background, foreground = self.POSITIVE if positive else self.NEGATIVE
+
+        metrics = QFontMetrics(self.font)
+        pill = QRect(0, 0, max(100, metrics.horizontalAdvance(text) + 24), 30)
+        pill.moveCenter(option.rect.center())
+
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(QPen(foreground, 1))
+        painter.setBrush(background)
+        painter.drawRoundedRect(QRectF(pill).adjusted(0.5, 0.5, -0.5, -0.5), 10, 10)
+        painter.setFont(self.font)
+        painter.drawText(pill, Qt.AlignCenter, text)
+        painter.restore()
+
+
+class CheckBoxDelegate(QStyledItemDelegate):
+    """
+    Paints Qt.CheckStateRole as a checkbox centred in the cell and toggles it on click
+    through the model's setData, instead of a QCheckBox widget per row.
+    """
+
+    def _indicator(self, option) -> QRect:
+        style = _style(option)
+        size = style.subElementRect(QStyle.SE_CheckBoxIndicator, QStyleOptionButton(), option.widget).size()
+        rect = QRect(QPoint(0, 0), size)
+        rect.moveCenter(option.rect.center())
+        return rect
+
+    def paint(self, painter, option, index):
+        _paint_background(painter, option)
+
+        checkbox = QStyleOptionButton()
+        checkbox.rect = self._indicator(option)
+        checkbox.state = QStyle.State_Enabled
+        checkbox.state |= QStyle.State_On if index.data(Qt.CheckStateRole) == Qt.Checked else QStyle.State_Off
+        _style(option).drawPrimitive(QStyle.PE_IndicatorCheckBox, checkbox, painter, option.widget)
+
+    def editorEvent(self, event, model, option, index):
+        if not index.flags() & Qt.ItemIsUserCheckable:
+            return False
+        if event.type() == QEvent.MouseButtonDblClick:
+            return True
+        if (event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton
+                and option.rect.contains(event.pos())):
+            checked = index.data(Qt.CheckStateRole) == Qt.Checked
+            return model.setData(index, Qt.Unchecked if checked else Qt.Checked, Qt.CheckStateRole)
+        return False
+
+
+class ActionDelegate(QStyledItemDelegate):
+    """Paints a clickable glyph (e.g. the ✎ edit action) and calls back with the row when it is clicked."""
+
+    COLOR = QColor('#6B7280')
+    HOVER_COLOR = QColor('#374151')
+
+    def __init__(self, text: str, on_click: Callable[[int], None], parent=None):
+        """
+        Initialize the delegate.
+
+        Args:
+            text: Glyph painted in the cell
+            on_click: Called with the row number when the cell is clicked
+            parent: Owning view; enable its mouse tracking for the hover colour
+        """
+        super().__init__(parent)
+        self.text = text
+        self.on_click = on_click
+
+        self.font = QFont('Poly')
+        self.font.setPixelSize(16)
+
+    def paint(self, painter, option, index):
+        _paint_background(painter, option)
+
+        painter.save()
+        painter.setFont(self.font)
+        painter.setPen(self.HOVER_COLOR if option.state & QStyle.State_MouseOver else self.COLOR)
+        painter.drawText(option.rect, Qt.AlignCenter, self.text)
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if (event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton
+                and option.rect.contains(event.pos())):
+            self.on_click(index.row())
+            return True
+        return False
@@ -0,0 +1,204 @@
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from Database.ConnectionManager import ConnectionManager
+
+
+class AvailabilityIndex:
+    """
+    In-memory index of the cars and customers free for a new rental, for the rental form.
+
+    Every car (NomorPlat -> Model) and customer (NIK -> Nama, Kontak) is loaded once, together
+    with the set of free plates and NIKs. Checkout/return and the Mobil and Pelanggan write
+    paths report their changes after mark_changed(), which updates the index in place.
+
+    The index is only trusted while the table's version is the one it was loaded or updated
+    at. Any other write, whether from another counter PC, the Importer or a write in this
+    process that was never reported, moves the version on, and that half of the index is
+    loaded again on the next read.
+    """
+
+    _instances: Dict[str, "AvailabilityIndex"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, db: ConnectionManager):
+        """
+        Initialize an empty index.
+
+        Args:
+            db: Connection manager of the database
+        """
+        self.db = db
+        self._lock = threading.Lock()
+        # Table -> change counter the loaded rows are current for
+        self._versions: Dict[str, int] = {}
+        self._cars: Dict[str, str] = {}
+        self._free_cars: Set[str] = set()
+        self._customers: Dict[str, Tuple[str, str]] = {}
+        self._free_customers: Set[str] = set()
+        # Table -> sorted free rows, built on demand
+        self._sorted: Dict[str, List[tuple]] = {}
+
+    @classmethod
+    def get(cls, db: Optional[ConnectionManager] = None) -> "AvailabilityIndex":
+        """
+        Return the shared index of a database, creating it on first use.
+
+        Args:
+            db: Connection manager of the database (defaults to the application database)
+
+        Returns:
+            The process-wide AvailabilityIndex for that database
+        """
+        db = db or ConnectionManager.get()
+        key = str(db.db_path)
+        with cls._instances_lock:
+            index = cls._instances.get(key)
+            if index is None or index.db is not db:
+                index = cls._instances[key] = cls(db)
+            return index
+
+    def _load(self, table: str):
+        """Read a table's rows and free flags, unless they are current."""
+        version = self.db.version(table)
+        with self._lock:
+            if self._versions.get(table) == version:
+                return
+
+        with self.db.connection() as conn:
+            if table == 'Mobil':
+                rows = conn.execute("SELECT NomorPlat, Model, StatusKetersediaan FROM Mobil").fetchall()
+                entries = {plate: model for plate, model, _ in rows}
+                free = {plate for plate, _, available in rows if available == 1}
+            else:
+                rows = conn.execute("SELECT NIK, Nama, Kontak, StatusPinjam FROM Pelanggan").fetchall()
+                entries = {nik: (nama, kontak) for nik, nama, kontak, _ in rows}
+                free = {nik for nik, _, _, borrowing in rows if borrowing == 0}
+
+        with self._lock:
+            if table == 'Mobil':
+                self._cars, self._free_cars = entries, free
+            else:
+                self._customers, self._free_customers = entries, free
+            self._sorted.pop(table, None)
+            # Left unmarked if a write was reported while reading, so the next read loads again
+            if self.db.version(table) == version:
+                self._versions[table] = version
+            else:
+                self._versions.pop(table, None)
+
+    def _apply(self, table: str, change: Callable[[], Any]):
+        """
+        Apply a reported write to a table's half of the index.
+
+        The index follows the table only if this write is the one change since it was current,
+        which the version (counting other connections' writes too) tells; otherwise that half is
+        dropped and loaded again on the next read.
+        """
+        version = self.db.version(table)
+        with self._lock:
+            if self._versions.get(table) == version - 1:
+                change()
+                self._versions[table] = version
+            else:
+                self._versions.pop(table, None)
+            self._sorted.pop(table, None)
+
+    def mobil(self) -> List[Tuple[str, str]]:
+        """Return the free cars as (NomorPlat, Model), ordered by plate."""
+        self._load('Mobil')
+        with self._lock:
+            rows = self._sorted.get('Mobil')
+            if rows is None:
+                rows = self._sorted['Mobil'] = sorted((plate, self._cars[plate]) for plate in self._free_cars)
+            return rows
+
+    def pelanggan(self) -> List[Tuple[str, str, str]]:
+        """Return the free customers as (NIK, Nama, Kontak), ordered by NIK."""
+        self._load('Pelanggan')
+        with self._lock:
+            rows = self._sorted.get('Pelanggan')
+            if rows is None:
+                rows = self._sorted['Pelanggan'] = sorted(
+                    (nik,) + self._customers[nik] for nik in self._free_customers
+                )
+            return rows
+
+    def set_mobil_available(self, nomor_plat: str, available: bool):
+        """Report that a car's StatusKetersediaan was written."""
+        self.set_mobil_flags({nomor_plat: available})
+
+    def set_pelanggan_borrowing(self, nik: str, borrowing: bool):
+        """Report that a customer's StatusPinjam was written."""
+        self.set_pelanggan_flags({nik: borrowing})
+
+    def set_mobil_flags(self, available: Dict[str, bool]):
+        """Report that the StatusKetersediaan of several cars was written in one change (NomorPlat -> flag)."""
+        def change():
+            for nomor_plat, free in available.items():
+                if free and nomor_plat in self._cars:
+                    self._free_cars.add(nomor_plat)
+                else:
+                    self._free_cars.discard(nomor_plat)
+        self._apply('Mobil', change)
+
+    def set_pelanggan_flags(self, borrowing: Dict[str, bool]):
+        """Report that the StatusPinjam of several customers was written in one change (NIK -> flag)."""
+        def change():
+            for nik, taken in borrowing.items():
+                if not taken and nik in self._customers:
+                    self._free_customers.add(nik)
+                else:
+                    self._free_customers.discard(nik)
+        self._apply('Pelanggan', change)
+
+    def put_mobil(self, nomor_plat: str, model: str, available: bool):
+        """Report that a car was added or edited."""
+        def change():
+            self._cars[nomor_plat] = model
+            if available:
+                self._free_cars.add(nomor_plat)
+            else:
+                self._free_cars.discard(nomor_plat)
+        self._apply('Mobil', change)
+
+    def remove_mobil(self, nomor_plats: Iterable[str]):
+        """Report that cars were deleted."""
+        def change():
+            for nomor_plat in nomor_plats:
+                self._cars.pop(nomor_plat, None)
+                self._free_cars.discard(nomor_plat)
+        self._apply('Mobil', change)
+
+    def put_pelanggan(self, nik: str, nama: str, kontak: str,
+                      borrowing: Optional[bool] = None, original_nik: Optional[str] = None):
+        """
+        Report that a customer was added or edited.
+
+        Args:
+            nik: NIK after the write
+            nama: Customer name
+            kontak: Customer contact
+            borrowing: New StatusPinjam, or None if the write kept it
+            original_nik: NIK before an edit that may have changed it
+        """
+        def change():
+            was_free = False
+            if original_nik is not None:
+                was_free = original_nik in self._free_customers
+                self._customers.pop(original_nik, None)
+                self._free_customers.discard(original_nik)
+            self._customers[nik] = (nama, kontak)
+            if was_free if borrowing is None else not borrowing:
+                self._free_customers.add(nik)
+            else:
+                self._free_customers.discard(nik)
+        self._apply('Pelanggan', change)
+
+    def remove_pelanggan(self, niks: Iterable[str]):
+        """Report that customers were deleted."""
+        def change():
+            for nik in niks:
+                self._customers.pop(nik, None)
+                self._free_customers.discard(nik)
+        self._apply('Pelanggan', change)
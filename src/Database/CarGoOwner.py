@@ -1,28 +1,120 @@
 import sqlite3
 import random
 import os
-from datetime import datetime, timedelta
-
-import sqlite3
-import random
-import os
-from datetime import datetime, timedelta
+import sys
+import time
+import argparse
+import configparser
+from datetime import date, datetime, timedelta
+from itertools import islice
+from Database.ConnectionManager import ConnectionManager
+from Mobil.MobilThumbnail import MobilThumbnail
+from Laporan.PendapatanBulanan import PendapatanBulanan
+from Peminjaman.peminjamanService import PeminjamanService
+from Database.Denormalization import Denormalization
+from Database.FullTextSearch import FullTextSearch
+from Database.ChangeCounter import ChangeCounter
 
 class DatabaseManager:
     """Manages all database operations for the CarGoOwner application including setup,
     initialization, and dummy data generation."""
     
-    def __init__(self):
-        """Initialize the database manager and set up necessary paths."""
+    # Schema migrations applied on top of schema.sql, tracked with PRAGMA user_version.
+    # Each entry is (version, description, statements); a statement is either SQL text
+    # or a callable taking the open connection. Append new versions, never edit old ones.
+    MIGRATIONS = [
+        (1, "Index Peminjaman notification, report and customer filters", [
+            # Notifikasi only ever lists rentals that are still open, so index just those rows
+            """CREATE INDEX IF NOT EXISTS idx_peminjaman_belum_kembali
+               ON Peminjaman(TenggatPengembalian) WHERE StatusPengembalian = 0""",
+            """CREATE INDEX IF NOT EXISTS idx_peminjaman_belum_bayar
+               ON Peminjaman(TenggatPembayaran) WHERE StatusPembayaran = 0""",
+            # Laporan month filters compare strftime('%m', ...) against a two digit month
+            """CREATE INDEX IF NOT EXISTS idx_peminjaman_bulan_pinjam
+               ON Peminjaman(strftime('%m', TanggalPeminjaman))""",
+            """CREATE INDEX IF NOT EXISTS idx_peminjaman_bulan_bayar
+               ON Peminjaman(strftime('%m', TanggalPembayaran))""",
+            # Lookups by customer and foreign key checks when a car or customer is deleted
+            "CREATE INDEX IF NOT EXISTS idx_peminjaman_nik ON Peminjaman(NIK)",
+            "CREATE INDEX IF NOT EXISTS idx_peminjaman_nomorplat ON Peminjaman(NomorPlat)",
+        ]),
+        (2, "Add pre-rendered Mobil card thumbnails", [
+            MobilThumbnail.backfill,
+        ]),
+        (3, "Add monthly revenue aggregates maintained by triggers", [
+            PendapatanBulanan.install,
+        ]),
+        (4, "Index Peminjaman dates for year-aware period filters", [
+            # Laporan periods are date ranges now, so plain column indexes replace the month ones
+            "CREATE INDEX IF NOT EXISTS idx_peminjaman_tanggal_pinjam ON Peminjaman(TanggalPeminjaman)",
+            "CREATE INDEX IF NOT EXISTS idx_peminjaman_tanggal_bayar ON Peminjaman(TanggalPembayaran)",
+            "DROP INDEX IF EXISTS idx_peminjaman_bulan_pinjam",
+            "DROP INDEX IF EXISTS idx_peminjaman_bulan_bayar",
+        ]),
+        (5, "Index availability flags and derive them from open rentals", [
+            PeminjamanService.install,
+        ]),
+        (6, "Keep customer details copied into Peminjaman in step with Pelanggan", [
+            Denormalization.install,
+        ]),
+        (7, "Add full-text search over customers and cars", [
+            FullTextSearch.install,
+        ]),
+        (8, "Count writes per table so other connections' changes invalidate caches", [
+            ChangeCounter.install,
+        ]),
+        (9, "Tie full-text index entries to NIK and NomorPlat instead of rowid", [
+            FullTextSearch.install,
+        ]),
+    ]
+    
+    # Rows generated and inserted per executemany call when creating dummy data
+    GENERATE_BATCH_SIZE = 10000
+    
+    # Connection settings while a new database is filled, and the SQLite defaults restored after
+    GENERATE_PRAGMAS = {'synchronous': 'OFF', 'journal_mode': 'MEMORY', 'cache_size': -262144}
+    DEFAULT_PRAGMAS = {'synchronous': 'FULL', 'journal_mode': 'DELETE', 'cache_size': -2000}
+    
+    # Per-deployment overrides of DATABASE_SETTINGS, in its [database] section
+    CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'CarGoOwner.ini')
+    
+    # Database configuration applied by configureDatabase(). WAL lets report reads run while a
+    # rental is written, and with it synchronous=NORMAL only syncs at checkpoints.
+    DATABASE_SETTINGS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -16000,
+        'mmap_size': 268435456,
+        'busy_timeout': 5000,
+        'wal_autocheckpoint': 1000,
+        'journal_size_limit': 67108864,
+        'checkpoint_interval': 60,
+    }
+    
+    # Settings applied to every connection rather than once to the database file
+    CONNECTION_SETTINGS = ['synchronous', 'cache_size', 'mmap_size', 'busy_timeout',
+                           'wal_autocheckpoint', 'journal_size_limit']
+    
+    SETTING_CHOICES = {
+        'journal_mode': ['WAL', 'DELETE', 'TRUNCATE', 'PERSIST'],
+        'synchronous': ['OFF', 'NORMAL', 'FULL', 'EXTRA'],
+    }
+    
+    def __init__(self, db_path=None):
+        """Initialize the database manager and set up necessary paths.
+        
+        Args:
+            db_path (str): Database file to manage instead of the application database
+        """
         # Calculate base path by going up two levels from this file
         current_file_path = os.path.abspath(__file__)
         src_dir = os.path.dirname(os.path.dirname(current_file_path))
         self.base_path = os.path.dirname(src_dir)
         
         # Set up database paths
-        self.setupPaths()
+        self.setupPaths(db_path)
         
-    def setupPaths(self):
+    def setupPaths(self, db_path=None):
         """Set up all database-related paths and ensure directories exist."""
         self.db_dir = os.path.join(self.base_path, 'src', 'Database')
         
@@ -31,60 +123,219 @@ class DatabaseManager:
             os.makedirs(self.db_dir)
             print(f"Created database directory at {self.db_dir}")
             
-        self.db_path = os.path.join(self.db_dir, 'CarGoOwner.db')
+        self.db_path = os.path.abspath(db_path) if db_path else os.path.join(self.db_dir, 'CarGoOwner.db')
         self.schema_path = os.path.join(self.db_dir, 'schema.sql')
+        self.db = ConnectionManager.get(self.db_path)
 
         print(f"Database path: {self.db_path}")
         print(f"Schema path: {self.schema_path}")
 
-    def createDatabase(self):
+    def createDatabase(self, cars=60, customers=60, rentals=50, days=60, seed=None, end_date=None, images=1.0):
         """Create a fresh database with dummy data.
         
         This method will:
         1. Remove any existing database
         2. Create a new database and tables
         3. Generate fresh dummy data for all tables
+        4. Apply the configured database settings
+        
+        Args:
+            cars (int): Number of cars to generate
+            customers (int): Number of customers to generate
+            rentals (int): Number of rentals to generate
+            days (int): Days of rental history before end_date
+            seed (int): Random seed; the same seed and end_date give the same data
+            end_date (date): Latest rental date, today if None
+            images (float): Share of cars (0-1) that get a photo
         
         Returns:
             bool: True if database creation was successful
         """
         try:
             # Remove existing database if it exists
+            ConnectionManager.close_all()
             if os.path.exists(self.db_path):
                 os.remove(self.db_path)
                 print("Removed existing database")
+            for leftover in (f"{self.db_path}-wal", f"{self.db_path}-shm", f"{self.db_path}-journal"):
+                if os.path.exists(leftover):
+                    os.remove(leftover)
             
             # Create new database and tables
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Read and execute schema.sql
-            with open(self.schema_path, 'r') as schema_file:
-                schema_script = schema_file.read()
-                cursor.executescript(schema_script)
+            with self.db.connection() as conn:
+                cursor = conn.cursor()
+                
+                # Read and execute schema.sql
+                with open(self.schema_path, 'r') as schema_file:
+                    schema_script = schema_file.read()
+                    cursor.executescript(schema_script)
             
-            conn.commit()
             print("✓ Database schema created")
             
-            # Generate dummy data for each table
-            self.initializeMobil()
-            print("✓ Mobil data generated")
+            self.migrateDatabase()
             
-            self.initializePelanggan()
-            print("✓ Pelanggan data generated")
+            # Generate dummy data for each table from one random source
+            rng = random.Random(seed)
             
-            self.initializePeminjaman()
-            print("✓ Peminjaman data generated")
+            # The file is brand new, so skip syncing and on-disk journaling while it is filled;
+            # the nested transactions below all run on this connection
+            with self.db.connection() as conn:
+                for name, value in self.GENERATE_PRAGMAS.items():
+                    conn.execute(f"PRAGMA {name} = {value}")
+                try:
+                    self.initializeMobil(cars, rng, images, end_date)
+                    print(f"✓ Mobil data generated ({cars})")
+                    
+                    self.initializePelanggan(customers, rng)
+                    print(f"✓ Pelanggan data generated ({customers})")
+                    
+                    self.initializePeminjaman(rentals, rng, days, end_date)
+                    print(f"✓ Peminjaman data generated ({rentals})")
+                    
+                    # Cars and customers out on an open rental are not available
+                    with self.db.transaction() as conn:
+                        PeminjamanService.sync_status(conn)
+                finally:
+                    for name in self.GENERATE_PRAGMAS:
+                        conn.execute(f"PRAGMA {name} = {self.DEFAULT_PRAGMAS[name]}")
+            
+            self.db.mark_changed('Mobil', 'Pelanggan', 'Peminjaman')
+            self.configureDatabase()
             
-            conn.close()
             return True
             
         except Exception as e:
             print(f"Database initialization error: {str(e)}")
             return False
 
-    def initializeMobil(self):
-        """Generate dummy data for car inventory with realistic models and details."""
+    @classmethod
+    def loadSettings(cls, path=None):
+        """Read the database settings, overriding DATABASE_SETTINGS with the config file if it exists.
+        
+        Unknown keys and invalid values are reported and ignored, so a bad config never stops the app.
+        
+        Args:
+            path (str): Config file to read instead of CONFIG_PATH
+        
+        Returns:
+            dict: Setting name to value
+        """
+        settings = dict(cls.DATABASE_SETTINGS)
+        parser = configparser.ConfigParser()
+        try:
+            parser.read(path or cls.CONFIG_PATH, encoding='utf-8')
+        except configparser.Error as e:
+            print(f"Error reading database settings: {e}")
+            return settings
+        if not parser.has_section('database'):
+            return settings
+        
+        for name, value in parser.items('database'):
+            if name not in settings:
+                print(f"Unknown database setting ignored: {name}")
+                continue
+            if name in cls.SETTING_CHOICES:
+                if value.upper() not in cls.SETTING_CHOICES[name]:
+                    print(f"Invalid value for {name} ignored: {value}")
+                    continue
+                settings[name] = value.upper()
+            else:
+                try:
+                    settings[name] = int(value)
+                except ValueError:
+                    print(f"Invalid value for {name} ignored: {value}")
+        return settings
+
+    def configureDatabase(self, settings=None):
+        """Apply the database settings: the journal mode to the file and the rest to every connection.
+        
+        Args:
+            settings (dict): Settings to apply, loadSettings() if None
+        
+        Returns:
+            dict: The settings applied
+        """
+        settings = settings or self.loadSettings()
+        # Idle pooled connections would keep the file from switching journal mode
+        self.db.close()
+        try:
+            with self.db.connection() as conn:
+                # Stored in the file for WAL; needs a moment without other connections to switch
+                conn.execute(f"PRAGMA busy_timeout = {settings['busy_timeout']}")
+                mode = conn.execute(f"PRAGMA journal_mode = {settings['journal_mode']}").fetchone()[0]
+            if mode.upper() != settings['journal_mode']:
+                print(f"Journal mode {settings['journal_mode']} not available, using {mode}")
+        except sqlite3.Error as e:
+            print(f"Error setting journal mode: {e}")
+        
+        pragmas = {name: settings[name] for name in self.CONNECTION_SETTINGS}
+        if settings['journal_mode'] != 'WAL':
+            # Only WAL is remembered by the file; the other modes are set per connection
+            pragmas['journal_mode'] = settings['journal_mode']
+        self.db.configure(**pragmas)
+        return settings
+
+    def checkpoint(self, mode="PASSIVE"):
+        """Copy committed transactions from the write-ahead log into the database file.
+        
+        Args:
+            mode (str): "PASSIVE" never waits for readers or writers; "TRUNCATE" waits
+                        and also empties the log file, e.g. on exit
+        
+        Returns:
+            tuple: (busy, log pages, checkpointed pages), or None if it failed
+        """
+        try:
+            with self.db.connection() as conn:
+                return conn.execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+        except sqlite3.Error as e:
+            print(f"Error checkpointing database: {e}")
+            return None
+
+    def migrateDatabase(self):
+        """Apply every migration newer than the database's user_version.
+        
+        Each migration runs in its own transaction together with the version bump,
+        so an interrupted upgrade resumes from the last completed step.
+        
+        Returns:
+            int: The schema version after migrating
+        """
+        with self.db.connection() as conn:
+            current_version = conn.execute('PRAGMA user_version').fetchone()[0]
+        
+        for version, description, statements in self.MIGRATIONS:
+            if version <= current_version:
+                continue
+            
+            with self.db.transaction("IMMEDIATE") as conn:
+                # Another instance may have migrated while we waited for the write lock
+                if conn.execute('PRAGMA user_version').fetchone()[0] >= version:
+                    continue
+                
+                for statement in statements:
+                    if callable(statement):
+                        statement(conn)
+                    else:
+                        conn.execute(statement)
+                conn.execute(f'PRAGMA user_version = {version}')
+            
+            current_version = version
+            print(f"✓ Migration {version}: {description}")
+        
+        return current_version
+
+    def initializeMobil(self, count=60, rng=random, images=1.0, end_date=None):
+        """Generate dummy data for car inventory with realistic models and details.
+        
+        Each image file is read and turned into a card thumbnail once; cars share those blobs.
+        
+        Args:
+            count (int): Number of cars to generate
+            rng (random.Random): Random source, seeded for reproducible data
+            images (float): Share of cars (0-1) that get a photo
+            end_date (date): Cars are built in the five years up to this date's year, today if None
+        """
         # Define realistic car data pools
         car_models = [
             ('Toyota', ['Avanza', 'Innova', 'Camry', 'Corolla', 'Rush']),
@@ -93,56 +344,65 @@ class DatabaseManager:
             ('Mitsubishi', ['Xpander', 'Pajero', 'Eclipse Cross', 'Outlander']),
             ('Daihatsu', ['Xenia', 'Terios', 'Ayla', 'Sigra', 'Rocky'])
         ]
+        models = [f"{brand} {model}" for brand, brand_models in car_models for model in brand_models]
         
-        img_random = ['./src/Component/Mobil/mobil1.jpg', './src/Component/Mobil/mobil2.jpg', './src/Component/Mobil/mobil3.jpg', './src/Component/Mobil/mobil4.jpg', './src/Component/Mobil/mobil5.jpg','./src/Component/Mobil/mobil6.jpg']
+        image_dir = os.path.join(self.base_path, 'src', 'Component', 'Mobil')
+        img_random = [os.path.join(image_dir, f'mobil{i}.jpg') for i in range(1, 7)]
+        img_data = []
+        for path in img_random:
+            with open(path, 'rb') as image_file:
+                image = image_file.read()
+            img_data.append((image, MobilThumbnail.render(image)))
 
         colors = ['Hitam', 'Putih', 'Silver', 'Merah', 'Biru', 'Abu-abu']
-        current_year = datetime.now().year
+        current_year = (end_date or datetime.now().date()).year
         years = list(range(current_year - 5, current_year + 1))
         
-        try:
-            conn = sqlite3.connect(self.db_path)
-            print("Connected to database")
-            print("path: ", self.db_path)
-            cursor = conn.cursor()
-            
-            # Generate 36 unique cars with Indonesian license plates
-            cars_data = []
+        def cars():
             used_plates = set()
-            
-            for _ in range(60):
-                brand, models = random.choice(car_models)
-                img = open(random.choice(img_random), 'rb').read()
-                plate = self._generate_plate()
+            for _ in range(count):
+                plate = self._generate_plate(rng)
                 while plate in used_plates:
-                    plate = self._generate_plate()
+                    plate = self._generate_plate(rng)
                 used_plates.add(plate)
                 
-                cars_data.append((
+                image, thumbnail = rng.choice(img_data) if rng.random() < images else (None, None)
+                yield (
                     plate,
-                    img,  # Gambar (BLOB) is set to None
-                    f"{brand} {random.choice(models)}",
-                    random.choice(colors),
-                    random.choice(years),
-                    random.choice([0, 1])  # StatusKetersediaan
-                ))
-            
-            cursor.executemany('''
-                INSERT INTO Mobil (NomorPlat, Gambar, Model, Warna, Tahun, StatusKetersediaan)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', cars_data)
-            
-            conn.commit()
-            
+                    image,
+                    rng.choice(models),
+                    rng.choice(colors),
+                    rng.choice(years),
+                    rng.choice([0, 1]),  # StatusKetersediaan
+                    thumbnail
+                )
+        
+        try:
+            with self.db.transaction() as conn:
+                print("Connected to database")
+                print("path: ", self.db_path)
+                
+                for batch in self._batches(cars()):
+                    conn.executemany('''
+                        INSERT INTO Mobil (NomorPlat, Gambar, Model, Warna, Tahun, StatusKetersediaan)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                    ''', [car[:6] for car in batch])
+                    conn.executemany(
+                        'INSERT INTO MobilThumbnail (NomorPlat, Thumbnail) VALUES (?, ?)',
+                        [(car[0], car[6]) for car in batch if car[6] is not None]
+                    )
+                
         except sqlite3.Error as e:
             print(f"Error initializing Mobil table: {e}")
             raise
-        finally:
-            if conn:
-                conn.close()
 
-    def initializePelanggan(self):
-        """Generate dummy data for customers with realistic Indonesian names and details."""
+    def initializePelanggan(self, count=60, rng=random):
+        """Generate dummy data for customers with realistic Indonesian names and details.
+        
+        Args:
+            count (int): Number of customers to generate
+            rng (random.Random): Random source, seeded for reproducible data
+        """
         # Define data pools for generating realistic Indonesian customer data
         first_names = ['Ahmad', 'Budi', 'Dewi', 'Eko', 'Fitri', 'Gunawan', 'Hadi', 'Indah', 
                       'Joko', 'Kartika', 'Lina', 'Muhammad', 'Nina', 'Oscar', 'Putri', 'Rudi',
@@ -155,125 +415,219 @@ class DatabaseManager:
         streets = ['Jalan Sudirman', 'Jalan Thamrin', 'Jalan Gatot Subroto', 'Jalan Merdeka',
                   'Jalan Diponegoro', 'Jalan Ahmad Yani', 'Jalan Pahlawan']
         
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Generate 60 unique customers
-            customers_data = []
+        def customers():
             used_niks = set()
-            
-            for _ in range(60):
+            for _ in range(count):
                 # Generate unique 16-digit NIK
-                nik = ''.join([str(random.randint(0, 9)) for _ in range(16)])
+                nik = f"{rng.randrange(10 ** 16):016d}"
                 while nik in used_niks:
-                    nik = ''.join([str(random.randint(0, 9)) for _ in range(16)])
+                    nik = f"{rng.randrange(10 ** 16):016d}"
                 used_niks.add(nik)
                 
-                name = f"{random.choice(first_names)} {random.choice(last_names)}"
-                phone = f"08{random.randint(100000000, 999999999)}"
-                address = f"{random.choice(streets)} No. {random.randint(1, 100)}, {random.choice(cities)}"
+                name = f"{rng.choice(first_names)} {rng.choice(last_names)}"
+                phone = f"08{rng.randint(100000000, 999999999)}"
+                address = f"{rng.choice(streets)} No. {rng.randint(1, 100)}, {rng.choice(cities)}"
                 
-                customers_data.append((
+                yield (
                     nik,
                     name,
                     phone,
                     address,
-                    random.randint(0, 100),  # CreditPoint
-                    random.choice([0, 1])    # StatusPinjam
-                ))
-            
-            cursor.executemany('''
-                INSERT INTO Pelanggan (NIK, Nama, Kontak, Alamat, CreditPoint, StatusPinjam)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', customers_data)
-            
-            conn.commit()
-            
+                    rng.randint(0, 100),  # CreditPoint
+                    rng.choice([0, 1])    # StatusPinjam
+                )
+        
+        try:
+            with self.db.transaction() as conn:
+                for batch in self._batches(customers()):
+                    conn.executemany('''
+                        INSERT INTO Pelanggan (NIK, Nama, Kontak, Alamat, CreditPoint, StatusPinjam)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                    ''', batch)
+                
         except sqlite3.Error as e:
             print(f"Error initializing Pelanggan table: {e}")
             raise
-        finally:
-            if conn:
-                conn.close()
 
-    def initializePeminjaman(self):
-        """Generate dummy rental data maintaining referential integrity with Mobil and Pelanggan tables."""
+    def initializePeminjaman(self, count=50, rng=random, days=60, end_date=None):
+        """Generate dummy rental data maintaining referential integrity with Mobil and Pelanggan tables.
+        
+        Rentals that fell due more than a month before end_date are nearly all returned and paid,
+        so only recent ones show up as overdue. A car or customer has at most one open rental:
+        an open rental is returned on the day a later rental of its car or customer starts.
+        
+        Args:
+            count (int): Number of rentals to generate
+            rng (random.Random): Random source, seeded for reproducible data
+            days (int): Rental dates are spread over this many days before end_date
+            end_date (date): Latest rental date, today if None
+        """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Fetch existing mobil and pelanggan data to maintain referential integrity
-            cursor.execute('SELECT NomorPlat FROM Mobil')
-            available_cars = [row[0] for row in cursor.fetchall()]
-            
-            cursor.execute('SELECT NIK, Nama, Kontak FROM Pelanggan')
-            available_customers = cursor.fetchall()
-            
-            # Generate 20 rental records
-            rental_data = []
-            current_date = datetime.now()
-            
-            for _ in range(50):
-                # Random dates within reasonable range
-                rental_date = current_date - timedelta(days=random.randint(0, 60))
-                due_return_date = rental_date + timedelta(days=random.randint(3, 14))
-                due_payment_date = due_return_date + timedelta(days=1)
+            with self.db.transaction() as conn:
+                cursor = conn.cursor()
                 
-                # Randomly decide if rental is completed
-                is_returned = random.choice([0, 1])
-                is_paid = random.choice([0, 1]) if is_returned else 0
+                # Fetch existing mobil and pelanggan data to maintain referential integrity
+                cursor.execute('SELECT NomorPlat FROM Mobil ORDER BY NomorPlat')
+                available_cars = [row[0] for row in cursor.fetchall()]
                 
-                return_date = None
-                payment_date = None
-                if is_returned:
-                    return_date = due_return_date + timedelta(days=random.randint(-2, 2))
-                    if is_paid:
-                        payment_date = return_date + timedelta(days=random.randint(0, 3))
+                cursor.execute('SELECT NIK, Nama, Kontak FROM Pelanggan ORDER BY NIK')
+                available_customers = cursor.fetchall()
                 
-                # Select random car and customer
-                customer = random.choice(available_customers)
+                if not available_cars or not available_customers:
+                    print("No cars or customers to rent out; skipping rentals")
+                    return
+                
+                # Dates as day offsets from the first rental day, looked up in a table of ISO
+                # strings rather than formatted per row; returns and payments can run up to
+                # 19 days past the last rental day
+                first_day = (end_date or datetime.now().date()) - timedelta(days=days)
+                calendar = [(first_day + timedelta(days=offset)).isoformat() for offset in range(days + 20)]
+                settled_before = days - 30
+                uniform = rng.random
+                
+                # IDs are given explicitly so rentals already inserted can be returned later
+                cursor.execute('''
+                    SELECT MAX(COALESCE(MAX(ID), 0),
+                               COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'Peminjaman'), 0))
+                    FROM Peminjaman
+                ''')
+                first_id = cursor.fetchone()[0] + 1
+                
+                # Open rental of each car and customer; ID -> (NomorPlat, NIK) of each open rental
+                open_by_car = {}
+                open_by_customer = {}
+                open_rentals = {}
+                # Open rentals a later rental of their car or customer returned: ID -> return date
+                returned = {}
+                
+                def rentals():
+                    for index in range(count):
+                        # Rentals are spread evenly over the span in ID order, like a real history
+                        rental_day = index * (days + 1) // count
+                        due_return_day = rental_day + 3 + int(uniform() * 12)
+                        due_payment_day = due_return_day + 1
+                        
+                        # Randomly decide if rental is completed; old rentals almost always are
+                        if due_payment_day < settled_before:
+                            is_returned = 1 if uniform() < 0.97 else 0
+                            is_paid = 1 if is_returned and uniform() < 0.95 else 0
+                        else:
+                            is_returned = 1 if uniform() < 0.5 else 0
+                            is_paid = 1 if is_returned and uniform() < 0.5 else 0
+                        
+                        return_date = None
+                        payment_date = None
+                        if is_returned:
+                            return_day = due_return_day + int(uniform() * 5) - 2
+                            return_date = calendar[return_day]
+                            if is_paid:
+                                payment_date = calendar[return_day + int(uniform() * 4)]
+                        
+                        # Select random car and customer
+                        customer = available_customers[int(uniform() * len(available_customers))]
+                        nomor_plat = available_cars[int(uniform() * len(available_cars))]
+                        nik = customer[0]
+                        
+                        # The car and the customer are back before this rental starts
+                        for earlier in {open_by_car.get(nomor_plat), open_by_customer.get(nik)} - {None}:
+                            earlier_plat, earlier_nik = open_rentals.pop(earlier)
+                            del open_by_car[earlier_plat]
+                            del open_by_customer[earlier_nik]
+                            returned[earlier] = calendar[rental_day]
+                        
+                        rental_id = first_id + index
+                        if not is_returned:
+                            open_by_car[nomor_plat] = open_by_customer[nik] = rental_id
+                            open_rentals[rental_id] = (nomor_plat, nik)
+                        
+                        yield (
+                            rental_id,
+                            nomor_plat,
+                            nik,
+                            customer[1],  # Nama
+                            customer[2],  # Kontak
+                            calendar[rental_day],
+                            return_date,
+                            payment_date,
+                            calendar[due_return_day],
+                            calendar[due_payment_day],
+                            500000 + int(uniform() * 1500001),  # BesarPembayaran
+                            is_returned,
+                            is_paid
+                        )
+                
+                for batch in self._batches(rentals()):
+                    cursor.executemany('''
+                        INSERT INTO Peminjaman (
+                            ID, NomorPlat, NIK, Nama, Kontak, TanggalPeminjaman,
+                            TanggalPengembalian, TanggalPembayaran, TenggatPengembalian,
+                            TenggatPembayaran, BesarPembayaran, StatusPengembalian, StatusPembayaran
+                        )
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ''', batch)
+                
+                cursor.executemany('''
+                    UPDATE Peminjaman SET StatusPengembalian = 1, TanggalPengembalian = ? WHERE ID = ?
+                ''', ((return_date, rental_id) for rental_id, return_date in returned.items()))
                 
-                rental_data.append((
-                    random.choice(available_cars),  # NomorPlat
-                    customer[0],  # NIK
-                    customer[1],  # Nama
-                    customer[2],  # Kontak
-                    rental_date.strftime('%Y-%m-%d'),
-                    return_date.strftime('%Y-%m-%d') if return_date else None,
-                    payment_date.strftime('%Y-%m-%d') if payment_date else None,
-                    due_return_date.strftime('%Y-%m-%d'),
-                    due_payment_date.strftime('%Y-%m-%d'),
-                    random.randint(500000, 2000000),  # BesarPembayaran
-                    is_returned,
-                    is_paid
-                ))
-            
-            cursor.executemany('''
-                INSERT INTO Peminjaman (
-                    NomorPlat, NIK, Nama, Kontak, TanggalPeminjaman,
-                    TanggalPengembalian, TanggalPembayaran, TenggatPengembalian,
-                    TenggatPembayaran, BesarPembayaran, StatusPengembalian, StatusPembayaran
-                )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', rental_data)
-            
-            conn.commit()
-            
         except sqlite3.Error as e:
             print(f"Error initializing Peminjaman table: {e}")
             raise
-        finally:
-            if conn:
-                conn.close()
 
-    def _generate_plate(self):
+    def _batches(self, rows, size=None):
+        """Split an iterable of rows into lists of at most size rows (GENERATE_BATCH_SIZE by default)."""
+        rows = iter(rows)
+        while True:
+            batch = list(islice(rows, size or self.GENERATE_BATCH_SIZE))
+            if not batch:
+                return
+            yield batch
+
+    def _generate_plate(self, rng=random):
         """Generate a random Indonesian license plate number.
         
+        Args:
+            rng (random.Random): Random source
+        
         Returns:
             str: A formatted license plate number (e.g., 'B 1234 ABC')
         """
         regions = ['B', 'D', 'F', 'AB', 'AD', 'Z']
-        numbers = f"{random.randint(1000, 9999)}"
-        letters = ''.join(random.choices('ABCDEFGHJKLMNPRSTUVWXYZ', k=3))
-        return f"{random.choice(regions)} {numbers} {letters}"
\ No newline at end of file
+        numbers = f"{rng.randint(1000, 9999)}"
+        letters = ''.join(rng.choices('ABCDEFGHJKLMNPRSTUVWXYZ', k=3))
+        return f"{rng.choice(regions)} {numbers} {letters}"
+
+
+def main(argv=None):
+    """Build a database with generated data, run from src: python -m Database.CarGoOwner --help"""
+    parser = argparse.ArgumentParser(
+        description="Create a CarGoOwner database filled with generated cars, customers and rentals. "
+                    "The same seed and end date always produce the same data."
+    )
+    parser.add_argument('--cars', type=int, default=60, help="number of cars (default: 60)")
+    parser.add_argument('--customers', type=int, default=60, help="number of customers (default: 60)")
+    parser.add_argument('--rentals', type=int, default=50, help="number of rentals (default: 50)")
+    parser.add_argument('--days', type=int, default=60, help="days of rental history before the end date (default: 60)")
+    parser.add_argument('--end-date', type=date.fromisoformat, default=None,
+                        help="latest rental date as YYYY-MM-DD (default: today)")
+    parser.add_argument('--seed', type=int, default=None, help="random seed for reproducible data")
+    parser.add_argument('--images', type=float, default=1.0,
+                        help="share of cars with a photo, 0 to 1 (default: 1); lower it for very large datasets")
+    parser.add_argument('--output', default=None,
+                        help="database file to create (default: the application database, which is replaced)")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    manager = DatabaseManager(args.output)
+    created = manager.createDatabase(
+        cars=args.cars, customers=args.customers, rentals=args.rentals, days=args.days,
+        seed=args.seed, end_date=args.end_date, images=args.images
+    )
+    if not created:
+        return 1
+    print(f"✓ Created {manager.db_path} in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
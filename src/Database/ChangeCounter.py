@@ -0,0 +1,59 @@
+import sqlite3
+from typing import Dict, List
+
+
+class ChangeCounter:
+    """
+    Per-table write counters kept in the database itself, bumped by triggers.
+
+    The ConnectionManager's change counters only see writes reported with mark_changed() in
+    this process. Rows written by another counter PC, the Importer or the sqlite3 shell bump
+    these counters too, so the manager can tell that its caches of a table went stale.
+    """
+
+    TABLE = "ChangeCounter"
+
+    # Tables whose caches are invalidated by writes from other connections
+    TABLES = ['Mobil', 'Pelanggan', 'Peminjaman']
+
+    @staticmethod
+    def triggers(table: str) -> List[str]:
+        """Return the CREATE TRIGGER statements bumping a table's counter on every write."""
+        bump = f"UPDATE {ChangeCounter.TABLE} SET Version = Version + 1 WHERE TableName = '{table}';"
+        prefix = f"trg_{table.lower()}_counter"
+        return [
+            f"CREATE TRIGGER IF NOT EXISTS {prefix}_{event.lower()} AFTER {event} ON {table} BEGIN {bump} END"
+            for event in ('INSERT', 'UPDATE', 'DELETE')
+        ]
+
+    @staticmethod
+    def install(conn: sqlite3.Connection):
+        """
+        Create the counter table, one row per table, and the triggers bumping it.
+
+        Args:
+            conn: Open connection, normally inside the migration's transaction
+        """
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {ChangeCounter.TABLE} (
+                TableName TEXT PRIMARY KEY,
+                Version INTEGER NOT NULL DEFAULT 0
+            ) WITHOUT ROWID
+        """)
+        for table in ChangeCounter.TABLES:
+            conn.execute(f"INSERT OR IGNORE INTO {ChangeCounter.TABLE} (TableName) VALUES (?)", (table,))
+            for trigger in ChangeCounter.triggers(table):
+                conn.execute(trigger)
+
+    @staticmethod
+    def read(conn: sqlite3.Connection) -> Dict[str, int]:
+        """
+        Return every table's counter, or nothing if the database predates the counters.
+
+        Args:
+            conn: Open connection
+        """
+        try:
+            return dict(conn.execute(f"SELECT TableName, Version FROM {ChangeCounter.TABLE}").fetchall())
+        except sqlite3.OperationalError:
+            return {}
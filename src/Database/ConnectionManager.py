@@ -0,0 +1,279 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, Optional, Iterator
+
+from Database.ChangeCounter import ChangeCounter
+from Database.CountCache import CountCache
+from Database.QueryProfiler import ProfiledConnection
+
+
+class ConnectionManager:
+    """
+    Process-wide SQLite connection manager shared by every model.
+    Keeps a small pool of open connections and binds one to each thread while it works,
+    so a page render no longer pays for connection setup and schema parsing per query.
+
+    It also keeps the change counters caches are validated against. Writes in this process
+    report themselves through mark_changed(); writes by other processes are noticed through
+    PRAGMA data_version and the ChangeCounter table, and bump the counters the same way.
+    """
+
+    DEFAULT_DB_PATH = Path(__file__).parent / "CarGoOwner.db"
+
+    # Applied to every connection when it is opened
+    DEFAULT_PRAGMAS = {
+        'foreign_keys': 'ON',
+        'busy_timeout': 5000,
+    }
+
+    _instances: Dict[str, "ConnectionManager"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, db_path=None, pool_size: int = 4, pragmas: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the manager for a single database file.
+
+        Args:
+            db_path: Path to the SQLite database file
+            pool_size: Maximum number of idle connections kept open
+            pragmas: PRAGMA overrides applied on top of DEFAULT_PRAGMAS
+        """
+        self.db_path = Path(db_path or self.DEFAULT_DB_PATH)
+        self.pool_size = pool_size
+        self.pragmas = dict(self.DEFAULT_PRAGMAS)
+        self.pragmas.update(pragmas or {})
+
+        self._idle = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._versions: Dict[str, int] = {}
+        # Table -> ChangeCounter value already reflected in _versions
+        self._seen: Dict[str, int] = {}
+        # Connection only used to notice commits of other connections
+        self._watcher: Optional[sqlite3.Connection] = None
+        self._watch_lock = threading.Lock()
+        self._data_version: Optional[int] = None
+        self.counts = CountCache(self)
+
+    @classmethod
+    def get(cls, db_path=None) -> "ConnectionManager":
+        """
+        Return the shared manager for a database file, creating it on first use.
+
+        Args:
+            db_path: Path to the SQLite database file (defaults to the application database)
+
+        Returns:
+            The process-wide ConnectionManager for that file
+        """
+        key = str(Path(db_path or cls.DEFAULT_DB_PATH).resolve())
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(key)
+            return cls._instances[key]
+
+    @classmethod
+    def close_all(cls):
+        """Close every pooled connection of every manager (e.g. before the file is replaced)."""
+        with cls._instances_lock:
+            for manager in cls._instances.values():
+                manager.close()
+
+    @classmethod
+    @contextmanager
+    def substitute(cls, db_path) -> Iterator["ConnectionManager"]:
+        """
+        Serve the application database from another file while the block runs.
+
+        Models and views open the application database by its path; this points all of them
+        at e.g. a generated benchmark database without touching the real one.
+
+        Args:
+            db_path: Path to the SQLite database file to use instead
+        """
+        key = str(Path(cls.DEFAULT_DB_PATH).resolve())
+        manager = cls(Path(db_path).resolve())
+        with cls._instances_lock:
+            previous = cls._instances.get(key)
+            cls._instances[key] = manager
+        try:
+            yield manager
+        finally:
+            with cls._instances_lock:
+                if previous is None:
+                    cls._instances.pop(key, None)
+                else:
+                    cls._instances[key] = previous
+            manager.close()
+
+    def configure(self, **pragmas):
+        """
+        Change PRAGMA settings for future connections and drop idle ones so they pick them up.
+
+        Args:
+            **pragmas: PRAGMA names and values, e.g. cache_size=-8000
+        """
+        with self._lock:
+            self.pragmas.update(pragmas)
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    def _open(self) -> sqlite3.Connection:
+        """Open a new connection in autocommit mode, timed by the QueryProfiler, and apply the configured PRAGMAs."""
+        conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False,
+                               factory=ProfiledConnection)
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Borrow the connection bound to the current thread.
+
+        Nested calls on the same thread reuse the same connection; it goes back
+        to the pool when the outermost block exits.
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            self._local.depth += 1
+            try:
+                yield conn
+            finally:
+                self._local.depth -= 1
+            return
+
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+        if conn is None:
+            conn = self._open()
+
+        self._local.conn = conn
+        self._local.depth = 1
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+            self._local.depth = 0
+            self._release(conn)
+
+    def _release(self, conn: sqlite3.Connection):
+        """Return a connection to the pool, closing it if the pool is full or it is mid-transaction."""
+        if conn.in_transaction:
+            conn.rollback()
+        with self._lock:
+            if len(self._idle) < self.pool_size:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    @contextmanager
+    def transaction(self, mode: str = "DEFERRED") -> Iterator[sqlite3.Connection]:
+        """
+        Run a block inside a transaction, committing on success and rolling back on error.
+
+        Nested transactions on the same thread become savepoints of the outer one.
+
+        Args:
+            mode: BEGIN mode for the outermost transaction - "DEFERRED", "IMMEDIATE" or "EXCLUSIVE"
+        """
+        with self.connection() as conn:
+            if conn.in_transaction:
+                savepoint = f"sp_{self._local.depth}"
+                conn.execute(f"SAVEPOINT {savepoint}")
+                try:
+                    yield conn
+                except BaseException:
+                    conn.execute(f"ROLLBACK TO {savepoint}")
+                    conn.execute(f"RELEASE {savepoint}")
+                    raise
+                conn.execute(f"RELEASE {savepoint}")
+                return
+
+            if mode.upper() == "DEFERRED":
+                # Reading inside a deferred transaction would pin a snapshot its first write may not
+                # be able to upgrade, so other connections' writes are picked up before it instead
+                self._poll()
+                conn.execute(f"BEGIN {mode}")
+            else:
+                # Holding the write lock, so every counter change from here on is this transaction's
+                conn.execute(f"BEGIN {mode}")
+                self._absorb(ChangeCounter.read(conn))
+            changes = conn.total_changes
+            try:
+                yield conn
+                # Counters as this transaction leaves them, taken over by mark_changed()
+                self._local.committed = ChangeCounter.read(conn) if conn.total_changes != changes else None
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.commit()
+
+    def mark_changed(self, *tables: str, delta: Optional[int] = None):
+        """
+        Record that rows in the given tables were written, invalidating caches built on them.
+
+        Args:
+            *tables: Names of the tables that were modified
+            delta: Net number of rows the write added to each table (negative when removing),
+                   if known; lets the cached unfiltered row count be adjusted instead of recounted
+        """
+        committed = getattr(self._local, 'committed', None) or {}
+        with self._lock:
+            for table in tables:
+                if table in committed:
+                    self._seen[table] = max(self._seen.get(table, committed[table]), committed[table])
+                old_version = self._versions.get(table, 0)
+                self._versions[table] = old_version + 1
+                if delta is not None:
+                    self.counts.adjust(table, delta, old_version, old_version + 1)
+
+    def _absorb(self, counters: Dict[str, int]):
+        """Bump the change counter of every table whose ChangeCounter moved without mark_changed()."""
+        with self._lock:
+            for table, value in counters.items():
+                if self._seen.get(table) != value:
+                    self._seen[table] = value
+                    self._versions[table] = self._versions.get(table, 0) + 1
+
+    def _poll(self):
+        """Pick up writes committed by other connections since the last poll."""
+        with self._watch_lock:
+            if self._watcher is None:
+                self._watcher = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+                self._watcher.execute(f"PRAGMA busy_timeout = {self.pragmas.get('busy_timeout', 5000)}")
+            # data_version only moves when another connection commits, so this is cheap when idle
+            data_version = self._watcher.execute("PRAGMA data_version").fetchone()[0]
+            if data_version == self._data_version:
+                return
+            self._data_version = data_version
+            counters = ChangeCounter.read(self._watcher)
+        self._absorb(counters)
+
+    def version(self, table: str) -> int:
+        """
+        Return a counter that changes whenever the table is written, by this process or another.
+
+        Args:
+            table: Table name
+
+        Returns:
+            The table's current change counter
+        """
+        self._poll()
+        return self._versions.get(table, 0)
+
+    def close(self):
+        """Close all idle connections held by this manager."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+        with self._watch_lock:
+            watcher, self._watcher = self._watcher, None
+            self._data_version = None
+        if watcher is not None:
+            watcher.close()
@@ -0,0 +1,70 @@
+import threading
+from typing import Dict, Any, Optional, Sequence, Tuple
+
+
+class CountCache:
+    """
+    Row counts keyed by (table, filter), reused until the table is written to.
+
+    Entries are tied to the table's change counter on the ConnectionManager. Writes that
+    report how many rows they added or removed adjust the unfiltered total in place;
+    every other entry of the table is recounted the next time it is asked for.
+    """
+
+    def __init__(self, db):
+        """
+        Initialize the cache for one database.
+
+        Args:
+            db: ConnectionManager whose tables are counted
+        """
+        self.db = db
+        self._counts: Dict[Tuple[str, Optional[str], tuple], Tuple[int, int]] = {}
+        self._lock = threading.Lock()
+
+    def count(self, table: str, where: Optional[str] = None, params: Sequence[Any] = ()) -> int:
+        """
+        Return the number of rows in a table matching an optional filter.
+
+        Args:
+            table: Table name
+            where: Optional filter condition (without the WHERE keyword)
+            params: Parameters bound to the filter condition
+
+        Returns:
+            Row count, from the cache when the table has not changed since it was taken
+        """
+        key = (table, where, tuple(params))
+        version = self.db.version(table)
+        with self._lock:
+            cached = self._counts.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        query = f"SELECT COUNT(*) FROM {table}"
+        if where:
+            query += f" WHERE {where}"
+        with self.db.connection() as conn:
+            total = conn.execute(query, tuple(params)).fetchone()[0]
+
+        with self._lock:
+            # Skip caching if a write was reported while counting
+            if self.db.version(table) == version:
+                self._counts[key] = (version, total)
+        return total
+
+    def adjust(self, table: str, delta: int, old_version: int, new_version: int):
+        """
+        Carry the unfiltered total of a table across a write that changed its row count by delta.
+
+        Args:
+            table: Table name
+            delta: Number of rows added (negative for rows removed)
+            old_version: Change counter of the table before the write
+            new_version: Change counter of the table after the write
+        """
+        key = (table, None, ())
+        with self._lock:
+            cached = self._counts.get(key)
+            if cached is not None and cached[0] == old_version:
+                self._counts[key] = (new_version, cached[1] + delta)
@@ -0,0 +1,157 @@
+import sqlite3
+from typing import List, Optional
+
+from PyQt5.QtCore import QRunnable, QThreadPool
+
+from Database.ConnectionManager import ConnectionManager
+
+
+class _ReconcileTask(QRunnable):
+    """Runs Denormalization.reconcile on the reconciler's pool thread."""
+
+    def __init__(self, reconciler: 'Denormalization'):
+        super().__init__()
+        self.reconciler = reconciler
+
+    def run(self):
+        try:
+            self.reconciler.reconcile()
+        except sqlite3.Error as e:
+            print(f"Error repairing customer details: {e}")
+        finally:
+            self.reconciler._queued = False
+
+
+class Denormalization:
+    """
+    Keeps the customer details copied into Peminjaman in step with Pelanggan.
+
+    Peminjaman stores Nama and Kontak next to the NIK so rental lists and reports read a single
+    table. Triggers update the copies in the same transaction whenever a customer is edited
+    (including a changed NIK), and correct any rental written with details that differ from
+    its customer. The reconciler repairs drift the triggers could not see, such as rows written
+    by an older version of the application, in short batches in the background. It is run at
+    startup and on demand rather than on a timer, since the triggers leave nothing to repair.
+    """
+
+    # Customer columns copied into every rental of that customer
+    COLUMNS = ['Nama', 'Kontak']
+
+    # Rentals checked per transaction by the reconciler
+    BATCH_SIZE = 5000
+
+    _pool: Optional[QThreadPool] = None
+
+    @staticmethod
+    def _stale(row: str) -> str:
+        """SQL that is true when a rental's copies differ from its customer; row is NEW or a table name."""
+        differs = " OR ".join(f"p.{column} IS NOT {row}.{column}" for column in Denormalization.COLUMNS)
+        return f"EXISTS (SELECT 1 FROM Pelanggan p WHERE p.NIK = {row}.NIK AND ({differs}))"
+
+    @staticmethod
+    def _copy(where: str) -> str:
+        """SQL copying the customer details into the rentals matching a condition."""
+        columns = ", ".join(Denormalization.COLUMNS)
+        return (f"UPDATE Peminjaman SET ({columns}) = "
+                f"(SELECT {columns} FROM Pelanggan p WHERE p.NIK = Peminjaman.NIK) WHERE {where}")
+
+    @staticmethod
+    def triggers() -> List[str]:
+        """Return the CREATE TRIGGER statements keeping the copies up to date."""
+        columns = ", ".join(Denormalization.COLUMNS)
+        assignments = ", ".join(f"{column} = NEW.{column}" for column in Denormalization.COLUMNS)
+        changed = " OR ".join(f"NEW.{column} IS NOT OLD.{column}" for column in ['NIK'] + Denormalization.COLUMNS)
+        stale = Denormalization._stale('NEW')
+        return [
+            # Foreign keys are checked at the end of the statement, so the NIK can move with its rentals
+            f"""CREATE TRIGGER IF NOT EXISTS trg_pelanggan_salinan AFTER UPDATE OF NIK, {columns} ON Pelanggan
+                WHEN {changed}
+                BEGIN UPDATE Peminjaman SET NIK = NEW.NIK, {assignments} WHERE NIK = OLD.NIK; END""",
+            f"""CREATE TRIGGER IF NOT EXISTS trg_peminjaman_salinan_insert AFTER INSERT ON Peminjaman
+                WHEN {stale}
+                BEGIN {Denormalization._copy('ID = NEW.ID')}; END""",
+            f"""CREATE TRIGGER IF NOT EXISTS trg_peminjaman_salinan_update
+                AFTER UPDATE OF NIK, {columns} ON Peminjaman
+                WHEN {stale}
+                BEGIN {Denormalization._copy('ID = NEW.ID')}; END""",
+        ]
+
+    @staticmethod
+    def install(conn: sqlite3.Connection):
+        """
+        Create the triggers and repair the existing copies.
+
+        Args:
+            conn: Open connection, normally inside the migration's transaction
+        """
+        for trigger in Denormalization.triggers():
+            conn.execute(trigger)
+        conn.execute(Denormalization._copy(Denormalization._stale('Peminjaman')))
+
+    def __init__(self, db: Optional[ConnectionManager] = None):
+        """
+        Initialize the reconciler.
+
+        Args:
+            db: Connection manager of the database (defaults to the application database)
+        """
+        self.db = db or ConnectionManager.get()
+        self._queued = False
+
+    @classmethod
+    def pool(cls) -> QThreadPool:
+        """Return the thread pool repairs run on, one at a time, apart from the views' page loads."""
+        if cls._pool is None:
+            cls._pool = QThreadPool()
+            cls._pool.setMaxThreadCount(1)
+        return cls._pool
+
+    def start(self):
+        """Run reconcile() in the background, unless a run is already queued or running."""
+        if self._queued:
+            return
+        self._queued = True
+        self.pool().start(_ReconcileTask(self))
+
+    def drift(self) -> int:
+        """Return the number of rentals whose copies differ from their customer."""
+        with self.db.connection() as conn:
+            return conn.execute(
+                f"SELECT COUNT(*) FROM Peminjaman WHERE {self._stale('Peminjaman')}"
+            ).fetchone()[0]
+
+    def reconcile(self, batch_size: Optional[int] = None) -> int:
+        """
+        Repair stale copies, walking Peminjaman by ID one batch per transaction.
+
+        A single drift() count comes first, so when nothing drifted no write lock is taken.
+        Writers only wait for the current batch, so this can run while the application is in use.
+
+        Args:
+            batch_size: Rentals checked per transaction (BATCH_SIZE by default)
+
+        Returns:
+            The number of rentals repaired
+        """
+        if not self.drift():
+            return 0
+
+        batch_size = batch_size or self.BATCH_SIZE
+        with self.db.connection() as conn:
+            last_id = conn.execute("SELECT COALESCE(MAX(ID), 0) FROM Peminjaman").fetchone()[0]
+
+        repaired = 0
+        start = 0
+        while start < last_id:
+            with self.db.transaction("IMMEDIATE") as conn:
+                cursor = conn.execute(
+                    self._copy(f"ID > ? AND ID <= ? AND {self._stale('Peminjaman')}"),
+                    (start, start + batch_size)
+                )
+                repaired += cursor.rowcount
+            start += batch_size
+
+        if repaired:
+            self.db.mark_changed('Peminjaman', delta=0)
+            print(f"Repaired customer details of {repaired} rentals")
+        return repaired
@@ -0,0 +1,320 @@
+import json
+import re
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from Database.ConnectionManager import ConnectionManager
+from Database.KeysetPaginator import Page
+
+
+class FullTextSearch:
+    """
+    Ranked full-text search over customers and cars with SQLite FTS5.
+
+    Each searchable table has an FTS5 twin (e.g. PelangganFTS) holding its text columns,
+    kept in step by triggers. The trigram tokenizer matches any part of a word,
+    so "hart" finds "Hartono" and "1234" finds plate "B 1234 CD"; when every word must match
+    and nothing does, the words' trigrams are matched instead, which still finds "Jonh" for
+    "John". Results are ranked by bm25 with the key and name columns weighted highest.
+
+    Without trigram support (SQLite before 3.34) the tables fall back to word prefixes only.
+    Index entries are tied to their row by the key column (NIK, NomorPlat) they store, never
+    by rowid, which VACUUM may renumber in tables with a text primary key.
+    """
+
+    # Searchable tables: key column and the bm25 weight of every indexed column
+    TABLES = {
+        'Pelanggan': ('NIK', {'NIK': 10.0, 'Nama': 5.0, 'Kontak': 2.0, 'Alamat': 1.0}),
+        'Mobil': ('NomorPlat', {'NomorPlat': 10.0, 'Model': 5.0, 'Warna': 1.0}),
+    }
+
+    # Shortest word the trigram index can look up; shorter ones are matched as word prefixes
+    TRIGRAM = 3
+
+    _tokenizers: Dict[Tuple[str, str], str] = {}
+    _tokenizers_lock = threading.Lock()
+
+    @staticmethod
+    def fts_table(table: str) -> str:
+        return f"{table}FTS"
+
+    @staticmethod
+    def trigram_available(conn: sqlite3.Connection) -> bool:
+        """Return whether this SQLite build has the FTS5 trigram tokenizer."""
+        try:
+            conn.execute("CREATE VIRTUAL TABLE temp.TrigramProbe USING fts5(x, tokenize='trigram')")
+            conn.execute("DROP TABLE temp.TrigramProbe")
+            return True
+        except sqlite3.OperationalError:
+            return False
+
+    @staticmethod
+    def triggers(table: str) -> List[str]:
+        """Return the CREATE TRIGGER statements keeping a table's FTS twin up to date."""
+        fts = FullTextSearch.fts_table(table)
+        key, weights = FullTextSearch.TABLES[table]
+        columns = list(weights)
+        names = ", ".join(columns)
+        values = ", ".join(f"NEW.{column}" for column in columns)
+        insert = f"INSERT INTO {fts} ({names}) VALUES ({values});"
+        # A phrase query on the key column finds the entry through the index; keys too short for
+        # the trigram index are rare and looked up by a scan instead
+        phrase = f"""'{key} : "' || replace(OLD.{key}, '"', '""') || '"'"""
+        delete = (
+            f"DELETE FROM {fts} WHERE length(OLD.{key}) >= {FullTextSearch.TRIGRAM} AND {key} = OLD.{key}"
+            f" AND rowid IN (SELECT rowid FROM {fts} WHERE {fts} MATCH {phrase});"
+            f" DELETE FROM {fts} WHERE length(OLD.{key}) < {FullTextSearch.TRIGRAM} AND {key} = OLD.{key};"
+        )
+        prefix = f"trg_{table.lower()}_fts"
+        return [
+            f"CREATE TRIGGER {prefix}_insert AFTER INSERT ON {table} BEGIN {insert} END",
+            f"CREATE TRIGGER {prefix}_delete AFTER DELETE ON {table} BEGIN {delete} END",
+            f"""CREATE TRIGGER {prefix}_update AFTER UPDATE OF {names} ON {table}
+                BEGIN {delete} {insert} END""",
+        ]
+
+    @staticmethod
+    def rebuild(conn: sqlite3.Connection, table: Optional[str] = None):
+        """
+        Refill the FTS twins from their tables.
+
+        Args:
+            conn: Open connection, normally inside a transaction
+            table: Table to reindex, or None for all of them
+        """
+        for name in [table] if table else FullTextSearch.TABLES:
+            fts = FullTextSearch.fts_table(name)
+            columns = ", ".join(FullTextSearch.TABLES[name][1])
+            conn.execute(f"DELETE FROM {fts}")
+            conn.execute(f"INSERT INTO {fts} ({columns}) SELECT {columns} FROM {name}")
+
+    @staticmethod
+    def install(conn: sqlite3.Connection):
+        """
+        Create the FTS twins, (re)create their triggers and index the existing rows.
+
+        Args:
+            conn: Open connection, normally inside the migration's transaction
+        """
+        tokenizer = "trigram" if FullTextSearch.trigram_available(conn) else "unicode61 remove_diacritics 2"
+        for table, (_, weights) in FullTextSearch.TABLES.items():
+            conn.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FullTextSearch.fts_table(table)} "
+                f"USING fts5({', '.join(weights)}, tokenize='{tokenizer}')"
+            )
+            prefix = f"trg_{table.lower()}_fts"
+            for event in ('insert', 'delete', 'update'):
+                conn.execute(f"DROP TRIGGER IF EXISTS {prefix}_{event}")
+            for trigger in FullTextSearch.triggers(table):
+                conn.execute(trigger)
+        FullTextSearch.rebuild(conn)
+
+    @classmethod
+    def tokenizer(cls, db: ConnectionManager, table: str) -> str:
+        """Return the tokenizer a table's FTS twin was created with."""
+        key = (str(db.db_path), table)
+        with cls._tokenizers_lock:
+            if key in cls._tokenizers:
+                return cls._tokenizers[key]
+        with db.connection() as conn:
+            row = conn.execute(
+                "SELECT sql FROM sqlite_master WHERE name = ?", (cls.fts_table(table),)
+            ).fetchone()
+        if row is None:
+            raise sqlite3.OperationalError(f"no full-text index for {table}")
+        tokenizer = "trigram" if "trigram" in row[0] else "unicode61"
+        with cls._tokenizers_lock:
+            cls._tokenizers[key] = tokenizer
+        return tokenizer
+
+
+class SearchResults:
+    """
+    Ranked, paginated matches of a search, read like a KeysetPaginator.
+
+    Pages are numbered as usual and carry the same next/previous tokens, so KeysetTableModel
+    and the screens' page buttons work on search results unchanged. Rank order has no key to
+    seek from, so pages are read by offset; a search only spans a few pages in practice.
+    """
+
+    def __init__(self, db: ConnectionManager, table: str, text: str, columns: Sequence[str],
+                 where: Optional[str] = None, params: Sequence[Any] = (), page_size: int = 10):
+        """
+        Initialize the search.
+
+        Args:
+            db: Connection manager of the database holding the table
+            table: Table to search, one of FullTextSearch.TABLES
+            text: Search text as typed
+            columns: Columns returned for each row
+            where: Optional extra filter on the table's columns (without the WHERE keyword)
+            params: Parameters bound to the extra filter
+            page_size: Number of rows per page
+        """
+        self.db = db
+        self.table = table
+        self.key, self.weights = FullTextSearch.TABLES[table]
+        self.text = text
+        self.columns = list(columns)
+        self.where = where
+        self.params = tuple(params)
+        self.page_size = page_size
+
+        self._lock = threading.Lock()
+        self._plan: Optional[Tuple[int, str, tuple, bool, bool]] = None
+        self._count: Optional[Tuple[int, int]] = None
+
+    def _words(self) -> List[str]:
+        return [word.lower() for word in re.findall(r"\w+", self.text)]
+
+    @staticmethod
+    def _quote(text: str) -> str:
+        return '"' + text.replace('"', '""') + '"'
+
+    def _trigrams(self) -> List[str]:
+        size = FullTextSearch.TRIGRAM
+        return list(dict.fromkeys(
+            word[i:i + size] for word in self._words() if len(word) >= size for i in range(len(word) - size + 1)
+        ))
+
+    def _filter(self, fuzzy: bool) -> Tuple[str, tuple]:
+        """Build the condition on the FTS twin selecting the matches, exact or typo-tolerant."""
+        fts = FullTextSearch.fts_table(self.table)
+        words = self._words()
+        conditions, params = [], []
+
+        if FullTextSearch.tokenizer(self.db, self.table) == "trigram":
+            long_words = [word for word in words if len(word) >= FullTextSearch.TRIGRAM]
+            short_words = [word for word in words if len(word) < FullTextSearch.TRIGRAM]
+            if long_words:
+                if fuzzy:
+                    expression = " OR ".join(self._quote(trigram) for trigram in self._trigrams())
+                else:
+                    expression = " AND ".join(self._quote(word) for word in long_words)
+                conditions.append(f"{fts} MATCH ?")
+                params.append(expression)
+            # Too short for the trigram index: match the start of any word
+            for word in short_words:
+                likes = []
+                for column in self.weights:
+                    likes.append(f"{column} LIKE ? OR {column} LIKE ?")
+                    params += [f"{word}%", f"% {word}%"]
+                conditions.append(f"({' OR '.join(likes)})")
+        else:
+            conditions.append(f"{fts} MATCH ?")
+            params.append(" AND ".join(self._quote(word) + "*" for word in words))
+
+        return " AND ".join(conditions), tuple(params)
+
+    def _source(self, condition: str, params: tuple, ranked: bool, fuzzy: bool) -> Tuple[str, tuple]:
+        """
+        Build the FROM clause joining the matching FTS rows back to the table, and its parameters.
+
+        A typo-tolerant search matches rows sharing any trigram with the words; those sharing
+        fewer than half of them are dropped, and the rest rank by how many they share.
+        """
+        fts = FullTextSearch.fts_table(self.table)
+        weights = ", ".join(str(weight) for weight in self.weights.values())
+        rank = f"bm25({fts}, {weights})" if ranked else "0"
+        hits, hit_params, conditions = "0", (), []
+        if fuzzy:
+            trigrams = self._trigrams()
+            # A NULL column (e.g. no Alamat) must not blank out the whole text
+            text = " || ' ' || ".join(f"coalesce(lower({column}), '')" for column in self.weights)
+            hits = " + ".join(f"(instr({text}, ?) > 0)" for _ in trigrams)
+            hit_params = tuple(trigrams)
+            conditions.append(f"SearchHits * 2 >= {len(trigrams)}")
+        if self.where:
+            conditions.append(f"({self.where})")
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        source = (
+            f" FROM (SELECT {self.key} AS SearchKey, {rank} AS SearchRank, {hits} AS SearchHits"
+            f" FROM {fts} WHERE {condition})"
+            f" JOIN {self.table} ON {self.table}.{self.key} = SearchKey"
+            f"{where}"
+        )
+        return source, hit_params + params + self.params
+
+    def _prepare(self) -> Optional[Tuple[int, str, tuple, bool, bool]]:
+        """Pick the exact or typo-tolerant query and count its matches, once per table version."""
+        version = self.db.version(self.table)
+        with self._lock:
+            if self._plan is not None and self._plan[0] == version:
+                return self._plan
+
+        plan = None
+        total = 0
+        if self._words():
+            condition, params = self._filter(fuzzy=False)
+            ranked = "MATCH" in condition
+            fuzzy = False
+            with self.db.connection() as conn:
+                source, source_params = self._source(condition, params, ranked, fuzzy)
+                total = conn.execute(f"SELECT COUNT(*){source}", source_params).fetchone()[0]
+                if total == 0 and ranked and FullTextSearch.tokenizer(self.db, self.table) == "trigram":
+                    condition, params = self._filter(fuzzy=True)
+                    fuzzy = True
+                    source, source_params = self._source(condition, params, ranked, fuzzy)
+                    total = conn.execute(f"SELECT COUNT(*){source}", source_params).fetchone()[0]
+            plan = (version, condition, params, ranked, fuzzy)
+
+        with self._lock:
+            self._plan = plan
+            self._count = (version, total)
+        return plan
+
+    def count(self) -> int:
+        """Return the number of matches."""
+        self._prepare()
+        with self._lock:
+            return self._count[1]
+
+    def page_count(self) -> int:
+        return (self.count() + self.page_size - 1) // self.page_size
+
+    def page(self, number: int) -> Page:
+        """
+        Fetch a page of matches by number, best match first.
+
+        Args:
+            number: Page number, starting at 1
+
+        Returns:
+            The requested page (empty if the number is past the end or nothing matches)
+        """
+        version = self.db.version(self.table)
+        plan = self._prepare()
+        if plan is None:
+            return Page(number=number, rows=[], keys=[], has_next=False, version=version)
+
+        _, condition, params, ranked, fuzzy = plan
+        source, source_params = self._source(condition, params, ranked, fuzzy)
+        order = f"SearchHits DESC, SearchRank, {self.key}" if ranked else self.key
+        query = f"SELECT {self.key}, {', '.join(self.columns)}{source} ORDER BY {order} LIMIT ? OFFSET ?"
+        with self.db.connection() as conn:
+            cursor = conn.execute(
+                query, source_params + (self.page_size + 1, (max(number, 1) - 1) * self.page_size)
+            )
+            names = [description[0] for description in cursor.description][1:]
+            fetched = cursor.fetchall()
+
+        has_next = len(fetched) > self.page_size
+        fetched = fetched[:self.page_size]
+        return Page(
+            number=number,
+            rows=[dict(zip(names, row[1:])) for row in fetched],
+            keys=[row[0] for row in fetched],
+            has_next=has_next,
+            version=version,
+        )
+
+    def seek(self, token: str) -> Page:
+        """Fetch the page a Page.next_token or Page.previous_token points to."""
+        return self.page(json.loads(token)['page'])
+
+    def first_page(self) -> Page:
+        return self.page(1)
+
+    def last_page(self) -> Page:
+        return self.page(max(self.page_count(), 1))
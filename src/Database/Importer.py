@@ -0,0 +1,381 @@
+import argparse
+import csv
+import io
+import json
+import os
+import sqlite3
+import sys
+from dataclasses import dataclass
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from Database.CarGoOwner import DatabaseManager
+from Database.ConnectionManager import ConnectionManager
+from Database.Validators import validate_record
+from Mobil.MobilThumbnail import MobilThumbnail
+
+
+@dataclass
+class ImportResult:
+    """Running totals of one import, passed to the progress callback after every batch."""
+    table: str
+    imported: int = 0
+    rejected: int = 0
+    bytes_read: int = 0
+    bytes_total: int = 0
+    reject_path: Optional[Path] = None
+
+    @property
+    def fraction(self) -> float:
+        """Share of the input file read so far, between 0 and 1."""
+        return self.bytes_read / self.bytes_total if self.bytes_total else 1.0
+
+
+class Importer:
+    """
+    Streaming bulk import of cars, customers and rentals from CSV or JSON Lines files.
+
+    Rows are read BATCH_SIZE at a time, checked with the same rules as the entry forms
+    (Database.Validators) plus duplicate keys and missing references, and each batch is
+    inserted with executemany inside one transaction. Rows that fail are written, with the
+    reason, to a reject file in the input's format so they can be fixed and imported again.
+    An open rental is only accepted if its car and customer are free, and takes them in the
+    same transaction, as a checkout does.
+    """
+
+    # Rows per transaction; also keeps the key lookups below SQLite's bound parameter limit
+    BATCH_SIZE = 500
+
+    # Columns read from the file, primary key checked for duplicates, and integer columns
+    TABLES = {
+        'Mobil': {
+            'columns': ['NomorPlat', 'Gambar', 'Model', 'Warna', 'Tahun', 'StatusKetersediaan'],
+            'key': 'NomorPlat',
+            'integers': ['Tahun', 'StatusKetersediaan'],
+        },
+        'Pelanggan': {
+            'columns': ['NIK', 'Nama', 'Kontak', 'Alamat', 'CreditPoint', 'StatusPinjam'],
+            'key': 'NIK',
+            'integers': ['CreditPoint', 'StatusPinjam'],
+        },
+        'Peminjaman': {
+            'columns': ['Nama', 'NIK', 'NomorPlat', 'Kontak', 'TanggalPeminjaman',
+                        'TanggalPengembalian', 'TanggalPembayaran', 'TenggatPengembalian',
+                        'TenggatPembayaran', 'BesarPembayaran', 'StatusPengembalian', 'StatusPembayaran'],
+            'key': None,
+            'integers': ['BesarPembayaran', 'StatusPengembalian', 'StatusPembayaran'],
+        },
+    }
+
+    # Values used for optional columns left empty, matching the schema defaults
+    DEFAULTS = {
+        'Mobil': {'StatusKetersediaan': 1},
+        'Pelanggan': {'CreditPoint': 0, 'StatusPinjam': 0},
+        'Peminjaman': {'StatusPengembalian': 0, 'StatusPembayaran': 0},
+    }
+
+    JSON_SUFFIXES = ('.jsonl', '.ndjson', '.json')
+
+    def __init__(self, db: Optional[ConnectionManager] = None, batch_size: Optional[int] = None):
+        """
+        Initialize the importer.
+
+        Args:
+            db: Connection manager of the target database (defaults to the application database)
+            batch_size: Rows per transaction, BATCH_SIZE if not given
+        """
+        self.db = db or ConnectionManager.get()
+        self.batch_size = batch_size or self.BATCH_SIZE
+
+    def import_file(self, table: str, path, reject_path=None,
+                    progress: Optional[Callable[[ImportResult], None]] = None) -> ImportResult:
+        """
+        Import every row of a CSV or JSON Lines file into a table.
+
+        The format follows the file extension: .csv, or .jsonl/.ndjson/.json with one object
+        per line. Field names are the table's column names. For Mobil, Gambar is the path of an
+        image file, relative to the import file.
+
+        Args:
+            table: "Mobil", "Pelanggan" or "Peminjaman"
+            path: File to import
+            reject_path: Where rejected rows are written; defaults to <name>.rejects.<ext>
+                         next to the input, and is only created if a row is rejected
+            progress: Called with the running totals after each batch
+
+        Returns:
+            ImportResult with the number of rows imported and rejected
+        """
+        if table not in self.TABLES:
+            raise ValueError(f"Cannot import into unknown table {table}")
+
+        path = Path(path)
+        if reject_path is None:
+            reject_path = path.with_name(f"{path.stem}.rejects{path.suffix}")
+        result = ImportResult(table, bytes_total=os.path.getsize(path))
+        seen = set()
+
+        with open(path, 'rb') as raw, _RejectWriter(Path(reject_path), self._is_json(path)) as rejects:
+            records = self._read(path, raw)
+            while True:
+                batch = list(islice(records, self.batch_size))
+                if not batch:
+                    break
+
+                accepted = []
+                for record, error in batch:
+                    if error is None:
+                        error = validate_record(table, record)
+                    if error is None:
+                        accepted.append(record)
+                    else:
+                        rejects.write(record, error)
+
+                inserted, failures = self._insert(table, accepted, path.parent, seen)
+                for record, error in failures:
+                    rejects.write(record, error)
+
+                result.imported += inserted
+                result.rejected = rejects.count
+                result.bytes_read = raw.tell()
+                if progress:
+                    progress(result)
+
+        result.reject_path = Path(reject_path) if result.rejected else None
+        return result
+
+    def _is_json(self, path: Path) -> bool:
+        return path.suffix.lower() in self.JSON_SUFFIXES
+
+    def _read(self, path: Path, raw) -> Iterator[Tuple[Dict[str, Any], Optional[str]]]:
+        """Yield (record, parse error) pairs from the open binary file, one line at a time."""
+        if self._is_json(path):
+            for line in raw:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    yield {'Line': line.decode('utf-8', 'replace')}, f"Invalid JSON: {str(e)}"
+                    continue
+                if isinstance(record, dict):
+                    yield record, None
+                else:
+                    yield {'Line': line.decode('utf-8', 'replace')}, "Each line must be a JSON object"
+        else:
+            text = io.TextIOWrapper(raw, encoding='utf-8-sig', newline='')
+            try:
+                for record in csv.DictReader(text):
+                    record.pop(None, None)
+                    yield record, None
+            finally:
+                # Leave the binary file open for the caller
+                text.detach()
+
+    def _insert(self, table: str, records: List[Dict[str, Any]], base_dir: Path,
+                seen: set) -> Tuple[int, List[Tuple[Dict[str, Any], str]]]:
+        """
+        Insert one batch of validated records in a single transaction.
+
+        Args:
+            table: Target table
+            records: Records that passed validation
+            base_dir: Directory image paths are resolved against
+            seen: Keys already read from this file, updated in place
+
+        Returns:
+            Number of rows inserted and a list of (record, reason) for those that were not
+        """
+        spec = self.TABLES[table]
+        columns = spec['columns']
+        key = spec['key']
+        rejected = []
+
+        with self.db.transaction("IMMEDIATE") as conn:
+            rows = []
+            kept = []
+            existing = self._existing(conn, table, key, [record[key] for record in records]) if key else set()
+            references = self._references(conn, records) if table == 'Peminjaman' else None
+            # Open rentals take their car and customer, under the same rules as a checkout
+            free = self._free(conn, records) if table == 'Peminjaman' else None
+
+            for record in records:
+                values = self._values(table, record)
+                error = None
+
+                if key:
+                    if values[key] in seen:
+                        error = f"Duplicate {key} in file"
+                    elif values[key] in existing:
+                        error = f"{key} already exists"
+                if error is None and references is not None:
+                    if values['NIK'] not in references[0]:
+                        error = "Pelanggan with this NIK does not exist"
+                    elif values['NomorPlat'] not in references[1]:
+                        error = "Mobil with this NomorPlat does not exist"
+                    elif values['StatusPengembalian'] == 0:
+                        if values['NomorPlat'] not in free[1]:
+                            error = "Mobil is not available"
+                        elif values['NIK'] not in free[0]:
+                            error = "Pelanggan is already borrowing a car"
+                        else:
+                            free[0].discard(values['NIK'])
+                            free[1].discard(values['NomorPlat'])
+                if error is None and table == 'Mobil' and values['Gambar'] is not None:
+                    image = base_dir / values['Gambar']
+                    try:
+                        values['Gambar'] = image.read_bytes()
+                    except OSError:
+                        error = f"Image not found: {values['Gambar']}"
+
+                if error is not None:
+                    rejected.append((record, error))
+                    continue
+                if key:
+                    seen.add(values[key])
+                rows.append(tuple(values[column] for column in columns))
+                kept.append(record)
+
+            sql = (f"INSERT INTO {table} ({', '.join(columns)}) "
+                   f"VALUES ({', '.join('?' for _ in columns)})")
+            try:
+                with self.db.transaction() as batch:
+                    batch.executemany(sql, rows)
+            except sqlite3.IntegrityError:
+                # Fall back to row by row so only the offending rows are rejected
+                inserted = []
+                for row, record in zip(rows, kept):
+                    try:
+                        with self.db.transaction() as single:
+                            single.execute(sql, row)
+                        inserted.append(row)
+                    except sqlite3.IntegrityError as e:
+                        rejected.append((record, f"Rejected by database: {str(e)}"))
+                rows = inserted
+
+            if table == 'Mobil':
+                MobilThumbnail.store(conn, [(row[0], row[1]) for row in rows if row[1]])
+
+            opened = []
+            if table == 'Peminjaman':
+                opened = [dict(zip(columns, row)) for row in rows]
+                opened = [values for values in opened if values['StatusPengembalian'] == 0]
+                conn.executemany("UPDATE Mobil SET StatusKetersediaan = 0 WHERE NomorPlat = ?",
+                                 [(values['NomorPlat'],) for values in opened])
+                conn.executemany("UPDATE Pelanggan SET StatusPinjam = 1 WHERE NIK = ?",
+                                 [(values['NIK'],) for values in opened])
+
+        if rows:
+            self.db.mark_changed(table, delta=len(rows))
+        if opened:
+            self.db.mark_changed('Mobil', 'Pelanggan', delta=0)
+        return len(rows), rejected
+
+    def _values(self, table: str, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a validated record to column values: stripped text, integers and defaults."""
+        spec = self.TABLES[table]
+        values = dict(self.DEFAULTS[table])
+        for column in spec['columns']:
+            value = record.get(column)
+            value = None if value is None else str(value).strip()
+            if not value:
+                values.setdefault(column, None)
+                continue
+            values[column] = int(value) if column in spec['integers'] else value
+        return values
+
+    def _existing(self, conn: sqlite3.Connection, table: str, key: str, keys: List[Any]) -> set:
+        """Return which of the given primary keys are already in the table."""
+        keys = [str(value).strip() for value in keys]
+        if not keys:
+            return set()
+        placeholders = ', '.join('?' for _ in keys)
+        cursor = conn.execute(f"SELECT {key} FROM {table} WHERE {key} IN ({placeholders})", keys)
+        return {row[0] for row in cursor}
+
+    def _references(self, conn: sqlite3.Connection, records: List[Dict[str, Any]]) -> Tuple[set, set]:
+        """Return the NIKs and plates referenced by rental records that exist in the database."""
+        niks = self._existing(conn, 'Pelanggan', 'NIK', [record['NIK'] for record in records])
+        plates = self._existing(conn, 'Mobil', 'NomorPlat', [record['NomorPlat'] for record in records])
+        return niks, plates
+
+    def _free(self, conn: sqlite3.Connection, records: List[Dict[str, Any]]) -> Tuple[set, set]:
+        """Return the NIKs not borrowing and the plates available, among those of open rental records."""
+        opened = [record for record in records if self._values('Peminjaman', record)['StatusPengembalian'] == 0]
+        niks = [str(record['NIK']).strip() for record in opened]
+        plates = [str(record['NomorPlat']).strip() for record in opened]
+        if not opened:
+            return set(), set()
+        free_niks = {row[0] for row in conn.execute(
+            f"SELECT NIK FROM Pelanggan WHERE StatusPinjam = 0 AND NIK IN ({', '.join('?' for _ in niks)})", niks
+        )}
+        free_plates = {row[0] for row in conn.execute(
+            f"SELECT NomorPlat FROM Mobil WHERE StatusKetersediaan = 1 "
+            f"AND NomorPlat IN ({', '.join('?' for _ in plates)})", plates
+        )}
+        return free_niks, free_plates
+
+
+class _RejectWriter:
+    """Writes rejected rows, with an Error field, in the format of the input file."""
+
+    def __init__(self, path: Path, is_json: bool):
+        self.path = path
+        self.is_json = is_json
+        self.count = 0
+        self._file = None
+        self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if self._file:
+            self._file.close()
+
+    def write(self, record: Dict[str, Any], error: str):
+        if self._file is None:
+            self._file = open(self.path, 'w', encoding='utf-8', newline='')
+        record = dict(record, Error=error)
+
+        if self.is_json:
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        else:
+            if self._writer is None:
+                self._writer = csv.DictWriter(self._file, fieldnames=list(record), extrasaction='ignore')
+                self._writer.writeheader()
+            self._writer.writerow(record)
+
+        self.count += 1
+
+
+def main(argv=None):
+    """Command line entry point, run from src: python -m Database.Importer Mobil cars.csv"""
+    parser = argparse.ArgumentParser(description="Import cars, customers or rentals from CSV or JSON Lines")
+    parser.add_argument('table', choices=list(Importer.TABLES))
+    parser.add_argument('path', help="CSV (.csv) or JSON Lines (.jsonl) file to import")
+    parser.add_argument('--rejects', help="File for rejected rows (default: <name>.rejects.<ext>)")
+    parser.add_argument('--batch-size', type=int, default=Importer.BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    manager = DatabaseManager()
+    manager.configureDatabase()
+    manager.migrateDatabase()
+
+    def report(result: ImportResult):
+        print(f"\r{result.fraction:6.1%}  imported {result.imported}  rejected {result.rejected}",
+              end='', flush=True)
+
+    result = Importer(batch_size=args.batch_size).import_file(
+        args.table, args.path, reject_path=args.rejects, progress=report
+    )
+    print()
+    if result.reject_path:
+        print(f"Rejected rows written to {result.reject_path}")
+    return 0 if result.rejected == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
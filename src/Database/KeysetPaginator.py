@@ -0,0 +1,273 @@
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Dict, Any, Iterator, Optional, Sequence, Tuple
+
+from Database.ConnectionManager import ConnectionManager
+
+
+@dataclass
+class Page:
+    """
+    One page of rows returned by KeysetPaginator.
+    Carries the primary keys it covers so the neighbouring pages can be fetched by seeking from them.
+    """
+    number: int
+    rows: List[Dict[str, Any]]
+    keys: List[Any]
+    has_next: bool
+    version: int
+
+    @property
+    def has_previous(self) -> bool:
+        return self.number > 1
+
+    @property
+    def values(self) -> List[Tuple[Any, ...]]:
+        """Rows as plain tuples in column order, for table widgets that fill cells by index."""
+        return [tuple(row.values()) for row in self.rows]
+
+    @property
+    def next_token(self) -> Optional[str]:
+        """Opaque token that fetches the page after this one, or None on the last page."""
+        if not (self.has_next and self.keys):
+            return None
+        return json.dumps({'page': self.number + 1, 'after': self.keys[-1]})
+
+    @property
+    def previous_token(self) -> Optional[str]:
+        """Opaque token that fetches the page before this one, or None on the first page."""
+        if not (self.has_previous and self.keys):
+            return None
+        return json.dumps({'page': self.number - 1, 'before': self.keys[0]})
+
+
+class KeysetPaginator:
+    """
+    Seek (keyset) pagination over one table, ordered by its primary key.
+
+    Pages are read with "WHERE key > last seen key ... LIMIT n" instead of OFFSET, so a page
+    costs the same no matter how deep it is. Jumping to an arbitrary page number goes through
+    a cached index holding the first key of every page; it is rebuilt only after the table
+    is reported as changed through ConnectionManager.mark_changed().
+    """
+
+    # Shared instances, so consecutive page requests can seek from the page served before
+    MAX_INSTANCES = 32
+    _instances: "OrderedDict[tuple, KeysetPaginator]" = OrderedDict()
+    _instances_lock = threading.Lock()
+
+    def __init__(self, db: ConnectionManager, table: str, key: str, columns: Sequence[str],
+                 where: Optional[str] = None, params: Sequence[Any] = (), page_size: int = 10):
+        """
+        Initialize a paginator for one filtered query.
+
+        Args:
+            db: Connection manager of the database holding the table
+            table: Table name
+            key: Primary key column the pages are ordered and seeked by
+            columns: Column expressions returned for each row
+            where: Optional filter condition (without the WHERE keyword)
+            params: Parameters bound to the filter condition
+            page_size: Number of rows per page
+        """
+        self.db = db
+        self.table = table
+        self.key = key
+        self.columns = list(columns)
+        self.where = where
+        self.params = tuple(params)
+        self.page_size = page_size
+
+        self._lock = threading.Lock()
+        self._last: Optional[Page] = None
+        self._boundaries: Optional[Tuple[int, List[Any]]] = None
+
+    @classmethod
+    def get(cls, db: ConnectionManager, table: str, key: str, columns: Sequence[str],
+            where: Optional[str] = None, params: Sequence[Any] = (), page_size: int = 10) -> "KeysetPaginator":
+        """
+        Return the shared paginator for a query (same arguments as the constructor), creating it on first use.
+
+        Returns:
+            The KeysetPaginator for that table, filter and page size
+        """
+        cache_key = (str(db.db_path), table, key, tuple(columns), where, tuple(params), page_size)
+        with cls._instances_lock:
+            paginator = cls._instances.get(cache_key)
+            if paginator is None:
+                paginator = cls(db, table, key, columns, where, params, page_size)
+                cls._instances[cache_key] = paginator
+                if len(cls._instances) > cls.MAX_INSTANCES:
+                    cls._instances.popitem(last=False)
+            else:
+                cls._instances.move_to_end(cache_key)
+            return paginator
+
+    def where_clause(self, extra: Optional[str] = None) -> str:
+        """Build the WHERE clause from the query filter and an optional seek condition."""
+        conditions = [f"({self.where})"] if self.where else []
+        if extra:
+            conditions.append(extra)
+        return f" WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    def _fetch(self, number: int, operator: Optional[str] = None, start: Any = None) -> Page:
+        """
+        Read one page starting at (or after / before) a key.
+
+        Args:
+            number: Page number the result represents
+            operator: ">", ">=" or "<" comparison against start, or None for the first page
+            start: Key value to seek from
+        """
+        version = self.db.version(self.table)
+        backward = operator == "<"
+        params = list(self.params)
+        seek = None
+        if operator:
+            seek = f"{self.key} {operator} ?"
+            params.append(start)
+        params.append(self.page_size + 1)
+
+        query = (
+            f"SELECT {self.key}, {', '.join(self.columns)} FROM {self.table}"
+            f"{self.where_clause(seek)}"
+            f" ORDER BY {self.key} {'DESC' if backward else 'ASC'} LIMIT ?"
+        )
+
+        with self.db.connection() as conn:
+            cursor = conn.execute(query, params)
+            names = [description[0] for description in cursor.description][1:]
+            fetched = cursor.fetchall()
+
+        has_more = len(fetched) > self.page_size
+        fetched = fetched[:self.page_size]
+        if backward:
+            fetched.reverse()
+
+        page = Page(
+            number=number,
+            rows=[dict(zip(names, row[1:])) for row in fetched],
+            keys=[row[0] for row in fetched],
+            # Walking backwards always leaves the page we came from after this one
+            has_next=True if backward else has_more,
+            version=version,
+        )
+        with self._lock:
+            self._last = page
+        return page
+
+    def boundaries(self) -> List[Any]:
+        """
+        Return the first key of every page, rebuilding the index if the table changed.
+
+        Returns:
+            List where item i is the smallest key on page i + 1
+        """
+        version = self.db.version(self.table)
+        with self._lock:
+            cached = self._boundaries
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        query = (
+            f"SELECT {self.key} FROM ("
+            f"SELECT {self.key}, ROW_NUMBER() OVER (ORDER BY {self.key}) AS RowNumber"
+            f" FROM {self.table}{self.where_clause()}"
+            f") WHERE (RowNumber - 1) % ? = 0 ORDER BY {self.key}"
+        )
+        with self.db.connection() as conn:
+            keys = [row[0] for row in conn.execute(query, self.params + (self.page_size,))]
+
+        with self._lock:
+            self._boundaries = (version, keys)
+        return keys
+
+    def stream(self, batch_size: int = 1000) -> Iterator[List[Tuple[Any, ...]]]:
+        """
+        Yield every row of the query in key order, batch_size rows at a time.
+
+        All rows come from a single cursor read with fetchmany, so memory use stays the same
+        however many rows match. The connection is held until the generator is exhausted or closed.
+
+        Args:
+            batch_size: Number of rows per batch
+
+        Returns:
+            Iterator over lists of row tuples, in the order of the paginator's columns
+        """
+        query = (
+            f"SELECT {', '.join(self.columns)} FROM {self.table}"
+            f"{self.where_clause()} ORDER BY {self.key}"
+        )
+        with self.db.connection() as conn:
+            cursor = conn.execute(query, self.params)
+            try:
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    yield rows
+            finally:
+                cursor.close()
+
+    def count(self) -> int:
+        """Return the number of rows matching the query, from the shared count cache."""
+        return self.db.counts.count(self.table, self.where, self.params)
+
+    def page_count(self) -> int:
+        """Return the number of pages the query currently spans."""
+        return len(self.boundaries())
+
+    def first_page(self) -> Page:
+        return self._fetch(1)
+
+    def last_page(self) -> Page:
+        return self.page(max(self.page_count(), 1))
+
+    def seek(self, token: str) -> Page:
+        """
+        Fetch the page a next/previous token points to.
+
+        Args:
+            token: Page.next_token or Page.previous_token of a page served earlier
+
+        Returns:
+            The neighbouring page
+        """
+        cursor = json.loads(token)
+        if 'after' in cursor:
+            return self._fetch(cursor['page'], ">", cursor['after'])
+        return self._fetch(cursor['page'], "<", cursor['before'])
+
+    def page(self, number: int) -> Page:
+        """
+        Fetch a page by number.
+
+        Moving one page forward or back from the last page served seeks from its keys;
+        any other jump looks up the page's first key in the boundary index.
+
+        Args:
+            number: Page number, starting at 1
+
+        Returns:
+            The requested page (empty if the number is past the end)
+        """
+        with self._lock:
+            last = self._last
+        if last is not None and last.version == self.db.version(self.table) and last.keys:
+            if number == last.number:
+                return self._fetch(number, ">=", last.keys[0])
+            if number == last.number + 1 and last.next_token:
+                return self.seek(last.next_token)
+            if number == last.number - 1 and last.previous_token:
+                return self.seek(last.previous_token)
+
+        if number <= 1:
+            return self.first_page()
+
+        boundaries = self.boundaries()
+        if number > len(boundaries):
+            return Page(number, [], [], False, self.db.version(self.table))
+        return self._fetch(number, ">=", boundaries[number - 1])
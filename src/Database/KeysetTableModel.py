@@ -0,0 +1,199 @@
+from typing import Any, Dict, List, Optional, Sequence
+
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, pyqtSignal
+
+from Database.KeysetPaginator import KeysetPaginator, Page
+from Database.QueryExecutor import QueryExecutor
+
+
+class KeysetTableModel(QAbstractTableModel):
+    """
+    Table model for QTableView backed by a KeysetPaginator.
+
+    reset() shows the rows of one page; as the view scrolls past the end, canFetchMore() and
+    fetchMore() append the following pages, each read on the owning view's QueryExecutor.
+    No widgets are created per row: status pills, checkboxes and action buttons are painted
+    by the delegates in Component.TableDelegates.
+
+    Columns listed as checkable hold 0/1 values and are exposed through Qt.CheckStateRole.
+    Toggling one updates the loaded row and emits checkToggled so the owner can persist it.
+    The SELECTED column shows whether a row's key is in the shared `selected` set.
+    """
+
+    # Virtual column mirroring membership of the row's key in `selected`
+    SELECTED = '_selected'
+
+    # Row number, column name, new state
+    checkToggled = pyqtSignal(int, str, bool)
+    # Emitted with the number of rows after a page has been shown by reset() or show_page()
+    loaded = pyqtSignal(int)
+
+    def __init__(self, columns: Sequence[Optional[str]], headers: Sequence[str], loader: QueryExecutor,
+                 checkable: Sequence[str] = (), selected: Optional[set] = None,
+                 alignment=Qt.AlignLeft | Qt.AlignVCenter, parent=None):
+        """
+        Initialize an empty model.
+
+        Args:
+            columns: Row field shown in each column; None (or any name the rows lack) leaves it empty
+            headers: Header label of each column
+            loader: Executor of the owning view, used for every page read
+            checkable: Columns holding 0/1 values shown as checkboxes
+            selected: Set of row keys shown as checked in the SELECTED column
+            alignment: Text alignment of the cells
+            parent: Owning QObject
+        """
+        super().__init__(parent)
+        self.columns = list(columns)
+        self.headers = list(headers)
+        self.loader = loader
+        self.checkable = set(checkable)
+        self.selected = selected if selected is not None else set()
+        self.alignment = alignment
+
+        self.paginator: Optional[KeysetPaginator] = None
+        self._rows: List[Dict[str, Any]] = []
+        self._keys: List[Any] = []
+        self._last: Optional[Page] = None
+        self._first_number = 1
+
+    def reset(self, paginator: KeysetPaginator, number: int = 1):
+        """
+        Load one page on the executor and show it in place of the current rows.
+
+        Args:
+            paginator: Query to show
+            number: Page to start from
+        """
+        self.loader.submit(
+            paginator.page, number,
+            on_result=lambda page: self.show_page(paginator, page)
+        )
+
+    def show_page(self, paginator: KeysetPaginator, page: Page):
+        """
+        Show a page the owner has already loaded, replacing the current rows.
+
+        Args:
+            paginator: Query the page was read from; further pages are fetched from it
+            page: Page to show
+        """
+        self.beginResetModel()
+        self.paginator = paginator
+        self._rows = list(page.rows)
+        self._keys = list(page.keys)
+        self._last = page
+        self._first_number = page.number
+        self.endResetModel()
+        self.loaded.emit(len(self._rows))
+
+    def refresh(self):
+        """Reload from the page currently shown first, e.g. after a write."""
+        if self.paginator is not None:
+            self.reset(self.paginator, self._first_number)
+
+    def row(self, number: int) -> Dict[str, Any]:
+        """Return the loaded row at a position as a dictionary."""
+        return self._rows[number]
+
+    def key(self, number: int) -> Any:
+        """Return the primary key of the loaded row at a position."""
+        return self._keys[number]
+
+    def set_value(self, number: int, column: str, value: Any):
+        """Update a field of a loaded row (after it was written to the database) and repaint it."""
+        self._rows[number][column] = value
+        if column in self.columns:
+            index = self.index(number, self.columns.index(column))
+            self.dataChanged.emit(index, index)
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.columns)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole and section < len(self.headers):
+            return self.headers[section]
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        flags = Qt.ItemIsEnabled | Qt.ItemIsSelectable
+        if self._is_checkbox(self.columns[index.column()]):
+            flags |= Qt.ItemIsUserCheckable
+        return flags
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        column = self.columns[index.column()]
+
+        if column == self.SELECTED:
+            value = self._keys[index.row()] in self.selected
+        else:
+            value = self._rows[index.row()].get(column)
+
+        if role == Qt.CheckStateRole:
+            if self._is_checkbox(column):
+                return Qt.Checked if value else Qt.Unchecked
+            return None
+        if role == Qt.DisplayRole:
+            if self._is_checkbox(column) or value is None:
+                return None
+            return str(value)
+        if role == Qt.EditRole:
+            return value
+        if role == Qt.TextAlignmentRole:
+            return int(self.alignment)
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role != Qt.CheckStateRole:
+            return False
+        column = self.columns[index.column()]
+        if not self._is_checkbox(column):
+            return False
+
+        checked = value == Qt.Checked
+        if column == self.SELECTED:
+            if checked:
+                self.selected.add(self._keys[index.row()])
+            else:
+                self.selected.discard(self._keys[index.row()])
+        else:
+            self._rows[index.row()][column] = 1 if checked else 0
+
+        self.dataChanged.emit(index, index, [role])
+        self.checkToggled.emit(index.row(), column, checked)
+        return True
+
+    def canFetchMore(self, parent=QModelIndex()) -> bool:
+        if parent.isValid() or self._last is None or self.loader.loading:
+            return False
+        return self._last.next_token is not None
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        paginator = self.paginator
+        self.loader.submit(
+            paginator.seek, self._last.next_token,
+            on_result=lambda page: self._append(paginator, page)
+        )
+
+    def _append(self, paginator: KeysetPaginator, page: Page):
+        # Drop pages of a query that was replaced while they were loading
+        if paginator is not self.paginator or not page.rows:
+            return
+        start = len(self._rows)
+        self.beginInsertRows(QModelIndex(), start, start + len(page.rows) - 1)
+        self._rows.extend(page.rows)
+        self._keys.extend(page.keys)
+        self._last = page
+        self.endInsertRows()
+
+    def _is_checkbox(self, column: Optional[str]) -> bool:
+        return column == self.SELECTED or column in self.checkable
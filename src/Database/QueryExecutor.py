@@ -0,0 +1,165 @@
+from typing import Any, Callable, Optional
+
+from PyQt5.QtCore import Qt, QObject, QRunnable, QThreadPool, pyqtSignal
+from PyQt5.QtWidgets import QWidget
+
+from Database.QueryProfiler import QueryProfiler
+
+
+class _QuerySignals(QObject):
+    """Signals a _QueryTask emits from the worker thread; delivered queued on the GUI thread."""
+    finished = pyqtSignal(int, object)
+    failed = pyqtSignal(int, str)
+
+
+class _QueryTask(QRunnable):
+    """A single database read submitted to the shared thread pool."""
+
+    def __init__(self, ticket: int, fn: Callable, args: tuple, kwargs: dict):
+        super().__init__()
+        # The executor keeps the Python wrapper alive until a signal comes back
+        self.setAutoDelete(False)
+        self.ticket = ticket
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.cancelled = False
+        self.signals = _QuerySignals()
+        # Statements of the read count towards the screen that submitted it
+        self.screen = QueryProfiler.instance().current_screen()
+
+    def run(self):
+        if self.cancelled:
+            self.signals.failed.emit(self.ticket, "")
+            return
+        try:
+            with QueryProfiler.instance().attributed(self.screen):
+                result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            self.signals.failed.emit(self.ticket, str(e))
+            return
+        self.signals.finished.emit(self.ticket, result)
+
+
+class QueryExecutor(QObject):
+    """
+    Runs database reads for one view on a background QThreadPool.
+
+    Each view owns an executor and submits its page loads through it. Submitting a new
+    request supersedes the previous one: a request still queued is withdrawn, and the
+    result of one already running is discarded, so flipping pages quickly only renders
+    the last page asked for. Results and errors are delivered on the GUI thread.
+    While a request is outstanding the owning widget shows a busy cursor and
+    loadingChanged is emitted.
+    """
+
+    loadingChanged = pyqtSignal(bool)
+
+    # Reads are short and SQLite serializes writers anyway, so a small pool is enough
+    MAX_THREADS = 2
+
+    _pool: Optional[QThreadPool] = None
+
+    def __init__(self, parent: Optional[QObject] = None):
+        """
+        Initialize the executor.
+
+        Args:
+            parent: Owning view; it gets a busy cursor while a request is outstanding
+        """
+        super().__init__(parent)
+        self._ticket = 0
+        self._current: Optional[_QueryTask] = None
+        self._callbacks = (None, None)
+        self._tasks = set()
+        self.loading = False
+
+    @classmethod
+    def pool(cls) -> QThreadPool:
+        """Return the thread pool shared by every executor."""
+        if cls._pool is None:
+            cls._pool = QThreadPool()
+            cls._pool.setMaxThreadCount(cls.MAX_THREADS)
+        return cls._pool
+
+    def submit(self, fn: Callable, *args, on_result: Callable[[Any], None] = None,
+               on_error: Callable[[str], None] = None, **kwargs) -> int:
+        """
+        Run fn(*args, **kwargs) on the pool, replacing any outstanding request.
+
+        fn must only touch the database, never widgets.
+
+        Args:
+            fn: Callable performing the read
+            *args: Positional arguments for fn
+            on_result: Called on the GUI thread with fn's return value
+            on_error: Called on the GUI thread with the error message if fn raises
+            **kwargs: Keyword arguments for fn
+
+        Returns:
+            Ticket identifying the request
+        """
+        self.cancel()
+
+        self._ticket += 1
+        task = _QueryTask(self._ticket, fn, args, kwargs)
+        task.signals.finished.connect(self._on_finished, Qt.QueuedConnection)
+        task.signals.failed.connect(self._on_failed, Qt.QueuedConnection)
+        self._tasks.add(task)
+        self._current = task
+        self._callbacks = (on_result, on_error)
+
+        self._set_loading(True)
+        self.pool().start(task)
+        return self._ticket
+
+    def cancel(self):
+        """Withdraw the outstanding request, if any; its result will not be delivered."""
+        task = self._current
+        if task is None:
+            return
+
+        task.cancelled = True
+        self._current = None
+        self._callbacks = (None, None)
+        if self.pool().tryTake(task):
+            self._tasks.discard(task)
+        self._set_loading(False)
+
+    def _set_loading(self, loading: bool):
+        if loading == self.loading:
+            return
+        self.loading = loading
+
+        parent = self.parent()
+        if isinstance(parent, QWidget):
+            if loading:
+                parent.setCursor(Qt.BusyCursor)
+            else:
+                parent.unsetCursor()
+        self.loadingChanged.emit(loading)
+
+    def _take(self, ticket: int):
+        """Forget the finished task and return the callbacks if it is still the current request."""
+        self._tasks = {task for task in self._tasks if task.ticket != ticket}
+        if self._current is None or self._current.ticket != ticket:
+            return None
+
+        callbacks = self._callbacks
+        self._current = None
+        self._callbacks = (None, None)
+        self._set_loading(False)
+        return callbacks
+
+    def _on_finished(self, ticket: int, result: Any):
+        callbacks = self._take(ticket)
+        if callbacks and callbacks[0]:
+            callbacks[0](result)
+
+    def _on_failed(self, ticket: int, message: str):
+        callbacks = self._take(ticket)
+        if callbacks:
+            if callbacks[1]:
+                callbacks[1](message)
+            else:
+                print(f"Error loading data: {message}")
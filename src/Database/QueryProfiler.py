@@ -0,0 +1,402 @@
+import re
+import sqlite3
+import threading
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from time import perf_counter
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+@dataclass
+class StatementStats:
+    """Running totals of one statement on one screen."""
+    screen: str
+    sql: str
+    calls: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    rows: int = 0
+
+    @property
+    def avg_ms(self) -> float:
+        return self.total_ms / self.calls if self.calls else 0.0
+
+
+@dataclass
+class SlowQuery:
+    """One execution that took longer than the slow threshold, with its query plan."""
+    timestamp: str
+    screen: str
+    sql: str
+    ms: float
+    rows: int
+    plan: List[str] = field(default_factory=list)
+
+
+class _Execution:
+    """
+    Time and rows of one execute() call and the fetches that follow it.
+
+    Only the cursor's thread touches it until it is finished, so it is updated without locking.
+    """
+    __slots__ = ('key', 'connection', 'params', 'slow_ms', 'ms', 'rows', 'slow')
+
+    def __init__(self, key: Tuple[str, str], connection: sqlite3.Connection, params: Any, slow_ms: float):
+        self.key = key
+        self.connection = connection
+        self.params = params
+        self.slow_ms = slow_ms
+        self.ms = 0.0
+        self.rows = 0
+        self.slow: Optional[SlowQuery] = None
+
+
+class QueryProfiler:
+    """
+    Process-wide record of how long every SQLite statement takes.
+
+    Connections opened by ConnectionManager use ProfiledConnection, whose cursors report each
+    execute() and the fetches that follow it here. Statements are totalled per screen (see
+    attributed()); an execution slower than slow_ms is also kept in a bounded slow log together
+    with its EXPLAIN QUERY PLAN. The diagnostics panel in MenuUI shows both, and write_report()
+    saves them to a file.
+    """
+
+    # Executions at least this slow are logged with their query plan
+    SLOW_MS = 50.0
+    # Slow executions kept, oldest dropped first
+    SLOW_LOG_SIZE = 200
+    # Distinct (screen, statement) pairs tracked before the rest are lumped together
+    MAX_STATEMENTS = 1000
+
+    OTHER = "(other statements)"
+    UNATTRIBUTED = "(background)"
+
+    # Statements EXPLAIN QUERY PLAN is run for
+    EXPLAINABLE = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+    # Placeholder lists of any length, as in "NomorPlat IN (?, ?, ?)"
+    _PLACEHOLDER_LIST = re.compile(r'\?(?:\s*,\s*\?)+')
+
+    _instance = None
+
+    def __init__(self, slow_ms: float = SLOW_MS):
+        """
+        Initialize an empty profiler.
+
+        Args:
+            slow_ms: Executions at least this many milliseconds long go to the slow log
+        """
+        self.enabled = True
+        self.slow_ms = slow_ms
+        self.screen = self.UNATTRIBUTED
+        self.started = datetime.now()
+
+        self._stats: Dict[Tuple[str, str], StatementStats] = {}
+        self._slow: "deque[SlowQuery]" = deque(maxlen=self.SLOW_LOG_SIZE)
+        self._normalized: Dict[str, str] = {}
+        self._plans: Dict[str, List[str]] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @classmethod
+    def instance(cls) -> "QueryProfiler":
+        """Return the process-wide profiler."""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def current_screen(self) -> str:
+        """Screen the current thread's statements are counted towards."""
+        return getattr(self._local, 'screen', None) or self.screen
+
+    @contextmanager
+    def attributed(self, screen: Optional[str]) -> Iterator[None]:
+        """
+        Count the statements the current thread runs inside the block towards a screen.
+
+        Args:
+            screen: Screen name; None keeps the current attribution
+        """
+        previous = getattr(self._local, 'screen', None)
+        self._local.screen = screen or previous
+        try:
+            yield
+        finally:
+            self._local.screen = previous
+
+    def _normalize(self, sql: str) -> str:
+        """Collapse whitespace and placeholder lists so variants of a statement share one entry."""
+        normalized = self._normalized.get(sql)
+        if normalized is None:
+            normalized = self._PLACEHOLDER_LIST.sub('?, ...', ' '.join(sql.split()))
+            if len(self._normalized) >= self.MAX_STATEMENTS:
+                self._normalized.clear()
+            self._normalized[sql] = normalized
+        return normalized
+
+    def begin(self, connection: sqlite3.Connection, sql: str, params: Any) -> _Execution:
+        """Start recording one execution of a statement; called by ProfiledCursor."""
+        return _Execution((self.current_screen(), self._normalize(sql)), connection, params, self.slow_ms)
+
+    def mark_slow(self, execution: _Execution):
+        """Add an execution that has reached the slow threshold to the slow log, with its plan."""
+        screen, sql = execution.key
+        execution.slow = SlowQuery(
+            datetime.now().isoformat(sep=' ', timespec='seconds'), screen, sql, execution.ms, execution.rows
+        )
+        with self._lock:
+            self._slow.append(execution.slow)
+        execution.slow.plan = self.plan(execution.connection, sql, execution.params)
+        execution.params = None
+
+    def finish(self, execution: _Execution):
+        """
+        Add a completed execution to its statement's totals.
+
+        Args:
+            execution: Execution returned by begin(), after its last fetch
+        """
+        with self._lock:
+            stats = self._stats.get(execution.key)
+            if stats is None:
+                key = execution.key
+                if len(self._stats) >= self.MAX_STATEMENTS:
+                    key = (key[0], self.OTHER)
+                    stats = self._stats.get(key)
+                if stats is None:
+                    stats = self._stats[key] = StatementStats(*key)
+            stats.calls += 1
+            stats.total_ms += execution.ms
+            stats.rows += execution.rows
+            stats.max_ms = max(stats.max_ms, execution.ms)
+            if execution.slow is not None:
+                execution.slow.ms = execution.ms
+                execution.slow.rows = execution.rows
+
+    def plan(self, connection: sqlite3.Connection, sql: str, params: Any) -> List[str]:
+        """
+        Return the EXPLAIN QUERY PLAN of a statement as indented lines, cached per statement.
+
+        Args:
+            connection: Connection the statement ran on
+            sql: Normalized statement
+            params: Parameters it ran with
+
+        Returns:
+            Plan lines, or a single line explaining why there is none
+        """
+        cached = self._plans.get(sql)
+        if cached is not None:
+            return cached
+        if sql == self.OTHER or not sql.upper().startswith(self.EXPLAINABLE):
+            return []
+        if '?, ...' in sql:
+            return ["(no plan: statement with a variable-length parameter list)"]
+
+        try:
+            # A plain cursor, so the EXPLAIN itself is not profiled
+            cursor = sqlite3.Cursor(connection)
+            try:
+                rows = cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params or ()).fetchall()
+            finally:
+                cursor.close()
+        except (sqlite3.Error, ValueError, TypeError) as e:
+            return [f"(no plan: {e})"]
+
+        depth = {0: -1}
+        lines = []
+        for node, parent, _, detail in rows:
+            depth[node] = depth.get(parent, -1) + 1
+            lines.append("  " * depth[node] + detail)
+
+        with self._lock:
+            if len(self._plans) >= self.MAX_STATEMENTS:
+                self._plans.clear()
+            self._plans[sql] = lines
+        return lines
+
+    def statements(self) -> List[StatementStats]:
+        """Return a snapshot of the statement totals, slowest in total first."""
+        with self._lock:
+            stats = [StatementStats(s.screen, s.sql, s.calls, s.total_ms, s.max_ms, s.rows)
+                     for s in self._stats.values()]
+        return sorted(stats, key=lambda s: s.total_ms, reverse=True)
+
+    def slow_queries(self) -> List[SlowQuery]:
+        """Return a snapshot of the slow log, newest first."""
+        with self._lock:
+            return [SlowQuery(q.timestamp, q.screen, q.sql, q.ms, q.rows, list(q.plan))
+                    for q in reversed(self._slow)]
+
+    def reset(self):
+        """Forget every recorded statement and slow execution."""
+        with self._lock:
+            self._stats.clear()
+            self._slow.clear()
+            self.started = datetime.now()
+
+    def report(self, limit: int = 50) -> str:
+        """
+        Format the recorded statements and slow log as plain text.
+
+        Args:
+            limit: Statements listed, slowest in total first
+
+        Returns:
+            The report
+        """
+        statements = self.statements()
+        slow = self.slow_queries()
+        lines = [
+            "CarGoOwner query report",
+            f"Recorded from {self.started.isoformat(sep=' ', timespec='seconds')} "
+            f"to {datetime.now().isoformat(sep=' ', timespec='seconds')}",
+            f"SQLite {sqlite3.sqlite_version}, slow threshold {self.slow_ms:g} ms",
+            "",
+            f"Statements by total time ({min(limit, len(statements))} of {len(statements)})",
+            f"{'total ms':>10} {'calls':>7} {'avg ms':>9} {'max ms':>9} {'rows':>9}  screen / statement",
+        ]
+        for stats in statements[:limit]:
+            lines.append(f"{stats.total_ms:10.1f} {stats.calls:7d} {stats.avg_ms:9.2f} {stats.max_ms:9.2f} "
+                         f"{stats.rows:9d}  {stats.screen}: {stats.sql}")
+
+        lines += ["", f"Slow executions (>= {self.slow_ms:g} ms), newest first: {len(slow)}"]
+        for query in slow:
+            lines += ["", f"{query.timestamp}  {query.ms:.1f} ms  {query.rows} rows  {query.screen}", f"  {query.sql}"]
+            lines += [f"    {line}" for line in query.plan]
+        return "\n".join(lines) + "\n"
+
+    def write_report(self, path, limit: int = 50):
+        """
+        Save report() to a text file.
+
+        Args:
+            path: Target file
+            limit: Statements listed
+        """
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(self.report(limit))
+
+
+class ProfiledCursor(sqlite3.Cursor):
+    """
+    Cursor reporting the time and rows of every execute and fetch to the QueryProfiler.
+
+    An execution is finished, and added to the totals, once its rows are exhausted, when the
+    cursor runs another statement or is closed, or when it is garbage collected.
+    """
+
+    _execution: Optional[_Execution] = None
+
+    def _run(self, method, sql, params, *args):
+        self._finish()
+        profiler = QueryProfiler.instance()
+        if not profiler.enabled:
+            return method(sql, *args)
+
+        execution = profiler.begin(self.connection, sql, params)
+        started = perf_counter()
+        try:
+            result = method(sql, *args)
+        finally:
+            execution.ms += (perf_counter() - started) * 1000
+            self._execution = execution
+        execution.rows = max(self.rowcount, 0)
+        if execution.ms >= execution.slow_ms:
+            profiler.mark_slow(execution)
+        if self.description is None:
+            # Nothing to fetch
+            self._finish()
+        return result
+
+    def _fetched(self, started: float, rows: int, done: bool):
+        execution = self._execution
+        if execution is None:
+            return
+        execution.ms += (perf_counter() - started) * 1000
+        execution.rows += rows
+        if execution.slow is None and execution.ms >= execution.slow_ms:
+            QueryProfiler.instance().mark_slow(execution)
+        if done:
+            self._finish()
+
+    def _finish(self):
+        execution = self._execution
+        if execution is not None:
+            self._execution = None
+            QueryProfiler.instance().finish(execution)
+
+    def execute(self, sql, parameters=()):
+        return self._run(super().execute, sql, parameters, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        # Consumed once by SQLite, so a generator cannot also provide the plan's parameters
+        rows = seq_of_parameters if isinstance(seq_of_parameters, (list, tuple)) else None
+        return self._run(super().executemany, sql, rows[0] if rows else None, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self._run(super().executescript, sql_script, None)
+
+    def fetchone(self):
+        started = perf_counter()
+        row = super().fetchone()
+        self._fetched(started, row is not None, row is None)
+        return row
+
+    def fetchmany(self, size=None):
+        size = self.arraysize if size is None else size
+        started = perf_counter()
+        rows = super().fetchmany(size)
+        self._fetched(started, len(rows), len(rows) < size)
+        return rows
+
+    def fetchall(self):
+        started = perf_counter()
+        rows = super().fetchall()
+        self._fetched(started, len(rows), True)
+        return rows
+
+    def __next__(self):
+        execution = self._execution
+        if execution is None:
+            return super().__next__()
+        started = perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._fetched(started, 0, True)
+            raise
+        execution.ms += (perf_counter() - started) * 1000
+        execution.rows += 1
+        if execution.slow is None and execution.ms >= execution.slow_ms:
+            QueryProfiler.instance().mark_slow(execution)
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        try:
+            self._finish()
+        except Exception:
+            pass
+
+
+class ProfiledConnection(sqlite3.Connection):
+    """Connection whose cursors, including those behind the execute() shortcuts, are ProfiledCursors."""
+
+    def cursor(self, factory=ProfiledCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
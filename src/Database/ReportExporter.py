@@ -0,0 +1,191 @@
+import csv
+import os
+from pathlib import Path
+from typing import Callable, Optional, Sequence
+
+from PyQt5.QtCore import Qt, QObject, QRunnable, QThreadPool, pyqtSignal
+
+from Database.KeysetPaginator import KeysetPaginator
+
+try:
+    from openpyxl import Workbook
+except ImportError:
+    Workbook = None
+
+
+# Rows fetched from the cursor and written per step
+BATCH_SIZE = 1000
+
+
+def export_formats():
+    """
+    Return the export formats available in this installation.
+
+    Returns:
+        Dictionary of file extension to file dialog filter; XLSX needs openpyxl
+    """
+    formats = {'.csv': "CSV (*.csv)"}
+    if Workbook is not None:
+        formats['.xlsx'] = "Excel Workbook (*.xlsx)"
+    return formats
+
+
+def export_report(paginator: KeysetPaginator, headers: Sequence[str], path,
+                  progress: Optional[Callable[[int], None]] = None,
+                  cancelled: Optional[Callable[[], bool]] = None) -> int:
+    """
+    Write every row of a report query to a CSV or XLSX file.
+
+    Rows are streamed from KeysetPaginator.stream() in batches and written as they arrive,
+    so memory use does not grow with the number of rows. The file is written under a
+    temporary name and only moved into place once complete.
+
+    Args:
+        paginator: Query of the report, with the filter currently applied
+        headers: Header row, one label per paginator column
+        path: Target file; the format follows its extension (.csv or .xlsx)
+        progress: Called with the number of rows written after each batch
+        cancelled: Polled between batches; the export stops and leaves no file when it returns True
+
+    Returns:
+        Number of rows written, or -1 if the export was cancelled
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix not in export_formats():
+        if suffix == '.xlsx':
+            raise Exception("Error exporting report: XLSX export requires the openpyxl package")
+        raise Exception(f"Error exporting report: unsupported file type {path.suffix}")
+
+    partial = path.with_name(path.name + '.part')
+    batches = paginator.stream(BATCH_SIZE)
+    written = 0
+    try:
+        if suffix == '.xlsx':
+            workbook = Workbook(write_only=True)
+            sheet = workbook.create_sheet(paginator.table)
+            sheet.append(list(headers))
+            for rows in batches:
+                if cancelled and cancelled():
+                    return -1
+                for row in rows:
+                    sheet.append(row)
+                written += len(rows)
+                if progress:
+                    progress(written)
+            workbook.save(partial)
+        else:
+            # utf-8-sig so spreadsheet programs detect the encoding
+            with open(partial, 'w', encoding='utf-8-sig', newline='') as file:
+                writer = csv.writer(file)
+                writer.writerow(headers)
+                for rows in batches:
+                    if cancelled and cancelled():
+                        return -1
+                    writer.writerows(rows)
+                    written += len(rows)
+                    if progress:
+                        progress(written)
+
+        os.replace(partial, path)
+        return written
+    finally:
+        batches.close()
+        if partial.exists():
+            partial.unlink()
+
+
+class _ExportSignals(QObject):
+    progress = pyqtSignal(int)
+    finished = pyqtSignal(int)
+    failed = pyqtSignal(str)
+
+
+class _ExportTask(QRunnable):
+    """Runs export_report on a pool thread and reports back through signals."""
+
+    def __init__(self, paginator: KeysetPaginator, headers: Sequence[str], path: Path):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.paginator = paginator
+        self.headers = list(headers)
+        self.path = path
+        self.cancelled = False
+        self.signals = _ExportSignals()
+
+    def run(self):
+        try:
+            written = export_report(
+                self.paginator, self.headers, self.path,
+                progress=self.signals.progress.emit,
+                cancelled=lambda: self.cancelled
+            )
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+            return
+        self.signals.finished.emit(written)
+
+
+class ReportExporter(QObject):
+    """
+    Exports a report on a background thread.
+
+    Uses its own thread pool rather than QueryExecutor's, so a long export never holds up
+    the page loads of the views. Signals are delivered on the GUI thread.
+    """
+
+    # Rows written so far
+    progress = pyqtSignal(int)
+    # Rows written in total, or -1 if the export was cancelled
+    finished = pyqtSignal(int)
+    failed = pyqtSignal(str)
+
+    _pool: Optional[QThreadPool] = None
+
+    def __init__(self, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self._task: Optional[_ExportTask] = None
+
+    @classmethod
+    def pool(cls) -> QThreadPool:
+        """Return the thread pool exports run on, one at a time."""
+        if cls._pool is None:
+            cls._pool = QThreadPool()
+            cls._pool.setMaxThreadCount(1)
+        return cls._pool
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self, paginator: KeysetPaginator, headers: Sequence[str], path):
+        """
+        Start exporting a report.
+
+        Args:
+            paginator: Query of the report
+            headers: Header row, one label per paginator column
+            path: Target .csv or .xlsx file
+        """
+        if self._task is not None:
+            raise Exception("Error exporting report: an export is already running")
+
+        task = _ExportTask(paginator, headers, Path(path))
+        task.signals.progress.connect(self.progress, Qt.QueuedConnection)
+        task.signals.finished.connect(self._on_finished, Qt.QueuedConnection)
+        task.signals.failed.connect(self._on_failed, Qt.QueuedConnection)
+        self._task = task
+        self.pool().start(task)
+
+    def cancel(self):
+        """Ask the running export to stop; finished is emitted with -1 once it has."""
+        if self._task is not None:
+            self._task.cancelled = True
+
+    def _on_finished(self, written: int):
+        self._task = None
+        self.finished.emit(written)
+
+    def _on_failed(self, message: str):
+        self._task = None
+        self.failed.emit(message)
@@ -0,0 +1,131 @@
+import re
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+# Field rules shared by the entry forms and the bulk importer.
+# Each validate_*_field function returns (is_valid, message), where message describes the rule.
+
+PLATE_PATTERN = re.compile(r'[A-Z]{1,2}\s\d{1,4}\s[A-Z]{1,3}')
+YEAR_PATTERN = re.compile(r'\d{4}')
+FLAG_PATTERN = re.compile(r'[01]')
+DATE_FORMAT = "%Y-%m-%d"
+
+# Fields each table needs in a record; other known fields may be left empty
+REQUIRED_FIELDS = {
+    'Mobil': ['NomorPlat', 'Model', 'Warna', 'Tahun', 'StatusKetersediaan'],
+    'Pelanggan': ['NIK', 'Nama', 'Kontak', 'Alamat'],
+    'Peminjaman': ['Nama', 'NIK', 'NomorPlat', 'Kontak', 'TanggalPeminjaman',
+                   'TenggatPengembalian', 'TenggatPembayaran', 'BesarPembayaran'],
+}
+
+
+def validate_mobil_field(field: str, text: str) -> Tuple[bool, str]:
+    """
+    Check one Mobil field against the rules of MobilUI.formMobil.
+
+    Args:
+        field: Column name
+        text: Value as entered
+
+    Returns:
+        Tuple of whether the value is valid and the message describing the rule
+    """
+    # The form matches from the start of the value only, as re.match does
+    if field == 'NomorPlat':
+        return bool(PLATE_PATTERN.match(text)), "Nomor plat harus berupa kombinasi huruf dan angka"
+    if field == 'Tahun':
+        return bool(YEAR_PATTERN.match(text)), "Tahun harus berupa angka 4 digit"
+    if field == 'StatusKetersediaan':
+        return bool(FLAG_PATTERN.match(text)), "Status ketersediaan harus berupa angka 0 atau 1"
+    return bool(text), "Field ini tidak boleh kosong"
+
+
+def validate_pelanggan_field(field: str, text: str) -> Tuple[bool, str]:
+    """
+    Check one Pelanggan field against the rules of PelangganUI.formPelanggan.
+
+    Args:
+        field: Column name
+        text: Value as entered
+
+    Returns:
+        Tuple of whether the value is valid and the message describing the rule
+    """
+    if field == 'NIK':
+        return len(text) == 16 and text.isdigit(), "NIK must be exactly 16 digits"
+    if field == 'Nama':
+        return bool(text) and all(c.isalpha() or c.isspace() for c in text), "Name must contain only letters"
+    if field == 'Kontak':
+        return bool(text) and text.isdigit(), "Contact must contain only numbers"
+    if field == 'Alamat':
+        return bool(text) and len(text) <= 30, "Address must not be empty and max 30 characters"
+    if field == 'CreditPoint':
+        return text.isdigit(), "Credit point must be a whole number"
+    if field == 'StatusPinjam':
+        return bool(FLAG_PATTERN.fullmatch(text)), "Status pinjam must be 0 or 1"
+    return True, ""
+
+
+def validate_peminjaman_field(field: str, text: str) -> Tuple[bool, str]:
+    """
+    Check one Peminjaman field; customer and car fields follow the Pelanggan and Mobil rules.
+
+    Args:
+        field: Column name
+        text: Value as entered
+
+    Returns:
+        Tuple of whether the value is valid and the message describing the rule
+    """
+    if field in ('NIK', 'Nama', 'Kontak'):
+        return validate_pelanggan_field(field, text)
+    if field == 'NomorPlat':
+        return validate_mobil_field(field, text)
+    if field.startswith('Tanggal') or field.startswith('Tenggat'):
+        try:
+            datetime.strptime(text, DATE_FORMAT)
+            return True, ""
+        except ValueError:
+            return False, f"{field} must be a date formatted as YYYY-MM-DD"
+    if field == 'BesarPembayaran':
+        return text.isdigit(), "Payment amount must be a whole number"
+    if field in ('StatusPengembalian', 'StatusPembayaran'):
+        return bool(FLAG_PATTERN.fullmatch(text)), f"{field} must be 0 or 1"
+    return True, ""
+
+
+FIELD_VALIDATORS = {
+    'Mobil': validate_mobil_field,
+    'Pelanggan': validate_pelanggan_field,
+    'Peminjaman': validate_peminjaman_field,
+}
+
+
+def validate_record(table: str, record: Dict[str, Any]) -> Optional[str]:
+    """
+    Validate a whole record of one table.
+
+    Required fields must be present; optional fields are only checked when they have a value.
+
+    Args:
+        table: "Mobil", "Pelanggan" or "Peminjaman"
+        record: Field values, converted to text before checking
+
+    Returns:
+        The first rule broken, or None if the record is valid
+    """
+    validate_field = FIELD_VALIDATORS[table]
+    required = REQUIRED_FIELDS[table]
+
+    for field in required:
+        value = record.get(field)
+        if value is None or str(value).strip() == "":
+            return f"{field} is required"
+
+    for field, value in record.items():
+        if value is None or str(value).strip() == "":
+            continue
+        is_valid, message = validate_field(field, str(value).strip())
+        if not is_valid:
+            return message
+    return None
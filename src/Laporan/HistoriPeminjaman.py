@@ -1,14 +1,27 @@
 import sys
 import os
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
-                           QLabel, QTableWidget, QTableWidgetItem, QHeaderView, QComboBox,
+                           QLabel, QTableView, QHeaderView, QComboBox,
                            QFrame, QSizePolicy, QCheckBox, QToolButton, QDesktopWidget)
 from PyQt5.QtCore import Qt, QRect
 from PyQt5.QtGui import QFont, QColor, QIcon
 import sqlite3
 from pathlib import Path
+from Database.ConnectionManager import ConnectionManager
+from Database.KeysetPaginator import KeysetPaginator
+from Database.QueryExecutor import QueryExecutor
+from Database.KeysetTableModel import KeysetTableModel
+from Laporan.LaporanExport import LaporanExport
+from Laporan.Periode import PeriodeIndex
+from Laporan.PeriodeFilter import PeriodeFilter
 
 class HistoriPeminjamanUI(QWidget):
+    # Columns of the report table, in display order
+    COLUMNS = ['ID', 'NomorPlat', 'NIK', 'Nama', 'Kontak', 'TanggalPeminjaman', 'TanggalPengembalian', 'TenggatPengembalian']
+    HEADERS = ["ID", "Plat", "NIK", "Nama", "Kontak", "Tanggal Peminjaman", "Tanggal Pengembalian", "Tenggat Pengembalian"]
+    # Default file name of an export
+    EXPORT_NAME = "Laporan Histori Peminjaman"
+
     def __init__(self, parent=None):
         """Initialize the Pelanggan (Customer) UI with complete styling and functionality."""
         super().__init__(parent)
@@ -21,10 +34,15 @@ class HistoriPeminjamanUI(QWidget):
         
         # Store important paths for database access
         self.db_path = Path(__file__).parent.parent / "Database/CarGoOwner.db"
+        self.db = ConnectionManager.get(self.db_path)
+        self.loader = QueryExecutor(self)
+        # Counts the filtered rows for the page buttons, alongside the page loads
+        self.counter = QueryExecutor(self)
         
         # Initialize pagination variables
         self.current_page = 1
         self.items_per_page = 10
+        self.total_pages = 0  # Known once refresh_pagination() has counted the rows
         self.pagination_buttons = []  # Store pagination buttons
         
         # Initialize navigation button references
@@ -71,11 +89,9 @@ class HistoriPeminjamanUI(QWidget):
 
     def setup_table(self):
         """Set up the table with calculated column widths based on screen size."""
-        self.table = QTableWidget()
-        self.table.setColumnCount(8)
-        self.table.setHorizontalHeaderLabels([
-            "ID", "Plat", "NIK", "Nama", "Kontak", "Tanggal Peminjaman", "Tanggal Pengembalian", "Tenggat Pengembalian"
-        ])
+        self.table = QTableView()
+        self.table_model = KeysetTableModel(self.COLUMNS, self.HEADERS, self.loader, parent=self)
+        self.table.setModel(self.table_model)
         
         column_percentages = {
             0: 5,     # Checkbox
@@ -95,7 +111,7 @@ class HistoriPeminjamanUI(QWidget):
         
         # Apply comprehensive table styling
         self.table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 background-color: white;
                 border: none;
                 font-family: 'Poly', sans-serif;
@@ -110,7 +126,7 @@ class HistoriPeminjamanUI(QWidget):
                 text-align: left;
                 height: 24px;
             }
-            QTableWidget::item {
+            QTableView::item {
                 border-bottom: 1px solid #F3F4F6;
                 font-family: 'Poly', sans-serif;
                 padding: 8px;
@@ -121,50 +137,21 @@ class HistoriPeminjamanUI(QWidget):
         # Configure additional table properties
         self.table.setShowGrid(False)
         self.table.verticalHeader().setVisible(False)
+        self.table.verticalHeader().setDefaultSectionSize(72)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Fixed)
 
     def setup_top_bar(self):
         top_bar = QHBoxLayout()
 
-        self.periode_dropdown = QComboBox()
-        self.periode_dropdown.setFont(QFont("Poly", 12))
-        self.periode_dropdown.setStyleSheet("""
-            QComboBox {
-                padding: 8px;
-                padding-left: 20px;
-                border: 1px solid #D1D5DB;
-                border-radius: 5px;
-                background-color: #FFFFFF;
-            }
-        """)
-        self.periode_dropdown.addItem("All Periode")
-        self.periode_dropdown.addItems(self.get_unique_month())
-        self.periode_dropdown.currentIndexChanged.connect(self.apply_filters)
+        self.periode_filter = PeriodeFilter(PeriodeIndex(self.db, 'Peminjaman', 'TanggalPeminjaman'))
+        self.periode_filter.changed.connect(self.apply_filters)
 
-        top_bar.addWidget(self.periode_dropdown)
+        top_bar.addWidget(self.periode_filter)
         top_bar.addStretch()
+        top_bar.addWidget(LaporanExport.button(self))
 
         return top_bar
 
-    def get_unique_month(self):
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute("SELECT DISTINCT strftime('%m' ,TanggalPeminjaman) AS bulan FROM Peminjaman")
-            months = cursor.fetchall()
-            month_names = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Okt','Nov','Dec']
-            if not months[0][0]:
-                return []
-            return [month_names[int(month[0]) - 1] for month in months]
-            
-        except sqlite3.Error as e:
-            print(f"Error getting unique month: {e}")
-            return []
-            
-        finally:
-            if conn:
-                conn.close()
-
     def setup_bottom_controls(self):
         """Set up the bottom controls with proper spacing and alignment."""
         bottom_layout = QHBoxLayout()
@@ -187,7 +174,7 @@ class HistoriPeminjamanUI(QWidget):
         """)
         
         # Set up pagination
-        pagination_container = self.setup_pagination()
+        self.pagination_container = self.setup_pagination()
         
         # Create action buttons
         add_button = QPushButton("+")
@@ -209,7 +196,7 @@ class HistoriPeminjamanUI(QWidget):
         
 
         bottom_layout.addStretch()
-        bottom_layout.addWidget(pagination_container)
+        bottom_layout.addWidget(self.pagination_container)
         bottom_layout.addStretch()
 
         
@@ -223,14 +210,6 @@ class HistoriPeminjamanUI(QWidget):
         pagination_layout.setContentsMargins(0, 0, 0, 0)
         pagination_layout.setSpacing(8)
         
-        # Calculate total pages
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('SELECT COUNT(*) FROM (SELECT NomorPlat, Model, Warna, Tahun, StatusKetersediaan FROM Mobil)')
-        total_records = cursor.fetchone()[0]
-        self.total_pages = (total_records + self.items_per_page - 1) // self.items_per_page
-        conn.close()
-        
         # Style for all pagination buttons
         button_style = """
             QPushButton {
@@ -329,21 +308,19 @@ class HistoriPeminjamanUI(QWidget):
         if 1 <= page <= self.total_pages and page != self.current_page:
             self.current_page = page
             self.load_data()
-            # Recreate pagination with updated current page
-            bottom_layout = self.findChild(QHBoxLayout)
-            if bottom_layout:
-                # Find and remove the old pagination container
-                for i in range(bottom_layout.count()):
-                    item = bottom_layout.itemAt(i)
-                    if item and isinstance(item.widget(), QWidget):
-                        if isinstance(item.widget().layout(), QHBoxLayout):
-                            item.widget().deleteLater()
-                            break
-                
-                # Create and add new pagination container
-                new_pagination = self.setup_pagination()
-                # Add it at the same position (index 2)
-                bottom_layout.insertWidget(2, new_pagination)
+
+    def refresh_pagination(self):
+        """Count the records of the selected period off the GUI thread, then rebuild the page buttons."""
+        self.counter.submit(self.report_paginator().count, on_result=self.show_pagination)
+
+    def show_pagination(self, total_records):
+        """Rebuild the page buttons for a record count."""
+        self.total_pages = (total_records + self.items_per_page - 1) // self.items_per_page
+
+        old_pagination = self.pagination_container
+        self.pagination_container = self.setup_pagination()
+        self.layout().replaceWidget(old_pagination, self.pagination_container)
+        old_pagination.deleteLater()
 
     def previous_page(self):
         """Navigate to the previous page."""
@@ -355,61 +332,26 @@ class HistoriPeminjamanUI(QWidget):
         if self.current_page < self.total_pages:
             self.go_to_page(self.current_page + 1)
 
+    def report_paginator(self):
+        """Return the paginator of the report with the selected period applied."""
+        where, params = self.periode_filter.periode().predicate('TanggalPeminjaman')
+        return KeysetPaginator.get(
+            self.db, 'Peminjaman', 'ID', self.COLUMNS,
+            where, params, self.items_per_page
+        )
+
     def load_data(self):
         """Load and display data from the database with pagination."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            month_names = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Okt','Nov','Dec']
-
-            month = self.periode_dropdown.currentText()
-            offset = (self.current_page - 1) * self.items_per_page
-
-            if month == 'All Periode' :
-                cursor.execute(f'''
-                    SELECT ID, NomorPlat, NIK, Nama, Kontak, TanggalPeminjaman, TanggalPengembalian, TenggatPengembalian
-                    FROM Peminjaman
-                    LIMIT {self.items_per_page} 
-                    OFFSET {offset}
-                ''')
-                data = cursor.fetchall()
-            else :
-                idx = 0
-                for i in range(12):
-                    if (month_names[i] == month):
-                        idx = i + 1
-
-                cursor.execute(f'''
-                    SELECT ID, NomorPlat, NIK, Nama, Kontak, TanggalPeminjaman, TanggalPengembalian, TenggatPengembalian
-                    FROM Peminjaman
-                    WHERE strftime('%m', TanggalPeminjaman) = ?
-                    LIMIT {self.items_per_page} 
-                    OFFSET {offset}
-                ''', (str(idx), ))
-                data = cursor.fetchall()               
-            
-            # Set up table rows
-            self.table.setRowCount(len(data))
-            for row, record in enumerate(data):                
-                # Add data cells
-                for col, value in enumerate(record):
-                    item = QTableWidgetItem(str(value))
-                    item.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-                    item.setFlags(item.flags() & ~Qt.ItemIsEditable)
-                    self.table.setItem(row, col, item)
-                
-                # Set row height
-                self.table.setRowHeight(row, 72)
+            self.refresh_pagination()
+            self.table_model.reset(self.report_paginator(), self.current_page)
             
         except sqlite3.Error as e:
             print(f"Error loading data: {e}")
-            
-        finally:
-            if conn:
-                conn.close()
 
     def apply_filters(self):
         """Apply filters based on the selected color and year."""
+        # The period's rows start over on page 1; load_data() recounts the page buttons first
+        self.current_page = 1
         self.load_data()
 
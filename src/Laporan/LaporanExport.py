@@ -0,0 +1,112 @@
+from pathlib import Path
+from typing import Sequence
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QFileDialog, QMessageBox, QProgressDialog, QPushButton
+
+from Database.KeysetPaginator import KeysetPaginator
+from Database.ReportExporter import ReportExporter, export_formats
+
+
+class LaporanExport:
+    """Export button and progress dialog shared by the Laporan report views."""
+
+    BUTTON_STYLE = """
+        QPushButton {
+            background-color: #10B981;
+            border: none;
+            padding: 8px 16px;
+            border-radius: 5px;
+            color: white;
+            font-family: 'Poly', sans-serif;
+            font-size: 13px;
+        }
+        QPushButton:hover {
+            background-color: #059669;
+        }
+        QPushButton:disabled {
+            background-color: #9CA3AF;
+        }
+    """
+
+    @staticmethod
+    def button(view) -> QPushButton:
+        """
+        Create the Export button of a report view.
+
+        The view provides report_paginator() (the report query with its current filter),
+        a HEADERS list matching its COLUMNS, and an EXPORT_NAME used as the default file name.
+
+        Args:
+            view: Report widget
+
+        Returns:
+            The button, connected to LaporanExport.run
+        """
+        button = QPushButton("Export")
+        button.setStyleSheet(LaporanExport.BUTTON_STYLE)
+        button.clicked.connect(lambda: LaporanExport.run(view, button))
+        return button
+
+    @staticmethod
+    def run(view, button: QPushButton = None):
+        """
+        Ask for a target file and export the full filtered report to it in the background.
+
+        Args:
+            view: Report widget
+            button: Export button, disabled while the export runs
+        """
+        formats = export_formats()
+        path, selected = QFileDialog.getSaveFileName(
+            view, "Export Laporan", f"{view.EXPORT_NAME}.csv", ";;".join(formats.values())
+        )
+        if not path:
+            return
+
+        path = Path(path)
+        if path.suffix.lower() not in formats:
+            suffix = next(ext for ext, name in formats.items() if name == selected) if selected else '.csv'
+            path = path.with_name(path.name + suffix)
+
+        LaporanExport.start(view, view.report_paginator(), view.HEADERS, path, button)
+
+    @staticmethod
+    def start(view, paginator: KeysetPaginator, headers: Sequence[str], path: Path, button: QPushButton = None):
+        """Start the export and show its progress; the dialog's Cancel button stops it."""
+        total = paginator.count()
+
+        dialog = QProgressDialog(f"Exporting to {path.name}...", "Cancel", 0, max(total, 1), view)
+        dialog.setWindowTitle("Export Laporan")
+        dialog.setWindowModality(Qt.WindowModal)
+        dialog.setMinimumDuration(300)
+        dialog.setAutoClose(False)
+        dialog.setAutoReset(False)
+
+        exporter = ReportExporter(view)
+        if button is not None:
+            button.setEnabled(False)
+
+        def done():
+            dialog.close()
+            dialog.deleteLater()
+            exporter.deleteLater()
+            if button is not None:
+                button.setEnabled(True)
+
+        def finished(written):
+            done()
+            if written >= 0:
+                QMessageBox.information(view, "Export Laporan", f"{written} rows exported to {path}")
+
+        def failed(message):
+            done()
+            QMessageBox.warning(view, "Export Laporan", message)
+
+        exporter.progress.connect(lambda written: dialog.setValue(min(written, dialog.maximum())))
+        exporter.finished.connect(finished)
+        exporter.failed.connect(failed)
+        dialog.canceled.connect(exporter.cancel)
+
+        exporter.start(paginator, headers, path)
+        return exporter
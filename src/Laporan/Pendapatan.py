@@ -1,14 +1,28 @@
 import sys
 import os
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
-                           QLabel, QTableWidget, QTableWidgetItem, QHeaderView, 
+                           QLabel, QTableView, QHeaderView, 
                            QFrame, QSizePolicy, QCheckBox, QToolButton, QDesktopWidget, QComboBox)
 from PyQt5.QtCore import Qt, QRect
 from PyQt5.QtGui import QFont, QColor, QIcon
 import sqlite3, locale
 from pathlib import Path
+from Database.ConnectionManager import ConnectionManager
+from Database.KeysetPaginator import KeysetPaginator
+from Database.QueryExecutor import QueryExecutor
+from Database.KeysetTableModel import KeysetTableModel
+from Laporan.LaporanExport import LaporanExport
+from Laporan.PendapatanBulanan import PendapatanBulanan
+from Laporan.Periode import Periode, PeriodeIndex
+from Laporan.PeriodeFilter import PeriodeFilter
 
 class PendapatanUI(QWidget):
+    # Columns of the report table, in display order
+    COLUMNS = ['ID', 'Nama', 'TanggalPeminjaman', 'TanggalPengembalian', 'TanggalPembayaran', 'BesarPembayaran']
+    HEADERS = ["ID", "Nama", "Tanggal Peminjaman", "Tanggal Pengembalian", "Tanggal Pembayaran", "Besar Pembayaran"]
+    # Default file name of an export
+    EXPORT_NAME = "Laporan Pendapatan"
+
     def __init__(self, parent=None):
         """Initialize the Pelanggan (Customer) UI with complete styling and functionality."""
         super().__init__(parent)
@@ -18,10 +32,16 @@ class PendapatanUI(QWidget):
         
         # Store important paths for database access
         self.db_path = Path(__file__).parent.parent / "Database/CarGoOwner.db"
+        self.db = ConnectionManager.get(self.db_path)
+        self.loader = QueryExecutor(self)
+        # Counts the filtered rows for the page buttons, alongside the page loads
+        self.counter = QueryExecutor(self)
+        self.pendapatan = PendapatanBulanan(self.db)
         
         # Initialize pagination variables
         self.current_page = 1
         self.items_per_page = 10
+        self.total_pages = 0  # Known once refresh_pagination() has counted the rows
         self.pagination_buttons = []  # Store pagination buttons
         
         # Initialize navigation button references
@@ -48,25 +68,15 @@ class PendapatanUI(QWidget):
         layout.setContentsMargins(20, 20, 20, 20)
         layout.setSpacing(20)
         
-        # Calculate total pages
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('SELECT COUNT(*) FROM (SELECT ID, Nama, TanggalPeminjaman, TanggalPengembalian, TenggatPengembalian, BesarPembayaran FROM Peminjaman)')
-        total_records = cursor.fetchone()[0]
-        self.total_pages = (total_records + self.items_per_page - 1) // self.items_per_page
-        conn.close()
+        top_layout = self.setup_top_bar()
+        layout.addLayout(top_layout)
 
-        # If no records, hide pagination and return empty container
+        # Shown instead of the table when the selected period has no records
         self.message_error = QLabel("Tidak ada Data", self)
+        self.message_error.setAlignment(Qt.AlignCenter)
+        self.message_error.setStyleSheet("font-size: 42px; font-family: 'Poly', sans-serif; color: #6B7280;")
         self.message_error.hide()
-        if total_records == 0:
-            self.message_error.setAlignment(Qt.AlignCenter)
-            self.message_error.setStyleSheet("font-size: 42px; font-family: 'Poly', sans-serif; color: #6B7280;")
-            layout.addWidget(self.message_error)
-            return
-
-        top_layout = self.setup_top_bar()
-        layout.addLayout(top_layout)
+        layout.addWidget(self.message_error)
 
         # Initialize and setup the table
         self.setup_table()
@@ -78,11 +88,9 @@ class PendapatanUI(QWidget):
 
     def setup_table(self):
         """Set up the table with calculated column widths based on screen size."""
-        self.table = QTableWidget()
-        self.table.setColumnCount(6)
-        self.table.setHorizontalHeaderLabels([
-            "ID", "Nama", "Tanggal Peminjaman", "Tanggal Pengembalian", "Tanggal Pembayaran", "Besar Pembayaran"
-        ])
+        self.table = QTableView()
+        self.table_model = KeysetTableModel(self.COLUMNS, self.HEADERS, self.loader, parent=self)
+        self.table.setModel(self.table_model)
         
         column_percentages = {
             0: 5,     # Checkbox
@@ -100,7 +108,7 @@ class PendapatanUI(QWidget):
         
         # Apply comprehensive table styling
         self.table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 background-color: white;
                 border: none;
                 font-family: 'Poly', sans-serif;
@@ -115,7 +123,7 @@ class PendapatanUI(QWidget):
                 text-align: left;
                 height: 24px;
             }
-            QTableWidget::item {
+            QTableView::item {
                 border-bottom: 1px solid #F3F4F6;
                 font-family: 'Poly', sans-serif;
                 padding: 8px;
@@ -126,6 +134,7 @@ class PendapatanUI(QWidget):
         # Configure additional table properties
         self.table.setShowGrid(False)
         self.table.verticalHeader().setVisible(False)
+        self.table.verticalHeader().setDefaultSectionSize(72)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Fixed)
 
     def setup_bottom_controls(self):
@@ -133,26 +142,18 @@ class PendapatanUI(QWidget):
         bottom_layout = QHBoxLayout()
         
         # Set up pagination
-        pagination_container = self.setup_pagination()
+        self.pagination_container = self.setup_pagination()
         
         # Assemble the bottom layout
         bottom_layout.addStretch()
-        bottom_layout.addWidget(pagination_container)
+        bottom_layout.addWidget(self.pagination_container)
         bottom_layout.addStretch()
         
         return bottom_layout
 
-    def get_total_pembayaran(self):
-        conn = sqlite3.connect(self.db_path)  # Ganti dengan nama database Anda
-        cursor = conn.cursor()
-
-        # Query untuk mengambil total jumlah
-        cursor.execute("SELECT sum(BesarPembayaran) AS totalPembayaran FROM Peminjaman WHERE StatusPembayaran = 1")
-        result = cursor.fetchone()  # Ambil hasil pertama (karena hanya ada satu baris)
-        
-        # Tutup koneksi setelah selesai
-        conn.close()
-        return result[0] 
+    def get_total_pembayaran(self, periode=None):
+        """Return the paid revenue of a period (all time if None), from the monthly aggregates."""
+        return self.pendapatan.totals_for(periode or Periode.semua())['TotalDibayar']
 
     def setup_top_bar(self):
         top_bar = QHBoxLayout()
@@ -165,6 +166,7 @@ class PendapatanUI(QWidget):
 
         formatted_number = locale.currency(total, grouping=True)
         label = QLabel(f"Total Pembayaran: {formatted_number}")
+        self.total_label = label
 
         label.setStyleSheet("""
             background-color: #D3D3D3;   /* Warna abu-abu */
@@ -175,47 +177,17 @@ class PendapatanUI(QWidget):
             color: black;                /* Warna teks */
         """)
 
-        self.periode_dropdown = QComboBox()
-        self.periode_dropdown.setFont(QFont("Poly", 12))
-        self.periode_dropdown.setStyleSheet("""
-            QComboBox {
-                padding: 8px;
-                padding-left: 20px;
-                border: 1px solid #D1D5DB;
-                border-radius: 5px;
-                background-color: #FFFFFF;
-            }
-        """)
-        self.periode_dropdown.addItem("All Periode")
-        self.periode_dropdown.addItems(self.get_unique_month())
-        self.periode_dropdown.currentIndexChanged.connect(self.apply_filters)
+        self.periode_filter = PeriodeFilter(PeriodeIndex(self.db, 'Peminjaman', 'TanggalPembayaran'))
+        self.periode_filter.changed.connect(self.apply_filters)
 
-        top_bar.addWidget(self.periode_dropdown)
+        top_bar.addWidget(self.periode_filter)
         top_bar.addSpacing(20)
         top_bar.addWidget(label)
         top_bar.addStretch()
+        top_bar.addWidget(LaporanExport.button(self))
 
         return top_bar
 
-    def get_unique_month(self):
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute("SELECT DISTINCT strftime('%m' ,TanggalPembayaran) AS bulan FROM Peminjaman")
-            months = cursor.fetchall()
-            month_names = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Okt','Nov','Dec']
-            if not months[0][0]:
-                return []
-            return [month_names[int(month[0]) - 1] for month in months]
-            
-        except sqlite3.Error as e:
-            print(f"Error getting unique month: {e}")
-            return []
-            
-        finally:
-            if conn:
-                conn.close()
-
     def setup_pagination(self):
         """Set up pagination with a fixed window of 5 pages plus First/Last buttons."""
         # Create container widget
@@ -224,16 +196,8 @@ class PendapatanUI(QWidget):
         pagination_layout.setContentsMargins(0, 0, 0, 0)
         pagination_layout.setSpacing(8)
         
-        # Calculate total pages
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('SELECT COUNT(*) FROM (SELECT ID, Nama, TanggalPeminjaman, TanggalPengembalian, TenggatPengembalian, BesarPembayaran FROM Peminjaman)')
-        total_records = cursor.fetchone()[0]
-        self.total_pages = (total_records + self.items_per_page - 1) // self.items_per_page
-        conn.close()
-
         # If no records, hide pagination and return empty container
-        if total_records == 0:
+        if self.total_pages == 0:
             pagination_container.hide()
             return pagination_container
         
@@ -335,21 +299,21 @@ class PendapatanUI(QWidget):
         if 1 <= page <= self.total_pages and page != self.current_page:
             self.current_page = page
             self.load_data()
-            # Recreate pagination with updated current page
-            bottom_layout = self.findChild(QHBoxLayout)
-            if bottom_layout:
-                # Find and remove the old pagination container
-                for i in range(bottom_layout.count()):
-                    item = bottom_layout.itemAt(i)
-                    if item and isinstance(item.widget(), QWidget):
-                        if isinstance(item.widget().layout(), QHBoxLayout):
-                            item.widget().deleteLater()
-                            break
-                
-                # Create and add new pagination container
-                new_pagination = self.setup_pagination()
-                # Add it at the same position (index 2)
-                bottom_layout.insertWidget(2, new_pagination)
+
+    def refresh_pagination(self):
+        """Count the records of the selected period off the GUI thread, then rebuild the page buttons."""
+        self.counter.submit(self.report_paginator().count, on_result=self.show_pagination)
+
+    def show_pagination(self, total_records):
+        """Rebuild the page buttons for a record count, showing the empty message if there are none."""
+        self.total_pages = (total_records + self.items_per_page - 1) // self.items_per_page
+        self.message_error.setVisible(total_records == 0)
+        self.table.setVisible(total_records > 0)
+
+        old_pagination = self.pagination_container
+        self.pagination_container = self.setup_pagination()
+        self.layout().replaceWidget(old_pagination, self.pagination_container)
+        old_pagination.deleteLater()
 
     def previous_page(self):
         """Navigate to the previous page."""
@@ -361,49 +325,29 @@ class PendapatanUI(QWidget):
         if self.current_page < self.total_pages:
             self.go_to_page(self.current_page + 1)
 
+    def report_paginator(self):
+        """Return the paginator of the report with the selected period applied."""
+        where, params = self.periode_filter.periode().predicate('TanggalPembayaran')
+        where = f"StatusPembayaran = 1 AND {where}" if where else "StatusPembayaran = 1"
+        return KeysetPaginator.get(
+            self.db, 'Peminjaman', 'ID', self.COLUMNS,
+            where, params, self.items_per_page
+        )
+
     def load_data(self):
         """Load and display data from the database with pagination."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            month_names = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Okt','Nov','Dec']
-
-            month = self.periode_dropdown.currentText()
-            offset = (self.current_page - 1) * self.items_per_page
-
-            if month == 'All Periode' :
-                cursor.execute(f'''
-                    SELECT ID, Nama, TanggalPeminjaman, TanggalPengembalian, TanggalPembayaran, BesarPembayaran
-                    FROM Peminjaman WHERE StatusPembayaran = 1
-                    LIMIT {self.items_per_page} 
-                    OFFSET {offset}
-                ''')
-                data = cursor.fetchall()
-
-            else :
-                idx = 0
-                for i in range(12):
-                    if (month_names[i] == month):
-                        idx = i + 1
-
-                cursor.execute(f'''
-                    SELECT ID, Nama, TanggalPeminjaman, TanggalPengembalian, TanggalPembayaran, BesarPembayaran
-                    FROM Peminjaman 
-                    WHERE strftime('%m', TanggalPembayaran) = ?
-                    LIMIT {self.items_per_page} 
-                    OFFSET {offset}
-                ''', (str(idx), ))
-                data = cursor.fetchall()
+            self.refresh_pagination()
+            self.table_model.reset(self.report_paginator(), self.current_page)
             
         except sqlite3.Error as e:
             print(f"Error loading data: {e}")
-            
-        finally:
-            if conn:
-                conn.close()
 
     def apply_filters(self):
         """Apply filters based on the selected color and year."""
+        # The period's rows start over on page 1; load_data() recounts the page buttons first
+        self.current_page = 1
+        total = self.get_total_pembayaran(self.periode_filter.periode()) or 0
+        self.total_label.setText(f"Total Pembayaran: {locale.currency(total, grouping=True)}")
         self.load_data()
 
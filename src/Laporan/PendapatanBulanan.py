@@ -0,0 +1,211 @@
+import sqlite3
+from typing import Any, Dict, List, Optional
+
+from Database.ConnectionManager import ConnectionManager
+from Laporan.Periode import Periode
+
+
+class PendapatanBulanan:
+    """
+    Revenue per month, paid and outstanding, kept in step with Peminjaman by triggers.
+
+    A paid rental counts towards the month of its TanggalPembayaran, an unpaid one towards
+    the month of its TenggatPembayaran. The triggers adjust the affected months in the same
+    transaction as every insert, delete or payment change, so revenue totals and monthly
+    breakdowns read a handful of rows instead of summing the whole Peminjaman table.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS PendapatanBulanan (
+            Tahun INTEGER NOT NULL,
+            Bulan INTEGER NOT NULL,
+            TotalDibayar INTEGER NOT NULL DEFAULT 0,
+            JumlahDibayar INTEGER NOT NULL DEFAULT 0,
+            TotalBelumDibayar INTEGER NOT NULL DEFAULT 0,
+            JumlahBelumDibayar INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (Tahun, Bulan)
+        ) WITHOUT ROWID
+    """
+
+    # Peminjaman columns that decide which month a rental counts towards and for how much
+    TRACKED_COLUMNS = ['StatusPembayaran', 'TanggalPembayaran', 'TenggatPembayaran', 'BesarPembayaran']
+
+    @staticmethod
+    def _period(row: str) -> str:
+        """SQL for the date a rental counts towards; row is NEW, OLD or a table alias."""
+        return (f"CASE WHEN {row}.StatusPembayaran IS 1 "
+                f"THEN COALESCE({row}.TanggalPembayaran, {row}.TenggatPembayaran) "
+                f"ELSE {row}.TenggatPembayaran END")
+
+    @staticmethod
+    def _apply(row: str, sign: int) -> str:
+        """SQL adding (sign 1) or removing (sign -1) one rental's amount to its month."""
+        period = PendapatanBulanan._period(row)
+        paid = f"({row}.StatusPembayaran IS 1)"
+        return f"""
+            INSERT INTO PendapatanBulanan
+                (Tahun, Bulan, TotalDibayar, JumlahDibayar, TotalBelumDibayar, JumlahBelumDibayar)
+            VALUES (
+                COALESCE(CAST(strftime('%Y', {period}) AS INTEGER), 0),
+                COALESCE(CAST(strftime('%m', {period}) AS INTEGER), 0),
+                {sign} * {paid} * {row}.BesarPembayaran, {sign} * {paid},
+                {sign} * (1 - {paid}) * {row}.BesarPembayaran, {sign} * (1 - {paid})
+            )
+            ON CONFLICT (Tahun, Bulan) DO UPDATE SET
+                TotalDibayar = TotalDibayar + excluded.TotalDibayar,
+                JumlahDibayar = JumlahDibayar + excluded.JumlahDibayar,
+                TotalBelumDibayar = TotalBelumDibayar + excluded.TotalBelumDibayar,
+                JumlahBelumDibayar = JumlahBelumDibayar + excluded.JumlahBelumDibayar;
+        """
+
+    @staticmethod
+    def triggers() -> List[str]:
+        """Return the CREATE TRIGGER statements keeping the table up to date."""
+        apply = PendapatanBulanan._apply
+        return [
+            f"""CREATE TRIGGER IF NOT EXISTS trg_pendapatan_insert AFTER INSERT ON Peminjaman
+                BEGIN {apply('NEW', 1)} END""",
+            f"""CREATE TRIGGER IF NOT EXISTS trg_pendapatan_delete AFTER DELETE ON Peminjaman
+                BEGIN {apply('OLD', -1)} END""",
+            f"""CREATE TRIGGER IF NOT EXISTS trg_pendapatan_update
+                AFTER UPDATE OF {', '.join(PendapatanBulanan.TRACKED_COLUMNS)} ON Peminjaman
+                BEGIN {apply('OLD', -1)} {apply('NEW', 1)} END""",
+        ]
+
+    @staticmethod
+    def rebuild(conn: sqlite3.Connection):
+        """
+        Recompute every month from Peminjaman.
+
+        Args:
+            conn: Open connection, normally inside a transaction
+        """
+        period = PendapatanBulanan._period('p')
+        conn.execute('DELETE FROM PendapatanBulanan')
+        conn.execute(f"""
+            INSERT INTO PendapatanBulanan
+                (Tahun, Bulan, TotalDibayar, JumlahDibayar, TotalBelumDibayar, JumlahBelumDibayar)
+            SELECT
+                COALESCE(CAST(strftime('%Y', {period}) AS INTEGER), 0) AS Tahun,
+                COALESCE(CAST(strftime('%m', {period}) AS INTEGER), 0) AS Bulan,
+                SUM(CASE WHEN p.StatusPembayaran IS 1 THEN p.BesarPembayaran ELSE 0 END),
+                SUM(p.StatusPembayaran IS 1),
+                SUM(CASE WHEN p.StatusPembayaran IS 1 THEN 0 ELSE p.BesarPembayaran END),
+                SUM(p.StatusPembayaran IS NOT 1)
+            FROM Peminjaman p
+            GROUP BY Tahun, Bulan
+        """)
+
+    @staticmethod
+    def install(conn: sqlite3.Connection):
+        """
+        Create the table and its triggers and fill it from the existing rentals.
+
+        Args:
+            conn: Open connection, normally inside the migration's transaction
+        """
+        conn.execute(PendapatanBulanan.SCHEMA)
+        for trigger in PendapatanBulanan.triggers():
+            conn.execute(trigger)
+        PendapatanBulanan.rebuild(conn)
+
+    def __init__(self, db: Optional[ConnectionManager] = None):
+        """
+        Initialize the revenue reader.
+
+        Args:
+            db: Connection manager of the database (defaults to the application database)
+        """
+        self.db = db or ConnectionManager.get()
+
+    def totals(self, year: Optional[int] = None, month: Optional[int] = None) -> Dict[str, int]:
+        """
+        Sum revenue over all months, optionally limited to one year and/or calendar month.
+
+        Args:
+            year: Year to include, or None for every year
+            month: Month (1-12) to include, or None for every month
+
+        Returns:
+            Dictionary with TotalDibayar, JumlahDibayar, TotalBelumDibayar and JumlahBelumDibayar
+        """
+        conditions = []
+        params: List[Any] = []
+        if year is not None:
+            conditions.append("Tahun = ?")
+            params.append(year)
+        if month is not None:
+            conditions.append("Bulan = ?")
+            params.append(month)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        with self.db.connection() as conn:
+            row = conn.execute(f"""
+                SELECT COALESCE(SUM(TotalDibayar), 0), COALESCE(SUM(JumlahDibayar), 0),
+                       COALESCE(SUM(TotalBelumDibayar), 0), COALESCE(SUM(JumlahBelumDibayar), 0)
+                FROM PendapatanBulanan{where}
+            """, params).fetchone()
+        return dict(zip(['TotalDibayar', 'JumlahDibayar', 'TotalBelumDibayar', 'JumlahBelumDibayar'], row))
+
+    def totals_for(self, periode: Periode) -> Dict[str, int]:
+        """
+        Sum revenue over a reporting period.
+
+        Whole months are summed from the aggregates; a custom range that cuts through a month
+        falls back to range queries on the indexed Peminjaman date columns.
+
+        Args:
+            periode: Period to sum
+
+        Returns:
+            Dictionary with TotalDibayar, JumlahDibayar, TotalBelumDibayar and JumlahBelumDibayar
+        """
+        if periode.is_all:
+            return self.totals()
+
+        names = ['TotalDibayar', 'JumlahDibayar', 'TotalBelumDibayar', 'JumlahBelumDibayar']
+        with self.db.connection() as conn:
+            if periode.month_aligned:
+                # Months as Tahun * 100 + Bulan, e.g. 202403
+                first, last = (int(day[:4]) * 100 + int(day[5:7]) for day in (periode.start, periode.end))
+                row = conn.execute("""
+                    SELECT COALESCE(SUM(TotalDibayar), 0), COALESCE(SUM(JumlahDibayar), 0),
+                           COALESCE(SUM(TotalBelumDibayar), 0), COALESCE(SUM(JumlahBelumDibayar), 0)
+                    FROM PendapatanBulanan
+                    WHERE Tahun * 100 + Bulan >= ? AND Tahun * 100 + Bulan < ?
+                """, (first, last)).fetchone()
+                return dict(zip(names, row))
+
+            paid_where, params = periode.predicate('TanggalPembayaran')
+            paid = conn.execute(
+                f"SELECT COALESCE(SUM(BesarPembayaran), 0), COUNT(*) FROM Peminjaman "
+                f"WHERE StatusPembayaran = 1 AND {paid_where}", params
+            ).fetchone()
+            unpaid_where, params = periode.predicate('TenggatPembayaran')
+            unpaid = conn.execute(
+                f"SELECT COALESCE(SUM(BesarPembayaran), 0), COUNT(*) FROM Peminjaman "
+                f"WHERE StatusPembayaran = 0 AND {unpaid_where}", params
+            ).fetchone()
+        return dict(zip(names, paid + unpaid))
+
+    def breakdown(self, year: Optional[int] = None) -> List[Dict[str, int]]:
+        """
+        Return revenue per month, oldest first, leaving out months without rentals.
+
+        Args:
+            year: Year to list, or None for every year
+
+        Returns:
+            List of dictionaries with Tahun, Bulan and the paid and outstanding totals and counts
+        """
+        where = " AND Tahun = ?" if year is not None else ""
+        params = (year,) if year is not None else ()
+        with self.db.connection() as conn:
+            cursor = conn.execute(f"""
+                SELECT Tahun, Bulan, TotalDibayar, JumlahDibayar, TotalBelumDibayar, JumlahBelumDibayar
+                FROM PendapatanBulanan
+                WHERE (JumlahDibayar > 0 OR JumlahBelumDibayar > 0){where}
+                ORDER BY Tahun, Bulan
+            """, params)
+            names = [description[0] for description in cursor.description]
+            return [dict(zip(names, row)) for row in cursor]
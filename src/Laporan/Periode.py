@@ -0,0 +1,179 @@
+import threading
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from Database.ConnectionManager import ConnectionManager
+
+MONTH_NAMES = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Okt', 'Nov', 'Dec']
+
+
+def _month_start(year: int, month: int) -> date:
+    """First day of a month, rolling over into the next year past December."""
+    return date(year + (month - 1) // 12, (month - 1) % 12 + 1, 1)
+
+
+@dataclass(frozen=True)
+class Periode:
+    """
+    A reporting period: everything, a year, a quarter, a month or a custom date range.
+
+    Periods are half-open ranges [start, end) of ISO dates, so filtering a date column is a
+    plain range comparison ("TanggalPeminjaman >= ? AND TanggalPeminjaman < ?") that can use
+    an index on the column, and every year is kept apart.
+    """
+    label: str
+    start: Optional[str] = None
+    end: Optional[str] = None
+
+    @classmethod
+    def semua(cls) -> "Periode":
+        """The whole history, without any date condition."""
+        return cls("All Periode")
+
+    @classmethod
+    def tahun(cls, year: int) -> "Periode":
+        return cls(str(year), date(year, 1, 1).isoformat(), date(year + 1, 1, 1).isoformat())
+
+    @classmethod
+    def kuartal(cls, year: int, quarter: int) -> "Periode":
+        first_month = (quarter - 1) * 3 + 1
+        return cls(
+            f"Q{quarter} {year}",
+            _month_start(year, first_month).isoformat(),
+            _month_start(year, first_month + 3).isoformat()
+        )
+
+    @classmethod
+    def bulan(cls, year: int, month: int) -> "Periode":
+        return cls(
+            f"{MONTH_NAMES[month - 1]} {year}",
+            _month_start(year, month).isoformat(),
+            _month_start(year, month + 1).isoformat()
+        )
+
+    @classmethod
+    def rentang(cls, first_day: date, last_day: date) -> "Periode":
+        """
+        A custom range of days.
+
+        Args:
+            first_day: First day included
+            last_day: Last day included
+        """
+        return cls(
+            f"{first_day.isoformat()} - {last_day.isoformat()}",
+            first_day.isoformat(),
+            (last_day + timedelta(days=1)).isoformat()
+        )
+
+    @property
+    def is_all(self) -> bool:
+        return self.start is None
+
+    @property
+    def month_aligned(self) -> bool:
+        """Whether the period covers whole months only, as years, quarters and months do."""
+        return self.is_all or (self.start.endswith('-01') and self.end.endswith('-01'))
+
+    def predicate(self, column: str) -> Tuple[Optional[str], Tuple[Any, ...]]:
+        """
+        Build the filter condition selecting rows whose date column falls in the period.
+
+        Args:
+            column: ISO date column, e.g. "TanggalPeminjaman"
+
+        Returns:
+            Tuple of the condition (None for the whole history) and its parameters
+        """
+        if self.is_all:
+            return None, ()
+        return f"{column} >= ? AND {column} < ?", (self.start, self.end)
+
+
+class PeriodeIndex:
+    """
+    The months that have rows, per date column, for filling the period dropdowns.
+
+    Instead of "SELECT DISTINCT strftime(...)" over the whole table, the months are found by
+    seeking through the column's index: one MIN(column) lookup from the start of each month
+    that has data, so the cost grows with the number of months rather than the number of rows.
+    Results are cached until the table is reported as changed through mark_changed().
+    """
+
+    _cache: Dict[tuple, Tuple[int, List[Tuple[int, int]]]] = {}
+    _lock = threading.Lock()
+
+    def __init__(self, db: ConnectionManager, table: str, column: str):
+        """
+        Initialize the index of one date column.
+
+        Args:
+            db: Connection manager of the database holding the table
+            table: Table name
+            column: ISO date column, ideally indexed
+        """
+        self.db = db
+        self.table = table
+        self.column = column
+
+    def months(self) -> List[Tuple[int, int]]:
+        """
+        Return the (year, month) pairs that have at least one row, oldest first.
+
+        Returns:
+            List of (year, month) tuples
+        """
+        cache_key = (str(self.db.db_path), self.table, self.column)
+        version = self.db.version(self.table)
+        with self._lock:
+            cached = self._cache.get(cache_key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        months = []
+        query = f"SELECT MIN({self.column}) FROM {self.table} WHERE {self.column} >= ?"
+        start = ''
+        with self.db.connection() as conn:
+            while True:
+                value = conn.execute(query, (start, )).fetchone()[0]
+                if value is None:
+                    break
+                try:
+                    year, month = int(value[:4]), int(value[5:7])
+                    if not 1 <= month <= 12:
+                        raise ValueError(value)
+                    next_month = _month_start(year, month + 1).isoformat()
+                except (TypeError, ValueError):
+                    # Not an ISO date; step over it
+                    start = f"{value}\x00"
+                    continue
+                months.append((year, month))
+                start = next_month
+
+        with self._lock:
+            self._cache[cache_key] = (version, months)
+        return months
+
+    def periods(self) -> List[Periode]:
+        """
+        Return the periods offered in a dropdown, newest year first.
+
+        Each year with data is followed by its quarters and months that have data.
+
+        Returns:
+            List of Periode, starting with the whole history
+        """
+        periods = [Periode.semua()]
+        by_year: Dict[int, List[int]] = {}
+        for year, month in self.months():
+            by_year.setdefault(year, []).append(month)
+
+        for year in sorted(by_year, reverse=True):
+            months = by_year[year]
+            periods.append(Periode.tahun(year))
+            for quarter in sorted({(month - 1) // 3 + 1 for month in months}):
+                periods.append(Periode.kuartal(year, quarter))
+            for month in months:
+                periods.append(Periode.bulan(year, month))
+        return periods
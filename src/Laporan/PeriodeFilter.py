@@ -0,0 +1,129 @@
+from PyQt5.QtCore import QDate, pyqtSignal
+from PyQt5.QtGui import QFont
+from PyQt5.QtWidgets import QComboBox, QDateEdit, QHBoxLayout, QLabel, QWidget
+
+from Laporan.Periode import Periode, PeriodeIndex
+
+
+class PeriodeFilter(QWidget):
+    """
+    Period dropdown of the Laporan screens.
+
+    Lists the whole history, then every year with data followed by its quarters and months,
+    taken from a PeriodeIndex. The last entry picks a custom range with two date fields.
+    """
+
+    # Emitted with the newly selected Periode
+    changed = pyqtSignal(object)
+
+    CUSTOM = "Custom Range"
+
+    COMBO_STYLE = """
+        QComboBox {
+            padding: 8px;
+            padding-left: 20px;
+            border: 1px solid #D1D5DB;
+            border-radius: 5px;
+            background-color: #FFFFFF;
+        }
+    """
+
+    DATE_STYLE = """
+        QDateEdit {
+            padding: 8px;
+            border: 1px solid #D1D5DB;
+            border-radius: 5px;
+            background-color: #FFFFFF;
+        }
+    """
+
+    def __init__(self, index: PeriodeIndex, parent=None):
+        """
+        Initialize the filter.
+
+        Args:
+            index: Months with data of the date column the report filters on
+            parent: Owning widget
+        """
+        super().__init__(parent)
+        self.index = index
+
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(8)
+
+        self.dropdown = QComboBox()
+        self.dropdown.setFont(QFont("Poly", 12))
+        self.dropdown.setStyleSheet(self.COMBO_STYLE)
+        layout.addWidget(self.dropdown)
+
+        self.first_day = QDateEdit(calendarPopup=True)
+        self.last_day = QDateEdit(calendarPopup=True)
+        for date_edit in (self.first_day, self.last_day):
+            date_edit.setDisplayFormat("yyyy-MM-dd")
+            date_edit.setFont(QFont("Poly", 12))
+            date_edit.setStyleSheet(self.DATE_STYLE)
+            date_edit.dateChanged.connect(self._on_range_changed)
+
+        # Only shown while the custom range is selected
+        self.range_widgets = (self.first_day, QLabel("-"), self.last_day)
+        for widget in self.range_widgets:
+            widget.hide()
+            layout.addWidget(widget)
+
+        self.reload()
+        self.dropdown.currentIndexChanged.connect(self._on_index_changed)
+
+    def reload(self):
+        """Refill the dropdown from the index, keeping the current selection if it still exists."""
+        custom = self._is_custom()
+        current = self.CUSTOM if custom else self.periode().label
+
+        self.dropdown.blockSignals(True)
+        self.dropdown.clear()
+        for periode in self.index.periods():
+            self.dropdown.addItem(periode.label, periode)
+        self.dropdown.addItem(self.CUSTOM, None)
+        self.dropdown.setCurrentIndex(max(self.dropdown.findText(current), 0))
+        self.dropdown.blockSignals(False)
+
+        if custom:
+            return
+        # Start a custom range on the full span of the data
+        months = self.index.months()
+        for date_edit in (self.first_day, self.last_day):
+            date_edit.blockSignals(True)
+        if months:
+            self.first_day.setDate(QDate(months[0][0], months[0][1], 1))
+            last = QDate(months[-1][0], months[-1][1], 1)
+            self.last_day.setDate(last.addDays(last.daysInMonth() - 1))
+        else:
+            self.first_day.setDate(QDate.currentDate())
+            self.last_day.setDate(QDate.currentDate())
+        for date_edit in (self.first_day, self.last_day):
+            date_edit.blockSignals(False)
+
+    def periode(self) -> Periode:
+        """Return the selected period."""
+        if self.dropdown.count() == 0:
+            return Periode.semua()
+        periode = self.dropdown.currentData()
+        if periode is not None:
+            return periode
+
+        first_day = self.first_day.date().toPyDate()
+        last_day = self.last_day.date().toPyDate()
+        return Periode.rentang(min(first_day, last_day), max(first_day, last_day))
+
+    def _is_custom(self) -> bool:
+        return self.dropdown.currentText() == self.CUSTOM
+
+    def _on_index_changed(self, index: int):
+        custom = self._is_custom()
+        for widget in self.range_widgets:
+            widget.setVisible(custom)
+        self.changed.emit(self.periode())
+
+    def _on_range_changed(self, date: QDate):
+        if self._is_custom():
+            self.changed.emit(self.periode())
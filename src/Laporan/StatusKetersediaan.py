@@ -1,14 +1,26 @@
 import sys
 import os
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
-                           QLabel, QTableWidget, QTableWidgetItem, QHeaderView, QComboBox,
+                           QLabel, QTableView, QHeaderView, QComboBox,
                            QFrame, QSizePolicy, QCheckBox, QToolButton, QDesktopWidget)
 from PyQt5.QtCore import Qt, QRect
 from PyQt5.QtGui import QFont, QColor, QIcon
 import sqlite3
 from pathlib import Path
+from Database.ConnectionManager import ConnectionManager
+from Database.KeysetPaginator import KeysetPaginator
+from Database.QueryExecutor import QueryExecutor
+from Database.KeysetTableModel import KeysetTableModel
+from Laporan.LaporanExport import LaporanExport
+from Component.TableDelegates import StatusPillDelegate
 
 class StatusKetersediaanUI(QWidget):
+    # Columns of the report table, in display order
+    COLUMNS = ['NomorPlat', 'Model', 'Warna', 'Tahun', 'StatusKetersediaan']
+    HEADERS = ["NomorPlat", "Model", "Warna", "Tahun", "Status"]
+    # Default file name of an export
+    EXPORT_NAME = "Laporan Status Ketersediaan"
+
     def __init__(self, parent=None):
         """Initialize the Pelanggan (Customer) UI with complete styling and functionality."""
         super().__init__(parent)
@@ -18,10 +30,15 @@ class StatusKetersediaanUI(QWidget):
         
         # Store important paths for database access
         self.db_path = Path(__file__).parent.parent / "Database/CarGoOwner.db"
+        self.db = ConnectionManager.get(self.db_path)
+        self.loader = QueryExecutor(self)
+        # Counts the filtered rows for the page buttons, alongside the page loads
+        self.counter = QueryExecutor(self)
         
         # Initialize pagination variables
         self.current_page = 1
         self.items_per_page = 10
+        self.total_pages = 0  # Known once refresh_pagination() has counted the rows
         self.pagination_buttons = []  # Store pagination buttons
         
         # Initialize navigation button references
@@ -61,22 +78,12 @@ class StatusKetersediaanUI(QWidget):
         top_bar = self.setup_top_bar()
         layout.addLayout(top_bar)
 
-        # Calculate total pages
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('SELECT COUNT(*) FROM (SELECT NomorPlat, Model, Warna, Tahun, StatusKetersediaan FROM Mobil)')
-        total_records = cursor.fetchone()[0]
-        self.total_pages = (total_records + self.items_per_page - 1) // self.items_per_page
-        conn.close()
-
-        # If no records, hide pagination and return empty container
+        # Shown instead of the table when no car has the selected status
         self.message_error = QLabel("Tidak ada Data", self)
+        self.message_error.setAlignment(Qt.AlignCenter)
+        self.message_error.setStyleSheet("font-size: 42px; font-family: 'Poly', sans-serif; color: #6B7280;")
         self.message_error.hide()
-        if total_records == 0:
-            self.message_error.setAlignment(Qt.AlignCenter)
-            self.message_error.setStyleSheet("font-size: 42px; font-family: 'Poly', sans-serif; color: #6B7280;")
-            layout.addWidget(self.message_error)
-            return
+        layout.addWidget(self.message_error)
         
         # Initialize and setup the table
         self.setup_table()
@@ -107,16 +114,16 @@ class StatusKetersediaanUI(QWidget):
 
         top_bar.addWidget(self.periode_dropdown)
         top_bar.addStretch()
+        top_bar.addWidget(LaporanExport.button(self))
 
         return top_bar
 
     def setup_table(self):
         """Set up the table with calculated column widths based on screen size."""
-        self.table = QTableWidget()
-        self.table.setColumnCount(5)
-        self.table.setHorizontalHeaderLabels([
-            "NomorPlat", "Model", "Warna", "Tahun", "Status"
-        ])
+        self.table = QTableView()
+        self.table_model = KeysetTableModel(self.COLUMNS, self.HEADERS, self.loader, parent=self)
+        self.table.setModel(self.table_model)
+        self.table.setItemDelegateForColumn(4, StatusPillDelegate("Tersedia", "Tidak Tersedia", self.table))
         
         # Define column percentages (total should be 100)
         column_percentages = {
@@ -134,7 +141,7 @@ class StatusKetersediaanUI(QWidget):
         
         # Apply comprehensive table styling
         self.table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 background-color: white;
                 border: none;
                 font-family: 'Poly', sans-serif;
@@ -149,7 +156,7 @@ class StatusKetersediaanUI(QWidget):
                 text-align: left;
                 height: 24px;
             }
-            QTableWidget::item {
+            QTableView::item {
                 border-bottom: 1px solid #F3F4F6;
                 font-family: 'Poly', sans-serif;
                 padding: 8px;
@@ -160,6 +167,7 @@ class StatusKetersediaanUI(QWidget):
         # Configure additional table properties
         self.table.setShowGrid(False)
         self.table.verticalHeader().setVisible(False)
+        self.table.verticalHeader().setDefaultSectionSize(72)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Fixed)
 
     def setup_bottom_controls(self):
@@ -167,11 +175,11 @@ class StatusKetersediaanUI(QWidget):
         bottom_layout = QHBoxLayout()
         
         # Set up pagination
-        pagination_container = self.setup_pagination()
+        self.pagination_container = self.setup_pagination()
         
         # Assemble the bottom layout
         bottom_layout.addStretch()
-        bottom_layout.addWidget(pagination_container)
+        bottom_layout.addWidget(self.pagination_container)
         bottom_layout.addStretch()
 
         
@@ -185,16 +193,8 @@ class StatusKetersediaanUI(QWidget):
         pagination_layout.setContentsMargins(0, 0, 0, 0)
         pagination_layout.setSpacing(8)
         
-        # Calculate total pages
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('SELECT COUNT(*) FROM (SELECT NomorPlat, Model, Warna, Tahun, StatusKetersediaan FROM Mobil)')
-        total_records = cursor.fetchone()[0]
-        self.total_pages = (total_records + self.items_per_page - 1) // self.items_per_page
-        conn.close()
-
         # If no records, hide pagination and return empty container
-        if total_records == 0:
+        if self.total_pages == 0:
             pagination_container.hide()
             return pagination_container
         
@@ -296,21 +296,21 @@ class StatusKetersediaanUI(QWidget):
         if 1 <= page <= self.total_pages and page != self.current_page:
             self.current_page = page
             self.load_data()
-            # Recreate pagination with updated current page
-            bottom_layout = self.findChild(QHBoxLayout)
-            if bottom_layout:
-                # Find and remove the old pagination container
-                for i in range(bottom_layout.count()):
-                    item = bottom_layout.itemAt(i)
-                    if item and isinstance(item.widget(), QWidget):
-                        if isinstance(item.widget().layout(), QHBoxLayout):
-                            item.widget().deleteLater()
-                            break
-                
-                # Create and add new pagination container
-                new_pagination = self.setup_pagination()
-                # Add it at the same position (index 2)
-                bottom_layout.insertWidget(2, new_pagination)
+
+    def refresh_pagination(self):
+        """Count the cars with the selected status off the GUI thread, then rebuild the page buttons."""
+        self.counter.submit(self.report_paginator().count, on_result=self.show_pagination)
+
+    def show_pagination(self, total_records):
+        """Rebuild the page buttons for a record count, showing the empty message if there are none."""
+        self.total_pages = (total_records + self.items_per_page - 1) // self.items_per_page
+        self.message_error.setVisible(total_records == 0)
+        self.table.setVisible(total_records > 0)
+
+        old_pagination = self.pagination_container
+        self.pagination_container = self.setup_pagination()
+        self.layout().replaceWidget(old_pagination, self.pagination_container)
+        old_pagination.deleteLater()
 
     def previous_page(self):
         """Navigate to the previous page."""
@@ -325,162 +325,88 @@ class StatusKetersediaanUI(QWidget):
     def init_database(self):
         """Initialize the database and create tables with sample customer data."""
         try:
+            # Rows seeded into an empty table, reported once the transaction has committed
+            sample_data = []
             # Establish database connection
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Create the Pelanggan table with proper column order
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS Mobil (
-                    NomorPlat TEXT PRIMARY KEY,
-                    Model TEXT,
-                    Warna TEXT,
-                    Tahun INTEGER,
-                    StatusKetersediaan BOOLEAN
-                )
-            ''')
-            
-            # Check if table is empty and needs sample data
-            cursor.execute('SELECT COUNT(*) FROM (SELECT NomorPlat, Model, Warna, Tahun, StatusKetersediaan FROM Mobil)')
-            if cursor.fetchone()[0] == 0:
-                # Prepare sample data with 60 varied entries
-                sample_data = [
-                    ('B 1212 D', 'Xenia', 'Putih', '2009', 1),
-                    ('B 1212 D', 'Xenia', 'Putih', '2009', 1),
-                    ('B 1212 D', 'Xenia', 'Putih', '2009', 1),
-                    ('B 1212 D', 'Xenia', 'Putih', '2009', 1),
-                    ('B 1212 D', 'Xenia', 'Putih', '2009', 1),
-                    ('B 1212 D', 'Xenia', 'Putih', '2009', 1),
-                    ('B 1212 D', 'Xenia', 'Putih', '2009', 1),
-                    ('B 1212 D', 'Xenia', 'Putih', '2009', 1),
-                    ('B 1212 D', 'Xenia', 'Putih', '2009', 1),
-                    ('B 1212 D', 'Xenia', 'Putih', '2009', 1),
-                    ('B 1212 D', 'Xenia', 'Putih', '2009', 1),
-                    ('B 1212 D', 'Xenia', 'Putih', '2009', 1),
-                    ('B 1212 D', 'Xenia', 'Putih', '2009', 1),
-                    ('B 1212 D', 'Xenia', 'Putih', '2009', 1),
-                    ('B 1212 D', 'Xenia', 'Putih', '2009', 1),
-                    ('B 1212 D', 'Xenia', 'Putih', '2009', 1),
-                    ('B 1212 D', 'Xenia', 'Putih', '2009', 1),
-                    ('B 1212 D', 'Xenia', 'Putih', '2009', 1),
-                    ('B 1212 D', 'Xenia', 'Putih', '2009', 1),
-                    ('B 1212 D', 'Xenia', 'Putih', '2009', 1),
-                    ('B 1212 D', 'Xenia', 'Putih', '2009', 1),
-                    ('B 1212 D', 'Xenia', 'Putih', '2009', 1),
-                    ('B 1212 D', 'Xenia', 'Putih', '2009', 1),
-                    ('B 1212 D', 'Xenia', 'Putih', '2009', 1),
-                ]
+            with self.db.transaction() as conn:
+                cursor = conn.cursor()
                 
-                # Insert all sample data
-                cursor.executemany('''
-                    INSERT INTO Mobil (NomorPlat, Model, Warna, Tahun, StatusKetersediaan)
-                    VALUES (?, ?, ?, ?, ?)
-                ''', sample_data)
+                # Create the Pelanggan table with proper column order
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS Mobil (
+                        NomorPlat TEXT PRIMARY KEY,
+                        Model TEXT,
+                        Warna TEXT,
+                        Tahun INTEGER,
+                        StatusKetersediaan BOOLEAN
+                    )
+                ''')
                 
-            # Commit changes and ensure they're saved
-            conn.commit()
+                # Check if table is empty and needs sample data
+                cursor.execute('SELECT COUNT(*) FROM (SELECT NomorPlat, Model, Warna, Tahun, StatusKetersediaan FROM Mobil)')
+                if cursor.fetchone()[0] == 0:
+                    # Prepare sample data with 60 varied entries
+                    sample_data = [
+                        ('B 1212 D', 'Xenia', 'Putih', '2009', 1),
+                        ('B 1212 D', 'Xenia', 'Putih', '2009', 1),
+                        ('B 1212 D', 'Xenia', 'Putih', '2009', 1),
+                        ('B 1212 D', 'Xenia', 'Putih', '2009', 1),
+                        ('B 1212 D', 'Xenia', 'Putih', '2009', 1),
+                        ('B 1212 D', 'Xenia', 'Putih', '2009', 1),
+                        ('B 1212 D', 'Xenia', 'Putih', '2009', 1),
+                        ('B 1212 D', 'Xenia', 'Putih', '2009', 1),
+                        ('B 1212 D', 'Xenia', 'Putih', '2009', 1),
+                        ('B 1212 D', 'Xenia', 'Putih', '2009', 1),
+                        ('B 1212 D', 'Xenia', 'Putih', '2009', 1),
+                        ('B 1212 D', 'Xenia', 'Putih', '2009', 1),
+                        ('B 1212 D', 'Xenia', 'Putih', '2009', 1),
+                        ('B 1212 D', 'Xenia', 'Putih', '2009', 1),
+                        ('B 1212 D', 'Xenia', 'Putih', '2009', 1),
+                        ('B 1212 D', 'Xenia', 'Putih', '2009', 1),
+                        ('B 1212 D', 'Xenia', 'Putih', '2009', 1),
+                        ('B 1212 D', 'Xenia', 'Putih', '2009', 1),
+                        ('B 1212 D', 'Xenia', 'Putih', '2009', 1),
+                        ('B 1212 D', 'Xenia', 'Putih', '2009', 1),
+                        ('B 1212 D', 'Xenia', 'Putih', '2009', 1),
+                        ('B 1212 D', 'Xenia', 'Putih', '2009', 1),
+                        ('B 1212 D', 'Xenia', 'Putih', '2009', 1),
+                        ('B 1212 D', 'Xenia', 'Putih', '2009', 1),
+                    ]
+                    
+                    # Insert all sample data
+                    cursor.executemany('''
+                        INSERT INTO Mobil (NomorPlat, Model, Warna, Tahun, StatusKetersediaan)
+                        VALUES (?, ?, ?, ?, ?)
+                    ''', sample_data)
+            if sample_data:
+                self.db.mark_changed('Mobil', delta=len(sample_data))
             
         except sqlite3.Error as e:
             print(f"Database error: {e}")
-            
-        finally:
-            # Ensure connection is closed even if an error occurs
-            if conn:
-                conn.close()
+
+    def report_paginator(self):
+        """Return the paginator of the report with the selected status applied."""
+        text = self.periode_dropdown.currentText()
+        if text == 'Tersedia' :
+            where = "StatusKetersediaan == 1"
+        elif text == "Tidak Tersedia" :
+            where = "StatusKetersediaan == 0"
+        else :
+            where = None
+
+        return KeysetPaginator.get(
+            self.db, 'Mobil', 'NomorPlat', self.COLUMNS,
+            where, page_size=self.items_per_page
+        )
 
     def load_data(self):
         """Load and display data from the database with pagination."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            # Calculate offset based on current page
-            offset = (self.current_page - 1) * self.items_per_page
-
-            text = self.periode_dropdown.currentText()
-            if text == 'Tersedia' :
-                cursor.execute(f'''
-                    SELECT NomorPlat, Model, Warna, Tahun, StatusKetersediaan
-                    FROM Mobil WHERE StatusKetersediaan == 1
-                    LIMIT {self.items_per_page} 
-                    OFFSET {offset}
-                ''')
-                data = cursor.fetchall()
-            elif text == "Tidak Tersedia" :
-                cursor.execute(f'''
-                    SELECT NomorPlat, Model, Warna, Tahun, StatusKetersediaan
-                    FROM Mobil WHERE StatusKetersediaan == 0
-                    LIMIT {self.items_per_page} 
-                    OFFSET {offset}
-                ''')
-                data = cursor.fetchall()
-            else :
-                cursor.execute(f'''
-                    SELECT NomorPlat, Model, Warna, Tahun, StatusKetersediaan
-                    FROM Mobil
-                    LIMIT {self.items_per_page} 
-                    OFFSET {offset}
-                ''')
-                data = cursor.fetchall()
-            
-
-            
-            # Set up table rows
-            self.table.setRowCount(len(data))
-            for row, record in enumerate(data):                
-                # Add data cells
-                for col, value in enumerate(record):
-                    if col == 4:  # Status column
-                        self.create_status_cell(row, col, value == 1)
-                    else:
-                        item = QTableWidgetItem(str(value))
-                        item.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-                        item.setFlags(item.flags() & ~Qt.ItemIsEditable)
-                        self.table.setItem(row, col, item)
-                
-                # Set row height
-                self.table.setRowHeight(row, 72)
+            self.refresh_pagination()
+            self.table_model.reset(self.report_paginator(), self.current_page)
             
         except sqlite3.Error as e:
             print(f"Error loading data: {e}")
-            
-        finally:
-            if conn:
-                conn.close()
-
-    def create_status_cell(self, row, col, is_pinjam):
-        """Create a styled status cell indicating whether a customer has borrowed items."""
-        status_text = "Tersedia" if is_pinjam else "Tidak Tersedia"
-        status_btn = QPushButton(status_text)
-        status_btn.setStyleSheet(f"""
-            QPushButton {{
-                background-color: {'#D1FAE5' if is_pinjam else '#FEE2E2'};
-                color: {'#10B981' if is_pinjam else '#EF4444'};
-                border: 1px solid {'#10B981' if is_pinjam else '#EF4444'};
-                border-radius: 10px;
-                padding-right: 12px;
-                padding-left: 12px;
-                min-height: 30px;
-                min-width: 100px;
-                font-family: 'Poly', sans-serif;
-                font-weight: 500;
-                font-size: 14px;
-                text-align: center;
-            }}
-        """)
-        
-        container = QWidget()
-        layout = QHBoxLayout(container)
-        layout.setContentsMargins(16, 16, 16, 16)
-        layout.addWidget(status_btn, alignment=Qt.AlignCenter)
-        self.table.setCellWidget(row, col, container)
-
-        """Handle the edit action when a customer's edit button is clicked."""
-        # Get the NIK of the selected customer
-        nik_item = self.table.item(row, 1)
-        if nik_item:
-            nik = nik_item.text()
-            print(f"Editing customer with NIK: {nik}")
-            # TODO: Implement edit dialog functionality
 
     def apply_filters(self):
             """Apply filters based on the selected color and year."""
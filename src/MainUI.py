@@ -1,7 +1,7 @@
 import sys
-from PyQt5.QtWidgets import QTreeWidget, QTreeWidgetItem, QApplication, QMainWindow, QVBoxLayout, QLabel, QListWidget, QListWidgetItem, QWidget, QHBoxLayout, QStackedWidget, QPushButton, QDesktopWidget
-from PyQt5.QtGui import QFont, QIcon, QFontDatabase, QPixmap
-from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QTreeWidget, QTreeWidgetItem, QApplication, QMainWindow, QVBoxLayout, QLabel, QListWidget, QListWidgetItem, QWidget, QHBoxLayout, QStackedWidget, QPushButton, QDesktopWidget, QShortcut
+from PyQt5.QtGui import QFont, QIcon, QFontDatabase, QPixmap, QKeySequence
+from PyQt5.QtCore import Qt, QTimer
 from Mobil.MobilController import MobilController
 from Peminjaman.peminjamanUI import PeminjamanUI
 from Pelanggan.PelangganController import PelangganController
@@ -10,9 +10,32 @@ from Notifikasi.NotifikasiController import NotifikasiController
 from Laporan.HistoriPeminjaman import HistoriPeminjamanUI
 from Laporan.Pendapatan import PendapatanUI
 from Laporan.StatusKetersediaan import StatusKetersediaanUI
+from Database.CarGoOwner import DatabaseManager
+from Database.QueryExecutor import QueryExecutor
+from Database.Denormalization import Denormalization
+from Database.QueryProfiler import QueryProfiler
+from Component.DiagnosticsPanel import DiagnosticsPanel
 
 class MenuUI(QMainWindow):
-    def __init__(self):
+    # Screens shown in the stacked widget, built the first time they are selected
+    SCREENS = {
+        'mobil': MobilController,
+        'peminjaman': PeminjamanUI,
+        'pelanggan': PelangganController,
+        'jadwalpengembalian': PengembalianUI,
+        'pembayaranrental': PembayaranUI,
+        'historipeminjamanmobil': HistoriPeminjamanUI,
+        'statusketersediaanmobil': StatusKetersediaanUI,
+        'pendapatan': PendapatanUI,
+    }
+
+    def __init__(self, prewarm=True):
+        """
+        Build the window with only the welcome screen; other screens are created on demand.
+
+        Args:
+            prewarm: Build the remaining screens in the background once the first frame is shown
+        """
         super(MenuUI, self).__init__()
 
         # Set Up Font Poly
@@ -35,30 +58,21 @@ class MenuUI(QMainWindow):
         
         # Create stacked widget
         self.stackedWidget = QStackedWidget()
-        # Initialize all UI components
+        # Only the welcome screen is built up front; see screen_widget()
         self.menu = self.MainUI()
-        self.mobil = MobilController()
-        # Panggil Peminjaman UI
-        self.peminjaman = PeminjamanUI()
-        self.pelanggan = PelangganController()
-        # Panggil Pelanggan UI
-        self.jadwalpengembalian = PengembalianUI()
-        self.pembayaranrental = PembayaranUI()
-        self.historipeminjamanmobil = HistoriPeminjamanUI()
-        self.statusketersediaanmobil = StatusKetersediaanUI()
-        self.pendapatan = PendapatanUI()
+        self.screens = {}
+        self.prewarm = prewarm
+        self.prewarm_started = False
         self.clicknotif = NotifikasiController()
+        self.profiler = QueryProfiler.instance()
+        self.profiler.screen = 'menu'
+
+        # Hidden query diagnostics, built on first use
+        self.diagnostics = None
+        QShortcut(QKeySequence("Ctrl+Shift+D"), self, activated=self.show_diagnostics)
 
         # Add widgets to stacked widget
         self.stackedWidget.addWidget(self.menu)
-        self.stackedWidget.addWidget(self.mobil)
-        self.stackedWidget.addWidget(self.peminjaman)
-        self.stackedWidget.addWidget(self.pelanggan)
-        self.stackedWidget.addWidget(self.jadwalpengembalian)
-        self.stackedWidget.addWidget(self.pembayaranrental)
-        self.stackedWidget.addWidget(self.historipeminjamanmobil)
-        self.stackedWidget.addWidget(self.statusketersediaanmobil)
-        self.stackedWidget.addWidget(self.pendapatan)
 
         # Create sidebar and separator
         sidebar, separator = self.create_sidebar()
@@ -77,6 +91,50 @@ class MenuUI(QMainWindow):
         main_layout.setStretch(1, 0)  # Separator takes minimal space
         main_layout.setStretch(2, 4)  # Main content takes 4 parts
         
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.prewarm and not self.prewarm_started:
+            self.prewarm_started = True
+            # Wait for the first frame before building anything else
+            QTimer.singleShot(0, self.prewarm_next_screen)
+
+    def screen_widget(self, name):
+        """
+        Return a screen of the stacked widget, building it on first use.
+
+        Args:
+            name: Key of the screen in SCREENS
+
+        Returns:
+            The screen widget
+        """
+        if name not in self.screens:
+            with self.profiler.attributed(name):
+                widget = self.SCREENS[name]()
+            self.stackedWidget.addWidget(widget)
+            self.screens[name] = widget
+        return self.screens[name]
+
+    def show_screen(self, name):
+        """Switch the stacked widget to a screen, building it if needed."""
+        self.profiler.screen = name
+        self.stackedWidget.setCurrentWidget(self.screen_widget(name))
+
+    def show_diagnostics(self):
+        """Open the query diagnostics panel (Ctrl+Shift+D)."""
+        if self.diagnostics is None:
+            self.diagnostics = DiagnosticsPanel(self)
+        self.diagnostics.show()
+        self.diagnostics.raise_()
+
+    def prewarm_next_screen(self):
+        """Build one screen that has not been opened yet, then yield to the event loop before the next."""
+        pending = [name for name in self.SCREENS if name not in self.screens]
+        if pending:
+            self.screen_widget(pending[0])
+        if len(pending) > 1:
+            QTimer.singleShot(0, self.prewarm_next_screen)
+
     def create_sidebar(self):
         # Sidebar widget
         sidebar_widget = QWidget()
@@ -196,30 +254,30 @@ class MenuUI(QMainWindow):
         return [["Status Ketersediaan", self.onClickStatusKetersediaanMobil], ["Histori Peminjaman", self.onClickHistoriPeminjamanMobil], ["Pendapatan", self.onClickPendapatan]]
   
     def onClickMobil(self):
-        self.stackedWidget.setCurrentWidget(self.mobil)
+        self.show_screen('mobil')
 
     def onClickPeminjaman(self):
-        self.stackedWidget.setCurrentWidget(self.peminjaman)
+        self.show_screen('peminjaman')
 
     def onClickPelanggan(self):
-        self.stackedWidget.setCurrentWidget(self.pelanggan)
+        self.show_screen('pelanggan')
   
     def onClickJadwalPengembalian(self):
         self.clicknotif.clickedJadwalPengembalian()
-        self.stackedWidget.setCurrentWidget(self.jadwalpengembalian)
+        self.show_screen('jadwalpengembalian')
 
     def onClickPembayaranRental(self):
         self.clicknotif.clickedPembayaranRental()
-        self.stackedWidget.setCurrentWidget(self.pembayaranrental)
+        self.show_screen('pembayaranrental')
   
     def onClickStatusKetersediaanMobil(self):
-        self.stackedWidget.setCurrentWidget(self.statusketersediaanmobil)
+        self.show_screen('statusketersediaanmobil')
     
     def onClickHistoriPeminjamanMobil(self):
-        self.stackedWidget.setCurrentWidget(self.historipeminjamanmobil)
+        self.show_screen('historipeminjamanmobil')
 
     def onClickPendapatan(self):
-        self.stackedWidget.setCurrentWidget(self.pendapatan)
+        self.show_screen('pendapatan')
         
     def MainUI(self):
         # Main content
@@ -250,9 +308,28 @@ class MenuUI(QMainWindow):
 
 def main():
     app = QApplication(sys.argv)
+    database = DatabaseManager()
+    settings = database.configureDatabase()
+    database.migrateDatabase()
     window = MenuUI()
     window.show()
-    sys.exit(app.exec_())
+
+    # Checkpoint the write-ahead log in the background now and then, and empty it on exit
+    checkpoints = QueryExecutor()
+    timer = QTimer()
+    timer.timeout.connect(lambda: checkpoints.submit(database.checkpoint))
+    if settings['checkpoint_interval'] > 0:
+        timer.start(settings['checkpoint_interval'] * 1000)
+
+    # Repair customer details copied into rentals that drifted, once at startup
+    Denormalization(database.db).start()
+
+    code = app.exec_()
+    timer.stop()
+    # A repair still running finishes its batches before the log is emptied
+    Denormalization.pool().waitForDone()
+    database.checkpoint("TRUNCATE")
+    sys.exit(code)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,8 +1,14 @@
 import os
 import sqlite3
 from dataclasses import dataclass
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Tuple, Optional, Sequence, Union
 from pathlib import Path
+from Database.ConnectionManager import ConnectionManager
+from Database.KeysetPaginator import KeysetPaginator
+from Database.AvailabilityIndex import AvailabilityIndex
+from Database.FullTextSearch import SearchResults
+from Mobil.MobilThumbnail import MobilThumbnail
+from Mobil.MobilPixmapCache import MobilPixmapCache
 
 @dataclass
 class Mobil:
@@ -17,50 +23,58 @@ class Mobil:
     Tahun: int
     Status: int
     
+    # Every column of the Mobil table, and the default projection for lists (no image BLOB)
+    COLUMNS = ['NomorPlat', 'Gambar', 'Model', 'Warna', 'Tahun', 'StatusKetersediaan']
+    LIST_COLUMNS = ['NomorPlat', 'Model', 'Warna', 'Tahun', 'StatusKetersediaan']
+    
+    # Plates bound per IN (...) list, well under SQLite's limit on host parameters
+    DELETE_CHUNK_SIZE = 500
+    
     def __init__(self):
         """Initialize database connection and setup"""
         self.db_path = Path(__file__).parent.parent / "Database/CarGoOwner.db"
         self.schema_path = Path(__file__).parent.parent / "schema.sql"
+        self.db = ConnectionManager.get(self.db_path)
             
-    def get_mobil(self, page: int, items_per_page: int) -> Tuple[List[Dict[str, Any]], int]:
+    def _projection(self, columns: Optional[Sequence[str]]) -> List[str]:
+        """Validate a requested column list, defaulting to LIST_COLUMNS."""
+        if columns is None:
+            return list(self.LIST_COLUMNS)
+        
+        unknown = [column for column in columns if column not in self.COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown Mobil columns: {', '.join(unknown)}")
+        return list(columns)
+
+    def get_mobil(self, page: int, items_per_page: int, columns: Sequence[str] = None) -> Tuple[List[Dict[str, Any]], int]:
         """
         Retrieve paginated customer data from the database.
         
         Args:
             page: Current page number
             items_per_page: Number of items per page
+            columns: Columns to return (defaults to LIST_COLUMNS; images are loaded with get_gambar)
             
         Returns:
             Tuple containing list of customer data and total number of records
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Get total count
-            cursor.execute('SELECT COUNT(*) FROM Mobil')
-            total_records = cursor.fetchone()[0]
-            
-            # Get paginated data
-            offset = (page - 1) * items_per_page
-            cursor.execute('''
-                SELECT * FROM Mobil 
-                LIMIT ? OFFSET ?
-            ''', (items_per_page, offset))
-            
-            # Convert to list of dictionaries
-            columns = ['NomorPlat', 'Gambar', 'Model', 'Warna', 'Tahun', 'StatusKetersediaan']
-            data = [dict(zip(columns, row)) for row in cursor.fetchall()]
-            
-            return data, total_records
-            
+            with self.db.connection() as conn:
+                cursor = conn.cursor()
+                
+                # Get total count
+                total_records = self.db.counts.count('Mobil')
+                
+                # Get paginated data
+                data = self.paginate(items_per_page, columns=columns).page(page).rows
+                
+                return data, total_records
+                
         except sqlite3.Error as e:
             raise Exception(f"Error retrieving customer data: {str(e)}")
-        finally:
-            if conn:
-                conn.close()
 
-    def get_mobil_filtered(self, page: int, items_per_page: int, year: int = None, color: str = None) -> Tuple[List[Dict[str, Any]], int]:
+    def get_mobil_filtered(self, page: int, items_per_page: int, year: int = None, color: str = None,
+                           columns: Sequence[str] = None, search: str = None) -> Tuple[List[Dict[str, Any]], int]:
         """
         Retrieve paginated customer data from the database with optional filters for year and color.
         
@@ -69,49 +83,60 @@ class Mobil:
             items_per_page: Number of items per page
             year: Optional filter for the year
             color: Optional filter for the color
+            columns: Columns to return (defaults to LIST_COLUMNS; images are loaded with get_gambar)
+            search: Optional text to search plates, models and colors for; results are ranked by relevance
             
         Returns:
             Tuple containing list of customer data and total number of records
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Build the query with optional filters
-            query = 'SELECT * FROM Mobil WHERE 1=1'
-            params = []
+            paginator = self.paginate(items_per_page, year, color, columns, search)
             
-            if year is not None:
-                query += ' AND Tahun = ?'
-                params.append(year)
-                
-            if color is not None:
-                query += ' AND Warna = ?'
-                params.append(color)
-                
             # Get total count with filters
-            count_query = f'SELECT COUNT(*) FROM ({query})'
-            cursor.execute(count_query, params)
-            total_records = cursor.fetchone()[0]
-            print(total_records)
-            
-            # Add pagination to the query
-            query += ' LIMIT ? OFFSET ?'
-            params.extend([items_per_page, (page - 1) * items_per_page])
+            total_records = paginator.count()
             
-            cursor.execute(query, params)
-            
-            # Convert to list of dictionaries
-            columns = ['NomorPlat', 'Gambar', 'Model', 'Warna', 'Tahun', 'StatusKetersediaan']
-            data = [dict(zip(columns, row)) for row in cursor.fetchall()]
+            data = paginator.page(page).rows
             
             return data, total_records
-            
+                
         except sqlite3.Error as e:
             raise Exception(f"Error retrieving customer data: {str(e)}")
-        finally:
-            if conn:
-                conn.close()
+
+    def paginate(self, items_per_page: int, year: int = None, color: str = None,
+                 columns: Sequence[str] = None, search: str = None) -> Union[KeysetPaginator, SearchResults]:
+        """
+        Return the keyset paginator over Mobil ordered by NomorPlat, with optional filters.
+        
+        Args:
+            items_per_page: Number of items per page
+            year: Optional filter for the year
+            color: Optional filter for the color
+            columns: Columns to return (defaults to LIST_COLUMNS)
+            search: Optional text to search plates, models and colors for
+            
+        Returns:
+            Shared KeysetPaginator for the filtered query, or SearchResults ranked by relevance when searching
+        """
+        conditions = []
+        params = []
+        
+        if year is not None:
+            conditions.append('Tahun = ?')
+            params.append(year)
+            
+        if color is not None:
+            conditions.append('Warna = ?')
+            params.append(color)
+            
+        if search and search.strip():
+            return SearchResults(
+                self.db, 'Mobil', search, self._projection(columns),
+                ' AND '.join(conditions) or None, params, items_per_page
+            )
+        return KeysetPaginator.get(
+            self.db, 'Mobil', 'NomorPlat', self._projection(columns),
+            ' AND '.join(conditions) or None, params, items_per_page
+        )
 
     def set_mobil(self, mobil: Dict[str, Any], mode: str = "create") -> bool:
         """
@@ -125,83 +150,227 @@ class Mobil:
             bool: True if operation was successful
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            with self.db.transaction() as conn:
+                cursor = conn.cursor()
+                
+                nomor_plats = []
+                if mode == "create":
+                    delta = 1
+                    cursor.execute('''
+                        INSERT INTO Mobil (NomorPlat, Gambar, Model, Warna, Tahun, StatusKetersediaan)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                    ''', (
+                        mobil['NomorPlat'],
+                        mobil['Gambar'],
+                        mobil['Model'],
+                        mobil['Warna'],
+                        mobil['Tahun'],
+                        mobil['StatusKetersediaan']
+                    ))
+                    MobilThumbnail.store(conn, [(mobil['NomorPlat'], mobil['Gambar'])])
+                elif mode == "edit":
+                    delta = 0
+                    nomor_plats = [mobil['NomorPlat']]
+                    cursor.execute('''
+                        UPDATE Mobil 
+                        SET Model = ?, Warna = ?, Tahun = ?, StatusKetersediaan = ?
+                        WHERE NomorPlat = ?
+                    ''', (
+                        mobil['Model'],
+                        mobil['Warna'],
+                        mobil['Tahun'],
+                        mobil['StatusKetersediaan'],
+                        mobil['NomorPlat']
+                    ))
+                    
+                    # Only replace the image (and re-render its thumbnail) when a different one was given
+                    if mobil.get('Gambar'):
+                        cursor.execute('''
+                            UPDATE Mobil SET Gambar = ?
+                            WHERE NomorPlat = ? AND Gambar IS NOT ?
+                        ''', (mobil['Gambar'], mobil['NomorPlat'], mobil['Gambar']))
+                        if cursor.rowcount:
+                            MobilThumbnail.store(conn, [(mobil['NomorPlat'], mobil['Gambar'])])
+                elif mode == "delete":
+                    # Support deleting a single customer or multiple customers
+                    nomor_plats = mobil['NomorPlat'] if isinstance(mobil['NomorPlat'], list) else [mobil['NomorPlat']]
+                    cursor.executemany(
+                        'DELETE FROM Mobil WHERE NomorPlat = ?',
+                        [(nomor_plat,) for nomor_plat in nomor_plats]
+                    )
+                    delta = -cursor.rowcount
+                else:
+                    raise ValueError(f"Invalid mode: {mode}")
+                
+            self.db.mark_changed('Mobil', delta=delta)
+            MobilPixmapCache.instance().invalidate(nomor_plats)
+            if mode == "delete":
+                AvailabilityIndex.get(self.db).remove_mobil(nomor_plats)
+            else:
+                AvailabilityIndex.get(self.db).put_mobil(
+                    mobil['NomorPlat'], mobil['Model'], int(mobil['StatusKetersediaan']) == 1
+                )
+            return True
+                
+        except sqlite3.Error as e:
+            raise Exception(f"Error performing database operation: {str(e)}")
+
+    def delete_mobil(self, nomor_plats: Sequence[str]) -> Dict[str, str]:
+        """
+        Delete a batch of cars in a single transaction.
+        Cars that cannot be deleted (missing, or still referenced by Peminjaman records)
+        are skipped and reported instead of failing the whole batch.
+        
+        Args:
+            nomor_plats: License plates of the cars to delete
+            
+        Returns:
+            Dictionary mapping each plate that was not deleted to the reason
+        """
+        nomor_plats = list(dict.fromkeys(nomor_plats))
+        failures = {}
+        deleted = 0
+        
+        try:
+            with self.db.transaction() as conn:
+                for start in range(0, len(nomor_plats), self.DELETE_CHUNK_SIZE):
+                    chunk = nomor_plats[start:start + self.DELETE_CHUNK_SIZE]
+                    placeholders = ', '.join('?' * len(chunk))
+                    
+                    existing = {row[0] for row in conn.execute(
+                        f'SELECT NomorPlat FROM Mobil WHERE NomorPlat IN ({placeholders})', chunk
+                    )}
+                    referenced = {row[0] for row in conn.execute(
+                        f'SELECT DISTINCT NomorPlat FROM Peminjaman WHERE NomorPlat IN ({placeholders})', chunk
+                    )}
+                    
+                    deletable = []
+                    for nomor_plat in chunk:
+                        if nomor_plat not in existing:
+                            failures[nomor_plat] = "Car not found"
+                        elif nomor_plat in referenced:
+                            failures[nomor_plat] = "Still referenced by Peminjaman records"
+                        else:
+                            deletable.append(nomor_plat)
+                    if not deletable:
+                        continue
+                    
+                    try:
+                        with self.db.transaction():
+                            cursor = conn.execute(
+                                f"DELETE FROM Mobil WHERE NomorPlat IN ({', '.join('?' * len(deletable))})",
+                                deletable
+                            )
+                            deleted += cursor.rowcount
+                    except sqlite3.IntegrityError:
+                        # Some other constraint rejected the chunk; retry plate by plate to find which
+                        for nomor_plat in deletable:
+                            try:
+                                with self.db.transaction():
+                                    deleted += conn.execute(
+                                        'DELETE FROM Mobil WHERE NomorPlat = ?', (nomor_plat,)
+                                    ).rowcount
+                            except sqlite3.IntegrityError as e:
+                                failures[nomor_plat] = str(e)
+                
+        except sqlite3.Error as e:
+            raise Exception(f"Error deleting cars: {str(e)}")
+        
+        self.db.mark_changed('Mobil', delta=-deleted)
+        MobilPixmapCache.instance().invalidate(nomor_plats)
+        AvailabilityIndex.get(self.db).remove_mobil(
+            [nomor_plat for nomor_plat in nomor_plats if nomor_plat not in failures]
+        )
+        return failures
+
+    def get_mobil_by_plate(self, nomor_plat: str, columns: Sequence[str] = None) -> Dict[str, Any]:
+        """
+        Retrieve a single car, by default including its full-resolution image (e.g. for the edit form).
+        
+        Args:
+            nomor_plat: License plate of the car
+            columns: Columns to return (defaults to all columns)
             
-            if mode == "create":
-                cursor.execute('''
-                    INSERT INTO Mobil (NomorPlat, Gambar, Model, Warna, Tahun, StatusKetersediaan)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', (
-                    mobil['NomorPlat'],
-                    mobil['Gambar'],
-                    mobil['Model'],
-                    mobil['Warna'],
-                    mobil['Tahun'],
-                    mobil['StatusKetersediaan']
-                ))
-            elif mode == "edit":
-                cursor.execute('''
-                    UPDATE Mobil 
-                    SET Gambar = ?, Model = ?, Warna = ?, Tahun = ?, StatusKetersediaan = ?
-                    WHERE NomorPlat = ?
-                ''', (
-                    mobil['Gambar'],
-                    mobil['Model'],
-                    mobil['Warna'],
-                    mobil['Tahun'],
-                    mobil['StatusKetersediaan'],
-                    mobil['NomorPlat']
-                ))
-            elif mode == "delete":
-                # Support deleting a single customer or multiple customers
-                nomor_plats = mobil['NomorPlat'] if isinstance(mobil['NomorPlat'], list) else [mobil['NomorPlat']]
-                cursor.executemany(
-                    'DELETE FROM Mobil WHERE NomorPlat = ?',
-                    [(nomor_plat,) for nomor_plat in nomor_plats]
+        Returns:
+            Dictionary of the requested columns, or None if the car does not exist
+        """
+        columns = self._projection(self.COLUMNS if columns is None else columns)
+        try:
+            with self.db.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    f"SELECT {', '.join(columns)} FROM Mobil WHERE NomorPlat = ?",
+                    (nomor_plat,)
                 )
-            else:
-                raise ValueError(f"Invalid mode: {mode}")
+                row = cursor.fetchone()
+                
+                return dict(zip(columns, row)) if row else None
+                
+        except sqlite3.Error as e:
+            raise Exception(f"Error retrieving car data: {str(e)}")
+
+    def get_gambar(self, nomor_plat: str) -> Optional[bytes]:
+        """
+        Load the full-resolution image of one car on demand.
+        
+        Args:
+            nomor_plat: License plate of the car
             
-            conn.commit()
-            return True
+        Returns:
+            Image bytes, or None if the car has no image
+        """
+        mobil = self.get_mobil_by_plate(nomor_plat, ['Gambar'])
+        return mobil['Gambar'] if mobil else None
+
+    def get_thumbnails(self, nomor_plats: List[str]) -> Dict[str, bytes]:
+        """
+        Retrieve the pre-rendered card images for a set of cars.
+        
+        Args:
+            nomor_plats: License plates of the cars shown on the current page
             
+        Returns:
+            Dictionary mapping NomorPlat to thumbnail bytes (cars without an image are omitted)
+        """
+        if not nomor_plats:
+            return {}
+        
+        try:
+            with self.db.connection() as conn:
+                cursor = conn.cursor()
+                placeholders = ', '.join('?' * len(nomor_plats))
+                cursor.execute(
+                    f'SELECT NomorPlat, Thumbnail FROM MobilThumbnail WHERE NomorPlat IN ({placeholders})',
+                    list(nomor_plats)
+                )
+                return dict(cursor.fetchall())
+                
         except sqlite3.Error as e:
-            raise Exception(f"Error performing database operation: {str(e)}")
-        finally:
-            if conn:
-                conn.close()
+            print(f"Error getting thumbnails: {e}")
+            return {}
 
     def get_unique_colors(self):
         """Get unique colors from the database."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute('SELECT DISTINCT Warna FROM Mobil')
-            colors = cursor.fetchall()
-            return [color[0] for color in colors]
-            
+            with self.db.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('SELECT DISTINCT Warna FROM Mobil')
+                colors = cursor.fetchall()
+                return [color[0] for color in colors]
+                
         except sqlite3.Error as e:
             print(f"Error getting unique colors: {e}")
             return []
-            
-        finally:
-            if conn:
-                conn.close()
 
     def get_unique_years(self):
         """Get unique years from the database."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute('SELECT DISTINCT Tahun FROM Mobil')
-            years = cursor.fetchall()
-            return [year[0] for year in years]
-            
+            with self.db.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('SELECT DISTINCT Tahun FROM Mobil')
+                years = cursor.fetchall()
+                return [year[0] for year in years]
+                
         except sqlite3.Error as e:
             print(f"Error getting unique years: {e}")
-            return []
-            
-        finally:
-            if conn:
-                conn.close()
\ No newline at end of file
+            return []
\ No newline at end of file
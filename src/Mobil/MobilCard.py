@@ -0,0 +1,178 @@
+from typing import Any, Dict, Optional
+
+from PyQt5.QtWidgets import QCheckBox, QGraphicsDropShadowEffect, QHBoxLayout, QLabel, QPushButton, QVBoxLayout, QWidget
+from PyQt5.QtGui import QFont, QIcon, QPixmap
+from PyQt5.QtCore import Qt, QSize, pyqtSignal
+
+from Mobil.MobilPixmapCache import MobilPixmapCache
+
+
+class MobilCard(QWidget):
+    """
+    A card of the car grid, built once and bound to a different car on every page.
+
+    The grid keeps one card per slot; binding only touches the labels, image and status icon
+    whose value changed, so flipping pages builds no widgets, shadows or pixmaps. An unbound
+    card is hidden but keeps its place, so the grid does not reflow on a short last page.
+    """
+
+    WIDTH = 360
+    HEIGHT = 340
+
+    # Longest title shown in full
+    TITLE_LENGTH = 20
+
+    STATUS_ICONS = {1: "./src/Component/checkbox_t.png", 0: "./src/Component/checkbox.png"}
+
+    # Status icon -> scaled pixmap, shared by all cards
+    _status_pixmaps: Dict[int, QPixmap] = {}
+
+    # Emitted with the bound car's NomorPlat when its edit button is clicked
+    editRequested = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setStyleSheet("""
+            QWidget {
+                background-color: #FFFFFF;
+                border-radius: 20px;
+                border: 1px;
+                padding: 3px;
+            }
+        """)
+        self.setFixedSize(self.WIDTH, self.HEIGHT)
+        policy = self.sizePolicy()
+        policy.setRetainSizeWhenHidden(True)
+        self.setSizePolicy(policy)
+        layout = QVBoxLayout(self)
+
+        # Add a drop shadow effect
+        shadow_effect = QGraphicsDropShadowEffect(self)
+        shadow_effect.setBlurRadius(20)
+        shadow_effect.setOffset(0, 5)
+        shadow_effect.setColor(Qt.gray)
+        self.setGraphicsEffect(shadow_effect)
+
+        # Car image (already scaled and rounded by MobilThumbnail)
+        self.image_label = QLabel()
+        self.image_label.setAlignment(Qt.AlignLeft)
+        self.image_label.setFixedSize(345, 200)
+        layout.addWidget(self.image_label)
+
+        info_layout = QHBoxLayout()
+
+        self.title_label = QLabel()
+        self.title_label.setFont(QFont("Poly", 17, QFont.Bold))
+        self.title_label.setAlignment(Qt.AlignLeft)
+        self.title_label.setFixedWidth(300)
+        self.title_label.setWordWrap(True)
+        info_layout.addWidget(self.title_label)
+
+        self.checkbox = QCheckBox()
+        info_layout.addWidget(self.checkbox)
+
+        edit_button = QPushButton()
+        edit_button.setIcon(QIcon("./src/Component/editButton.png"))
+        edit_button.setIconSize(QSize(41, 41))
+        edit_button.clicked.connect(lambda: self.editRequested.emit(self.nomor_plat))
+        info_layout.addWidget(edit_button)
+
+        info_layout.addStretch()
+        layout.addLayout(info_layout)
+
+        self.color_label = QLabel()
+        self.color_label.setFont(QFont("Poly", 14))
+        self.color_label.setWordWrap(True)
+        self.color_label.setAlignment(Qt.AlignLeft)
+
+        self.license_label = QLabel()
+        self.license_label.setFont(QFont("Poly", 14))
+        self.license_label.setObjectName("plate")
+        self.license_label.setWordWrap(True)
+        self.license_label.setAlignment(Qt.AlignLeft)
+
+        self.year_label = QLabel()
+        self.year_label.setFont(QFont("Poly", 14))
+        self.year_label.setAlignment(Qt.AlignRight)
+
+        details_layout = QVBoxLayout()
+        details_layout.addWidget(self.color_label)
+        details_layout.addWidget(self.license_label)
+
+        # Year and status on the right
+        sec_info_layout = QVBoxLayout()
+        sec_info_layout.addWidget(self.year_label)
+
+        self.status_label = QLabel()
+        self.status_label.setAlignment(Qt.AlignRight)
+        sec_info_layout.addWidget(self.status_label)
+
+        bottom_layout = QHBoxLayout()
+        bottom_layout.addLayout(details_layout)
+        bottom_layout.addStretch()
+        bottom_layout.addLayout(sec_info_layout)
+        layout.addLayout(bottom_layout)
+
+        self.nomor_plat: Optional[str] = None
+        # Field -> value currently shown, so a rebind skips unchanged widgets
+        self._shown: Dict[str, Any] = {}
+
+    @classmethod
+    def status_pixmap(cls, status: int) -> QPixmap:
+        """Return the scaled status icon, loading it on first use."""
+        status = 1 if status == 1 else 0
+        pixmap = cls._status_pixmaps.get(status)
+        if pixmap is None:
+            pixmap = cls._status_pixmaps[status] = QPixmap(cls.STATUS_ICONS[status]).scaled(
+                QSize(24, 24), Qt.KeepAspectRatio, Qt.SmoothTransformation
+            )
+        return pixmap
+
+    def _changed(self, field: str, value: Any) -> bool:
+        if field in self._shown and self._shown[field] == value:
+            return False
+        self._shown[field] = value
+        return True
+
+    def bind(self, car: Dict[str, Any], image_data: Optional[bytes]):
+        """
+        Show a car on this card.
+
+        Args:
+            car: Mobil row with NomorPlat, Model, Warna, Tahun and StatusKetersediaan
+            image_data: Encoded card thumbnail, or None if the car has no image
+        """
+        nomor_plat = car['NomorPlat']
+        if nomor_plat != self.nomor_plat:
+            # A selection belongs to the car, not to the slot
+            self.checkbox.setChecked(False)
+        self.nomor_plat = nomor_plat
+
+        if self._changed('image', (nomor_plat, image_data)):
+            if image_data:
+                self.image_label.setPixmap(MobilPixmapCache.instance().pixmap(nomor_plat, image_data))
+            else:
+                self.image_label.clear()
+
+        title = car['Model']
+        if self._changed('title', title):
+            self.title_label.setText(title if len(title) < self.TITLE_LENGTH else title[:self.TITLE_LENGTH] + "...")
+        if self._changed('color', car['Warna']):
+            self.color_label.setText(car['Warna'])
+        if self._changed('plate', nomor_plat):
+            self.license_label.setText(nomor_plat)
+        if self._changed('year', car['Tahun']):
+            self.year_label.setText(str(car['Tahun']))
+        if self._changed('status', car['StatusKetersediaan']):
+            self.status_label.setPixmap(self.status_pixmap(car['StatusKetersediaan']))
+
+        self.show()
+
+    def unbind(self):
+        """Hide the card for an empty slot, keeping its place in the grid."""
+        self.nomor_plat = None
+        self.checkbox.setChecked(False)
+        self.hide()
+
+    def is_selected(self) -> bool:
+        return self.nomor_plat is not None and self.checkbox.isChecked()
@@ -1,11 +1,16 @@
-from PyQt5.QtWidgets import QGridLayout, QPushButton, QComboBox, QHBoxLayout, QVBoxLayout, QLabel, QWidget, QGraphicsDropShadowEffect, QCheckBox, QMessageBox, QDialog
+from PyQt5.QtWidgets import QGridLayout, QPushButton, QComboBox, QLineEdit, QHBoxLayout, QVBoxLayout, QLabel, QWidget, QMessageBox, QDialog
 from PyQt5.QtGui import QFont, QPixmap, QPainter, QBrush, QIcon
-from PyQt5.QtCore import Qt, QSize, QRect
+from PyQt5.QtCore import Qt, QSize, QRect, QTimer
 from Mobil.MobilUI import MobilUI  # Ensure correct import
 from Mobil.Mobil import Mobil  # Ensure correct import
+from Mobil.MobilCard import MobilCard
+from Database.QueryExecutor import QueryExecutor
 import sqlite3
 
 class MobilController(QWidget):
+    # Pause in typing after which the search runs
+    SEARCH_DELAY_MS = 250
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle("MobilUI")
@@ -17,6 +22,7 @@ class MobilController(QWidget):
         self.pagination_buttons = []  # Store pagination buttons
 
         self.mobil = Mobil()
+        self.loader = QueryExecutor(self)
         
         # Initialize navigation button references
         self.first_button = None
@@ -66,6 +72,28 @@ class MobilController(QWidget):
         self.year_dropdown.currentIndexChanged.connect(self.showMobil)
         top_bar.addWidget(self.year_dropdown)
 
+        # Search box; the grid follows the text once typing pauses
+        self.search_box = QLineEdit()
+        self.search_box.setFont(QFont("Poly", 12))
+        self.search_box.setPlaceholderText("Cari plat, model atau warna")
+        self.search_box.setClearButtonEnabled(True)
+        self.search_box.setMinimumWidth(320)
+        self.search_box.setStyleSheet("""
+            QLineEdit {
+                padding: 8px;
+                padding-left: 20px;
+                border: 1px solid #D1D5DB;
+                border-radius: 5px;
+                background-color: #FFFFFF;
+            }
+        """)
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(self.SEARCH_DELAY_MS)
+        self.search_timer.timeout.connect(self.search_mobil)
+        self.search_box.textChanged.connect(self.search_timer.start)
+        top_bar.addWidget(self.search_box)
+
         top_bar.addStretch()
 
         main_layout.addLayout(top_bar)
@@ -76,6 +104,21 @@ class MobilController(QWidget):
         self.grid_layout.setSpacing(45)  # Set spacing between items in the grid layout
         main_layout.addLayout(self.grid_layout)
 
+        # One card per slot, rebound to each page's cars instead of rebuilt
+        self.cards = []
+        for i in range(self.items_per_page):
+            card = MobilCard()
+            card.editRequested.connect(self.edit_mobil)
+            card.unbind()
+            self.cards.append(card)
+            self.grid_layout.addWidget(card, i // 3, i % 3)
+
+        self.no_data_label = QLabel("Data Mobil tidak ada saat ini")
+        self.no_data_label.setFont(QFont("Poly", 16, QFont.Bold))
+        self.no_data_label.setAlignment(Qt.AlignCenter)
+        self.no_data_label.hide()
+        self.grid_layout.addWidget(self.no_data_label, 0, 0, 1, 3)  # Span across 3 columns
+
         # Pagination and bottom controls
         self.bottom_layout = self.setup_bottom_controls()
         self.bottom_widget = QWidget()
@@ -84,127 +127,8 @@ class MobilController(QWidget):
         
         self.showMobil()
 
-    def create_card(self, image_data, title, color, license_plate, year, status_icon):
-        """Create a card widget."""
-        card_widget = QWidget()
-        card_widget.setStyleSheet("""
-            QWidget {
-                background-color: #FFFFFF;
-                border-radius: 20px;
-                border: 1px;
-                padding: 3px;
-            }
-        """)
-
-        card_widget.setFixedSize(360, 340)  # Set a fixed width and height
-        layout = QVBoxLayout(card_widget)
-
-        # Add a drop shadow effect
-        shadow_effect = QGraphicsDropShadowEffect(card_widget)
-        shadow_effect.setBlurRadius(20)
-        shadow_effect.setOffset(0, 5)
-        shadow_effect.setColor(Qt.gray)
-        card_widget.setGraphicsEffect(shadow_effect)
-
-        # Car image
-        car_image = QLabel()
-        pixmap = QPixmap()
-        pixmap.loadFromData(image_data)
-        pixmap = pixmap.scaled(335, 200, Qt.KeepAspectRatioByExpanding, Qt.SmoothTransformation)
-        
-        # Create a mask for rounded corners at the top
-        mask = QPixmap(pixmap.size())
-        mask.fill(Qt.transparent)
-        painter = QPainter(mask)
-        painter.setRenderHint(QPainter.Antialiasing)
-        painter.setBrush(QBrush(Qt.black))
-        painter.setPen(Qt.NoPen)
-        rect = QRect(0, 0, pixmap.width(), pixmap.height())
-        painter.drawRoundedRect(rect, 20, 20)
-        painter.end()
-        
-        pixmap.setMask(mask.createMaskFromColor(Qt.transparent, Qt.MaskInColor))
-        car_image.setPixmap(pixmap)
-        car_image.setAlignment(Qt.AlignLeft)
-        car_image.setFixedSize(345, 200)  # Ensure the image fills the label
-        layout.addWidget(car_image)
-
-        # Car information layout
-        info_layout = QHBoxLayout()
-        
-        # Checkbox
-        title_label = QLabel(title if len(title) < 20 else title[:20] + "...")
-        title_label.setFont(QFont("Poly", 17, QFont.Bold))
-        title_label.setAlignment(Qt.AlignLeft)
-        title_label.setFixedWidth(300)
-        title_label.setWordWrap(True)
-        info_layout.addWidget(title_label)
-
-
-        checkbox = QCheckBox()
-        info_layout.addWidget(checkbox)
-        
-        # Title label
-        
-        # Edit button
-        edit_button = QPushButton()
-        edit_button.setIcon(QIcon("./src/Component/editButton.png"))
-        edit_button.setIconSize(QSize(41, 41))
-        edit_button.clicked.connect(lambda: MobilUI.formMobil(self, mode="edit", mobil_data={'NomorPlat': license_plate, 'Gambar': '', 'Model': title, 'Warna': color, 'Tahun': year, 'StatusKetersediaan': status_icon}))
-        info_layout.addWidget(edit_button)
-        
-        info_layout.addStretch()
-        layout.addLayout(info_layout)
-
-        color_label = QLabel(color)
-        color_label.setFont(QFont("Poly", 14))
-        color_label.setWordWrap(True)
-        color_label.setAlignment(Qt.AlignLeft)
-
-        license_label = QLabel(license_plate)
-        license_label.setFont(QFont("Poly", 14))
-        license_label.setObjectName("plate")
-        license_label.setWordWrap(True)
-        license_label.setAlignment(Qt.AlignLeft)
-
-        year_label = QLabel(str(year))
-        year_label.setFont(QFont("Poly", 14))
-        year_label.setAlignment(Qt.AlignRight)
-
-        # Info layout
-        info_layout = QVBoxLayout()
-        info_layout.addWidget(color_label)
-        info_layout.addWidget(license_label)
-
-        # Bottom row with year and status
-        sec_info_layout = QVBoxLayout()
-        sec_info_layout.addWidget(year_label)
-
-        # Add status icon
-        status_label = QLabel()
-        status_icon_path = "./src/Component/checkbox_t.png" if status_icon == 1 else "./src/Component/checkbox.png"
-        status_pixmap = QPixmap(status_icon_path).scaled(QSize(24, 24), Qt.KeepAspectRatio, Qt.SmoothTransformation)
-        status_label.setPixmap(status_pixmap)
-        status_label.setAlignment(Qt.AlignRight)
-        sec_info_layout.addWidget(status_label)
-
-        bottom_layout = QHBoxLayout()
-        bottom_layout.addLayout(info_layout)
-        bottom_layout.addStretch()
-        bottom_layout.addLayout(sec_info_layout)
-
-        layout.addLayout(bottom_layout)
-
-        return card_widget
-
     def showMobil(self, page=1):
         """Show cars from the database and display them."""
-        # Clear the grid layout
-        for i in reversed(range(self.grid_layout.count())):
-            widget = self.grid_layout.itemAt(i).widget()
-            if widget is not None:
-                widget.setParent(None)
-
         color = self.color_dropdown.currentText()
         year = self.year_dropdown.currentText()
 
@@ -218,31 +142,31 @@ class MobilController(QWidget):
             except ValueError:
                 year = None
 
-        cars, total_records = self.mobil.get_mobil_filtered(page, self.items_per_page, year, color)
-        if not cars:
-            # Show message if no cars are available
-            no_data_label = QLabel("Data Mobil tidak ada saat ini")
-            no_data_label.setFont(QFont("Poly", 16, QFont.Bold))
-            no_data_label.setAlignment(Qt.AlignCenter)
-            self.grid_layout.addWidget(no_data_label, 0, 0, 1, 3)  # Span across 3 columns
-            return
+        self.loader.submit(
+            self.fetch_mobil, page, year, color, self.search_box.text().strip() or None,
+            on_result=self.render_mobil,
+            on_error=lambda message: QMessageBox.critical(self, "Error", f"Error loading cars: {message}")
+        )
 
-        for i in range(self.items_per_page):
+    def fetch_mobil(self, page, year, color, search=None):
+        """Load one page of cars and their thumbnails. Runs on the query executor, so no widgets here."""
+        cars, total_records = self.mobil.get_mobil_filtered(page, self.items_per_page, year, color, search=search)
+        thumbnails = self.mobil.get_thumbnails([car['NomorPlat'] for car in cars])
+        return cars, total_records, thumbnails
+
+    def render_mobil(self, result):
+        """Display a page of cars loaded by fetch_mobil."""
+        cars, total_records, thumbnails = result
+
+        # Show message if no cars are available
+        self.no_data_label.setVisible(not cars)
+
+        for i, card in enumerate(self.cards):
             if i < len(cars):
                 car = cars[i]
-                card = self.create_card(
-                    car['Gambar'],
-                    car['Model'],
-                    car['Warna'],
-                    car['NomorPlat'],
-                    car['Tahun'],
-                    car['StatusKetersediaan']
-                )
+                card.bind(car, thumbnails.get(car['NomorPlat']))
             else:
-                # Create an empty widget for empty slots
-                card = QWidget()
-                card.setFixedSize(360, 340)  
-            self.grid_layout.addWidget(card, i // 3, i % 3)
+                card.unbind()
 
         self.setup_pagination(total_records)
 
@@ -300,6 +224,31 @@ class MobilController(QWidget):
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Error adding car: {str(e)}")
 
+    def edit_mobil(self, license_plate):
+        """Edit an existing Mobil object, loading its full image only now."""
+        mobil_data = self.mobil.get_mobil_by_plate(license_plate)
+        if not mobil_data:
+            QMessageBox.warning(self, "Warning", "Car no longer exists.")
+            self.showMobil(self.current_page)
+            return
+        
+        dialog, data = MobilUI.formMobil(self, mode="edit", mobil_data=mobil_data)
+        
+        if dialog and data:
+            try:
+                mobil = {
+                    'NomorPlat': license_plate,
+                    'Gambar': data['Gambar'],
+                    'Model': data['Model'],
+                    'Warna': data['Warna'],
+                    'Tahun': data['Tahun'],
+                    'StatusKetersediaan': data['StatusKetersediaan']
+                }
+                self.mobil.set_mobil(mobil, mode="edit")
+                self.showMobil(self.current_page)
+            except Exception as e:
+                QMessageBox.critical(self, "Error", f"Error editing car: {str(e)}")
+
     def delete_mobil(self):
         """Delete selected Mobil objects."""
         selected_ids = self.get_selected_ids()
@@ -309,24 +258,24 @@ class MobilController(QWidget):
         
         if MobilUI.confirmMobil(self, len(selected_ids)):
             try:
-                for car_id in selected_ids:
-                    self.mobil.set_mobil({'NomorPlat': car_id}, mode="delete")
-                self.showMobil()
+                failures = self.mobil.delete_mobil(selected_ids)
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Error deleting cars: {str(e)}")
+                return
+            
+            self.showMobil()
+            if failures:
+                details = "\n".join(f"{plate}: {reason}" for plate, reason in failures.items())
+                QMessageBox.warning(self, "Warning", f"Some cars could not be deleted:\n{details}")
 
     def get_selected_ids(self):
         """Get the IDs of selected cars."""
-        selected_ids = []
-        for i in range(self.grid_layout.count()):
-            widget = self.grid_layout.itemAt(i).widget()
-            if widget is not None:
-                checkbox = widget.findChild(QCheckBox)
-                if checkbox and checkbox.isChecked():
-                    label = widget.findChild(QLabel, "plate")
-                    if label:
-                        selected_ids.append(label.text())
-        return selected_ids
+        return [card.nomor_plat for card in self.cards if card.is_selected()]
+
+    def search_mobil(self):
+        """Show the cars matching the search box, best match first, from the first page."""
+        self.current_page = 1
+        self.showMobil()
 
     def apply_filters(self):
         """Apply filters based on the selected color and year."""
@@ -354,12 +303,9 @@ class MobilController(QWidget):
         """)
         
         def toggle_select_all():
-            for i in range(self.grid_layout.count()):
-                widget = self.grid_layout.itemAt(i).widget()
-                if widget is not None:
-                    checkbox = widget.findChild(QCheckBox)
-                    if checkbox:
-                        checkbox.setChecked(not checkbox.isChecked())
+            for card in self.cards:
+                if card.nomor_plat is not None:
+                    card.checkbox.setChecked(not card.checkbox.isChecked())
         
         select_all_btn.clicked.connect(toggle_select_all)
         
@@ -414,11 +360,6 @@ class MobilController(QWidget):
         # Calculate total pages
         self.total_pages = (total_records + self.items_per_page - 1) // self.items_per_page
 
-        # Clear existing buttons
-        for btn in self.pagination_buttons:
-            btn.setParent(None)
-        self.pagination_buttons = []
-
         # Style for all pagination buttons
         button_style = """
             QPushButton {
@@ -448,6 +389,12 @@ class MobilController(QWidget):
                 btn.setStyleSheet(button_style)
                 self.pagination_layout.insertWidget(1, btn)  # Insert buttons into the pagination layout
 
+            # Connect navigation button signals once
+            self.first_button.clicked.connect(lambda: self.go_to_page(1))
+            self.prev_button.clicked.connect(self.prev_page)
+            self.next_button.clicked.connect(self.next_page)
+            self.last_button.clicked.connect(lambda: self.go_to_page(self.total_pages))
+
         # Calculate the range of pages to display (sliding window of 5)
         def calculate_page_range():
             n = 5  # Number of page buttons to show
@@ -467,23 +414,26 @@ class MobilController(QWidget):
             
             return range(start_page, end_page + 1)
         
-        # Add page buttons
-        for page in calculate_page_range():
-            btn = QPushButton(str(page))
-            btn.setStyleSheet(button_style)
-            if page == self.current_page:
-                btn.setProperty("current", "true")
-                btn.setStyleSheet(button_style + "font-weight: bold;")
-            btn.setProperty("page_number", page)
-            btn.clicked.connect(lambda checked, p=page: self.go_to_page(page))
+        # Page buttons are kept and relabelled; only a missing one is created
+        pages = calculate_page_range()
+        while len(self.pagination_buttons) < len(pages):
+            btn = QPushButton()
+            btn.clicked.connect(lambda checked, btn=btn: self.go_to_page(btn.property("page_number")))
             self.pagination_buttons.append(btn)
             self.pagination_layout.insertWidget(-2, btn)  # Insert buttons before the Next button
 
-        # Connect navigation button signals
-        self.first_button.clicked.connect(lambda: self.go_to_page(1))
-        self.prev_button.clicked.connect(self.prev_page)
-        self.next_button.clicked.connect(self.next_page)
-        self.last_button.clicked.connect(lambda: self.go_to_page(self.total_pages))
-        
+        for i, btn in enumerate(self.pagination_buttons):
+            if i >= len(pages):
+                btn.hide()
+                continue
+            page = pages[i]
+            btn.setText(str(page))
+            btn.setProperty("page_number", page)
+            btn.setProperty("current", "true" if page == self.current_page else "false")
+            style = button_style + ("font-weight: bold;" if page == self.current_page else "")
+            if btn.styleSheet() != style:
+                btn.setStyleSheet(style)
+            btn.show()
+
         # Update button states
         self.update_pagination_buttons()
\ No newline at end of file
@@ -0,0 +1,85 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Iterable
+
+from PyQt5.QtGui import QPixmap
+
+
+class MobilPixmapCache:
+    """
+    Bounded LRU cache of decoded car card pixmaps.
+    Entries are keyed by NomorPlat plus a hash of the thumbnail bytes, so a changed image
+    never hits a stale entry, and are evicted least-recently-used once MAX_BYTES is exceeded.
+    """
+
+    # Roughly 120 decoded 335x200 cards
+    MAX_BYTES = 32 * 1024 * 1024
+
+    _instance = None
+
+    def __init__(self, max_bytes: int = MAX_BYTES):
+        """
+        Initialize an empty cache.
+
+        Args:
+            max_bytes: Upper bound on the decoded size of all cached pixmaps
+        """
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[tuple, QPixmap]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def instance(cls) -> "MobilPixmapCache":
+        """Return the process-wide cache shared by the car grid and Mobil writes."""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @staticmethod
+    def _cost(pixmap: QPixmap) -> int:
+        return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+
+    def pixmap(self, nomor_plat: str, image_data: bytes) -> QPixmap:
+        """
+        Return the decoded pixmap for a car's thumbnail, decoding it only on a cache miss.
+        Must be called from the GUI thread.
+
+        Args:
+            nomor_plat: License plate of the car
+            image_data: Encoded thumbnail bytes
+
+        Returns:
+            The decoded QPixmap
+        """
+        key = (nomor_plat, hashlib.sha1(image_data).digest())
+        with self._lock:
+            pixmap = self._entries.get(key)
+            if pixmap is not None:
+                self._entries.move_to_end(key)
+                return pixmap
+
+        pixmap = QPixmap()
+        pixmap.loadFromData(image_data)
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = pixmap
+                self._size += self._cost(pixmap)
+                while self._size > self.max_bytes and len(self._entries) > 1:
+                    _, evicted = self._entries.popitem(last=False)
+                    self._size -= self._cost(evicted)
+        return pixmap
+
+    def invalidate(self, nomor_plats: Iterable[str]):
+        """
+        Drop every cached pixmap of the given cars (e.g. after they were edited or deleted).
+
+        Args:
+            nomor_plats: License plates of the cars
+        """
+        nomor_plats = set(nomor_plats)
+        with self._lock:
+            for key in [key for key in self._entries if key[0] in nomor_plats]:
+                self._size -= self._cost(self._entries.pop(key))
@@ -0,0 +1,127 @@
+import hashlib
+import sqlite3
+from typing import Iterable, Optional, Tuple
+
+from PyQt5.QtCore import Qt, QRectF, QBuffer, QByteArray, QIODevice
+from PyQt5.QtGui import QImage, QPainter, QPainterPath, QColor
+
+
+class MobilThumbnail:
+    """
+    Pre-rendered card images for the car grid.
+    Each Gambar is scaled, cropped and given rounded corners once when it is saved,
+    so the grid only has to decode a small JPEG instead of the full-resolution upload.
+    """
+
+    WIDTH = 335
+    HEIGHT = 200
+    RADIUS = 20
+    QUALITY = 90
+
+    # Cards are white, so the rounded corners are flattened onto the card colour
+    BACKGROUND = QColor("#FFFFFF")
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS MobilThumbnail (
+            NomorPlat TEXT PRIMARY KEY REFERENCES Mobil(NomorPlat) ON DELETE CASCADE,
+            Thumbnail BLOB NOT NULL
+        )
+    """
+
+    @staticmethod
+    def render(image_data: bytes) -> Optional[bytes]:
+        """
+        Render a card thumbnail from a full image.
+
+        Args:
+            image_data: Encoded image as stored in Mobil.Gambar
+
+        Returns:
+            JPEG bytes of the card image, or None if the image cannot be decoded
+        """
+        if not image_data:
+            return None
+
+        image = QImage.fromData(image_data)
+        if image.isNull():
+            return None
+
+        width, height = MobilThumbnail.WIDTH, MobilThumbnail.HEIGHT
+        scaled = image.scaled(width, height, Qt.KeepAspectRatioByExpanding, Qt.SmoothTransformation)
+
+        thumbnail = QImage(width, height, QImage.Format_RGB32)
+        thumbnail.fill(MobilThumbnail.BACKGROUND)
+
+        painter = QPainter(thumbnail)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setRenderHint(QPainter.SmoothPixmapTransform)
+        clip = QPainterPath()
+        clip.addRoundedRect(QRectF(0, 0, width, height), MobilThumbnail.RADIUS, MobilThumbnail.RADIUS)
+        painter.setClipPath(clip)
+        painter.drawImage((width - scaled.width()) // 2, (height - scaled.height()) // 2, scaled)
+        painter.end()
+
+        data = QByteArray()
+        buffer = QBuffer(data)
+        buffer.open(QIODevice.WriteOnly)
+        thumbnail.save(buffer, "JPG", MobilThumbnail.QUALITY)
+        buffer.close()
+        return bytes(data)
+
+    @staticmethod
+    def store(conn: sqlite3.Connection, rows: Iterable[Tuple[str, bytes]]):
+        """
+        Generate and save thumbnails for (NomorPlat, Gambar) pairs.
+        Identical images are rendered only once; cars without a usable image lose their thumbnail.
+
+        Args:
+            conn: Open connection, normally inside the transaction that wrote the images
+            rows: Iterable of (NomorPlat, Gambar) tuples
+        """
+        rendered = {}
+        thumbnails = []
+        missing = []
+
+        for nomor_plat, image_data in rows:
+            if image_data:
+                digest = hashlib.sha1(image_data).digest()
+                if digest not in rendered:
+                    rendered[digest] = MobilThumbnail.render(image_data)
+                thumbnail = rendered[digest]
+            else:
+                thumbnail = None
+
+            if thumbnail is None:
+                missing.append((nomor_plat,))
+            else:
+                thumbnails.append((nomor_plat, thumbnail))
+
+        conn.executemany(
+            'INSERT OR REPLACE INTO MobilThumbnail (NomorPlat, Thumbnail) VALUES (?, ?)',
+            thumbnails
+        )
+        conn.executemany('DELETE FROM MobilThumbnail WHERE NomorPlat = ?', missing)
+
+    @staticmethod
+    def backfill(conn: sqlite3.Connection):
+        """
+        Create the thumbnail table if needed and render thumbnails for every car that has none.
+
+        Args:
+            conn: Open connection
+        """
+        conn.execute(MobilThumbnail.SCHEMA)
+        plates = [row[0] for row in conn.execute('''
+            SELECT NomorPlat FROM Mobil
+            WHERE Gambar IS NOT NULL
+              AND NomorPlat NOT IN (SELECT NomorPlat FROM MobilThumbnail)
+        ''')]
+
+        # Load the full images a batch at a time to keep memory flat on large fleets
+        for start in range(0, len(plates), 50):
+            batch = plates[start:start + 50]
+            placeholders = ', '.join('?' * len(batch))
+            rows = conn.execute(
+                f'SELECT NomorPlat, Gambar FROM Mobil WHERE NomorPlat IN ({placeholders})', batch
+            ).fetchall()
+            MobilThumbnail.store(conn, rows)
@@ -4,7 +4,7 @@ from PyQt5.QtWidgets import (
     QDialog, QDesktopWidget, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QFrame, QLineEdit, QFileDialog
 )
 from Mobil.Mobil import Mobil
-import re
+from Database.Validators import validate_mobil_field
 
 class MobilUI(QWidget):
     @staticmethod
@@ -243,21 +243,7 @@ class MobilUI(QWidget):
         content_layout.addWidget(confirm_btn)
         
         def validate_field(field, text):
-            is_valid = False
-            message = ""
-            
-            if field == 'NomorPlat':
-                is_valid = bool(re.match(r'[A-Z]{1,2}\s\d{1,4}\s[A-Z]{1,3}', text))
-                message = "Nomor plat harus berupa kombinasi huruf dan angka"
-            elif field == 'Tahun':
-                is_valid = bool(re.match(r'\d{4}', text))
-                message = "Tahun harus berupa angka 4 digit"
-            elif field == 'StatusKetersediaan':
-                is_valid = bool(re.match(r'[01]', text))
-                message = "Status ketersediaan harus berupa angka 0 atau 1"
-            else:
-                is_valid = bool(text)
-                message = "Field ini tidak boleh kosong"
+            is_valid, message = validate_mobil_field(field, text)
                 
             validation_states[field] = is_valid
             error_labels[field].setText(message if not is_valid else "")
@@ -13,6 +13,7 @@ from pathlib import Path
 
 from Peminjaman.Peminjaman import Peminjaman
 from Notifikasi.NotifikasiController import NotifikasiController
+from Database.QueryExecutor import QueryExecutor
 
 class NotifikasiUI(QWidget):
     def __init__(self, parent=None):
@@ -34,6 +35,7 @@ class PengembalianUI(QWidget):
         self.UI = self.UI.currentState()
 
         self.peminjaman = Peminjaman()
+        self.loader = QueryExecutor(self)
         self.current_page = 1
         self.items_per_page = 10
         self.pagination_buttons = []
@@ -47,13 +49,26 @@ class PengembalianUI(QWidget):
 
         self.ShowJadwalPengembalian()
 
-    def ShowJadwalPengembalian(self):
-        try:
-            data, total_records = self.peminjaman.FilterNotifikasi(
+    def ShowJadwalPengembalian(self, loaded=None):
+        """
+        Load the current page on the query executor, then render it once it arrives.
+        
+        Args:
+            loaded: (data, total_records) delivered by the executor; None starts a new load
+        """
+        if loaded is None:
+            self.loader.submit(
+                self.peminjaman.FilterNotifikasi,
                 self.state,
-                self.current_page, 
-                self.items_per_page
+                self.current_page,
+                self.items_per_page,
+                on_result=self.ShowJadwalPengembalian,
+                on_error=lambda message: QMessageBox.critical(self, "Error", f"Error loading data: {message}")
             )
+            return
+
+        try:
+            data, total_records = loaded
             def setup_table():
                 """
                 Configure the table structure and styling.
@@ -331,6 +346,7 @@ class PembayaranUI(QWidget):
 
         # Initialize model and pagination state
         self.peminjaman = Peminjaman()
+        self.loader = QueryExecutor(self)
         self.current_page = 1
         self.items_per_page = 10
         self.pagination_buttons = []
@@ -346,14 +362,27 @@ class PembayaranUI(QWidget):
 
         self.ShowPembayaranRental()
 
-    def ShowPembayaranRental(self):
-        try:
-            # Load data from model with pagination
-            data, total_records = self.peminjaman.FilterNotifikasi(
+    def ShowPembayaranRental(self, loaded=None):
+        """
+        Load the current page on the query executor, then render it once it arrives.
+        
+        Args:
+            loaded: (data, total_records) delivered by the executor; None starts a new load
+        """
+        if loaded is None:
+            self.loader.submit(
+                self.peminjaman.FilterNotifikasi,
                 self.state,
-                self.current_page, 
-                self.items_per_page
+                self.current_page,
+                self.items_per_page,
+                on_result=self.ShowPembayaranRental,
+                on_error=lambda message: QMessageBox.critical(self, "Error", f"Error loading data: {message}")
             )
+            return
+
+        try:
+            # Load data from model with pagination
+            data, total_records = loaded
             print("apalah")
             print(data)
             def setup_table():
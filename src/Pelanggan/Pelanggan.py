@@ -1,7 +1,11 @@
 import sqlite3
 from dataclasses import dataclass
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Union
 from pathlib import Path
+from Database.ConnectionManager import ConnectionManager
+from Database.KeysetPaginator import KeysetPaginator
+from Database.AvailabilityIndex import AvailabilityIndex
+from Database.FullTextSearch import SearchResults
 
 @dataclass
 class Pelanggan:
@@ -12,34 +16,43 @@ class Pelanggan:
     CreditPoint: int
     StatusPinjam: bool
     
+    # Columns of the customer table view
+    COLUMNS = ['NIK', 'Nama', 'Kontak', 'Alamat', 'CreditPoint', 'StatusPinjam']
+    
     def __init__(self):
         self.db_path = Path(__file__).parent.parent / "Database/CarGoOwner.db"
+        self.db = ConnectionManager.get(self.db_path)
+
+    def paginatePelanggan(self, items_per_page: int,
+                          search: Optional[str] = None) -> Union[KeysetPaginator, SearchResults]:
+        """
+        Return the pages of customers to show.
+
+        Args:
+            items_per_page: Number of customers per page
+            search: Text to search NIK, name, contact and address for; None or blank lists everyone
+
+        Returns:
+            KeysetPaginator ordered by NIK, or SearchResults ranked by relevance when searching
+        """
+        if search and search.strip():
+            return SearchResults(self.db, 'Pelanggan', search, self.COLUMNS, page_size=items_per_page)
+        return KeysetPaginator.get(self.db, 'Pelanggan', 'NIK', self.COLUMNS, page_size=items_per_page)
 
     def getPelanggan(self, page: int, items_per_page: int) -> Tuple[List[Dict[str, Any]], int]:
         try:
             print(self.db_path)
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('SELECT COUNT(*) FROM Pelanggan')
-            total_records = cursor.fetchone()[0]
-            
-            offset = (page - 1) * items_per_page
-            cursor.execute('''
-                SELECT * FROM Pelanggan 
-                LIMIT ? OFFSET ?
-            ''', (items_per_page, offset))
-            
-            columns = ['NIK', 'Nama', 'Kontak', 'Alamat', 'CreditPoint', 'StatusPinjam']
-            data = [dict(zip(columns, row)) for row in cursor.fetchall()]
-            
-            return data, total_records
-            
+            with self.db.connection() as conn:
+                cursor = conn.cursor()
+                
+                paginator = self.paginatePelanggan(items_per_page)
+                total_records = paginator.count()
+                data = paginator.page(page).rows
+                
+                return data, total_records
+                
         except sqlite3.Error as e:
             raise Exception(f"Error retrieving customer data: {str(e)}")
-        finally:
-            if conn:
-                conn.close()
 
     def setPelanggan(self, pelanggan: Dict[str, Any], mode: str = "create") -> bool:
         """Create, update, or delete customer data in the database.
@@ -52,62 +65,70 @@ class Pelanggan:
             bool: True if operation was successful
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
+            with self.db.transaction() as conn:
+                cursor = conn.cursor()
+                
+                if mode == "create":
+                    delta = 1
+                    cursor.execute('''
+                        INSERT INTO Pelanggan (NIK, Nama, Kontak, Alamat, CreditPoint, StatusPinjam)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                    ''', (
+                        pelanggan['NIK'],
+                        pelanggan['Nama'],
+                        pelanggan['Kontak'],
+                        pelanggan['Alamat'],
+                        pelanggan.get('CreditPoint', 100),  # Default credit point
+                        pelanggan.get('StatusPinjam', 0)    # Default status
+                    ))
+                elif mode == "edit":
+                    delta = 0
+                    cursor.execute('''
+                        UPDATE Pelanggan 
+                        SET NIK = ?, Nama = ?, Kontak = ?, Alamat = ?
+                        WHERE NIK = ?
+                    ''', (
+                        pelanggan['NIK'],
+                        pelanggan['Nama'],
+                        pelanggan['Kontak'],
+                        pelanggan['Alamat'],
+                        pelanggan['original_NIK']  # Original NIK for identification
+                    ))
+                elif mode == "delete":
+                    niks = pelanggan['NIKs'] if isinstance(pelanggan['NIKs'], list) else [pelanggan['NIKs']]
+                    cursor.executemany(
+                        'DELETE FROM Pelanggan WHERE NIK = ?',
+                        [(nik,) for nik in niks]
+                    )
+                    delta = -cursor.rowcount
+                else:
+                    raise ValueError(f"Invalid mode: {mode}")
+                
+            self.db.mark_changed('Pelanggan', delta=delta)
+            availability = AvailabilityIndex.get(self.db)
             if mode == "create":
-                cursor.execute('''
-                    INSERT INTO Pelanggan (NIK, Nama, Kontak, Alamat, CreditPoint, StatusPinjam)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', (
-                    pelanggan['NIK'],
-                    pelanggan['Nama'],
-                    pelanggan['Kontak'],
-                    pelanggan['Alamat'],
-                    pelanggan.get('CreditPoint', 100),  # Default credit point
-                    pelanggan.get('StatusPinjam', 0)    # Default status
-                ))
+                availability.put_pelanggan(pelanggan['NIK'], pelanggan['Nama'], pelanggan['Kontak'],
+                                           borrowing=bool(pelanggan.get('StatusPinjam', 0)))
             elif mode == "edit":
-                cursor.execute('''
-                    UPDATE Pelanggan 
-                    SET NIK = ?, Nama = ?, Kontak = ?, Alamat = ?
-                    WHERE NIK = ?
-                ''', (
-                    pelanggan['NIK'],
-                    pelanggan['Nama'],
-                    pelanggan['Kontak'],
-                    pelanggan['Alamat'],
-                    pelanggan['original_NIK']  # Original NIK for identification
-                ))
-            elif mode == "delete":
-                niks = pelanggan['NIKs'] if isinstance(pelanggan['NIKs'], list) else [pelanggan['NIKs']]
-                cursor.executemany(
-                    'DELETE FROM Pelanggan WHERE NIK = ?',
-                    [(nik,) for nik in niks]
-                )
+                availability.put_pelanggan(pelanggan['NIK'], pelanggan['Nama'], pelanggan['Kontak'],
+                                           original_nik=pelanggan['original_NIK'])
+                # Triggers copy the new NIK, Nama and Kontak into the customer's rentals
+                self.db.mark_changed('Peminjaman', delta=0)
             else:
-                raise ValueError(f"Invalid mode: {mode}")
-            
-            conn.commit()
+                availability.remove_pelanggan(niks)
             return True
-            
+                
         except sqlite3.Error as e:
             raise Exception(f"Error performing database operation: {str(e)}")
-        finally:
-            if conn:
-                conn.close()
 
     def getAllNIKs(self) -> set:
 
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('SELECT NIK FROM Pelanggan')
-            return {row[0] for row in cursor.fetchall()}
-            
+            with self.db.connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute('SELECT NIK FROM Pelanggan')
+                return {row[0] for row in cursor.fetchall()}
+                
         except sqlite3.Error as e:
-            raise Exception(f"Error retrieving NIKs: {str(e)}")
-        finally:
-            if conn:
-                conn.close()
\ No newline at end of file
+            raise Exception(f"Error retrieving NIKs: {str(e)}")
\ No newline at end of file
@@ -1,10 +1,10 @@
 import sys
 from PyQt5.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QTableWidget,
-    QTableWidgetItem, QHeaderView, QFrame, QSizePolicy, QCheckBox, QToolButton,
+    QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QTableView,
+    QHeaderView, QFrame, QSizePolicy, QCheckBox, QToolButton,
     QDesktopWidget, QDialog, QLineEdit, QMessageBox, QGraphicsBlurEffect
 )
-from PyQt5.QtCore import Qt, QRect, QRegExp
+from PyQt5.QtCore import Qt, QRect, QRegExp, QTimer
 from PyQt5.QtGui import QFont, QColor, QIcon, QRegExpValidator
 import sqlite3
 from dataclasses import dataclass
@@ -12,12 +12,18 @@ from typing import List, Optional, Dict, Any, Tuple
 from pathlib import Path
 from Pelanggan.Pelanggan import Pelanggan
 from Pelanggan.PelangganUI import PelangganUI
+from Database.QueryExecutor import QueryExecutor
+from Database.KeysetTableModel import KeysetTableModel
+from Component.TableDelegates import CheckBoxDelegate, StatusPillDelegate, ActionDelegate
 
 class PelangganController(QWidget):
     """
     Controller class for managing customer data display and interactions.
     Exposes only four main CRUD operations, with all helper functions nested within.
     """
+    # Pause in typing after which the search runs
+    SEARCH_DELAY_MS = 250
+
     def __init__(self, parent=None):
         super().__init__(parent)
         
@@ -27,6 +33,7 @@ class PelangganController(QWidget):
         self.available_width = screen.width() - (screen.width() * 0.25)
         
         self.pelanggan_model = Pelanggan()
+        self.loader = QueryExecutor(self)
         self.current_page = 1
         self.items_per_page = 10
         self.pagination_buttons = []
@@ -35,30 +42,78 @@ class PelangganController(QWidget):
         self.main_layout.setContentsMargins(20, 20, 20, 20)
         self.main_layout.setSpacing(20)
         
-        self.table = QTableWidget()
+        # Search box; the table follows the text once typing pauses
+        self.search_text = ""
+        self.search_box = QLineEdit()
+        self.search_box.setPlaceholderText("Cari NIK, nama, kontak atau alamat")
+        self.search_box.setClearButtonEnabled(True)
+        self.search_box.setFixedHeight(44)
+        self.search_box.setStyleSheet("""
+            QLineEdit {
+                padding: 8px 16px;
+                border: 1px solid #D1D5DB;
+                border-radius: 8px;
+                background-color: #FFFFFF;
+                font-family: 'Poly', sans-serif;
+                font-size: 14px;
+            }
+        """)
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(self.SEARCH_DELAY_MS)
+        self.search_timer.timeout.connect(self.SearchPelanggan)
+        self.search_box.textChanged.connect(self.search_timer.start)
+        self.main_layout.addWidget(self.search_box)
+        
+        self.table = QTableView()
 
         self.ShowPelanggan()
         
-    def ShowPelanggan(self):
+    def ShowPelanggan(self, loaded=None):
+        """
+        Load the current page on the query executor, then render it once it arrives.
+        
+        Args:
+            loaded: (paginator, page, total_records) delivered by the executor; None starts a new load
+        """
+        if loaded is None:
+            paginator = self.pelanggan_model.paginatePelanggan(self.items_per_page, self.search_text)
+            page = self.current_page
+            self.loader.submit(
+                lambda: (paginator, paginator.page(page), paginator.count()),
+                on_result=self.ShowPelanggan,
+                on_error=lambda message: QMessageBox.critical(self, "Error", f"Error loading data: {message}")
+            )
+            return
 
         try:
-            data, total_records = self.pelanggan_model.getPelanggan(
-                self.current_page, 
-                self.items_per_page
-            )
+            paginator, page, total_records = loaded
+            data = page.rows
 
             def setup_table():
                 """
                 Configure the table structure and styling.
                 Sets up columns, headers, and visual appearance of the table.
                 """
-                self.table.setColumnCount(8)
-                self.table.setHorizontalHeaderLabels([
-                    "", "NIK", "Nama", "Kontak", "Alamat", "Credit Point", "Status", "Aksi"
-                ])
+                self.table_model = KeysetTableModel(
+                    [KeysetTableModel.SELECTED, 'NIK', 'Nama', 'Kontak', 'Alamat', 'CreditPoint', 'StatusPinjam', None],
+                    ["", "NIK", "Nama", "Kontak", "Alamat", "Credit Point", "Status", "Aksi"],
+                    self.loader,
+                    selected=self.selected_niks,
+                    parent=self
+                )
+                self.table.setModel(self.table_model)
+                
+                # Checkboxes, status pills and the edit action are painted, not widgets per row
+                self.table.setItemDelegateForColumn(0, CheckBoxDelegate(self.table))
+                self.table.setItemDelegateForColumn(6, StatusPillDelegate("Pinjam", "Tidak Pinjam", self.table))
+                self.table.setItemDelegateForColumn(7, ActionDelegate(
+                    "✎", lambda row: self.EditPelanggan(dict(self.table_model.row(row))), self.table
+                ))
+                self.table.setMouseTracking(True)
                 
                 self.table.setStyleSheet("""
-                    QTableWidget {
+                    QTableView {
                         background-color: white;
                         border: none;
                         font-family: 'Poly', sans-serif;
@@ -73,7 +128,7 @@ class PelangganController(QWidget):
                         text-align: left;
                         height: 24px;
                     }
-                    QTableWidget::item {
+                    QTableView::item {
                         border-bottom: 1px solid #F3F4F6;
                         font-family: 'Poly', sans-serif;
                         padding: 8px;
@@ -84,6 +139,7 @@ class PelangganController(QWidget):
                 # Configure table behavior
                 self.table.setShowGrid(False)
                 self.table.verticalHeader().setVisible(False)
+                self.table.verticalHeader().setDefaultSectionSize(72)
                 self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Fixed)
                 
                 column_percentages = {
@@ -130,7 +186,8 @@ class PelangganController(QWidget):
                     try:
                         all_niks = self.pelanggan_model.getAllNIKs()
                         if all_niks - self.selected_niks:
-                            self.selected_niks = all_niks
+                            # Updated in place: the table model shares this set
+                            self.selected_niks.update(all_niks)
                         else:
                             self.selected_niks.clear()
                         self.ShowPelanggan()  # Refresh display
@@ -242,75 +299,6 @@ class PelangganController(QWidget):
                 
                 return bottom_layout
 
-            def create_checkbox(row, nik):
-                """Create a checkbox for row selection."""
-                def handle_checkbox_change(state):
-                    if state == Qt.Checked:
-                        self.selected_niks.add(nik)
-                    else:
-                        self.selected_niks.discard(nik)
-                
-                checkbox = QCheckBox()
-                checkbox.setChecked(nik in self.selected_niks)
-                checkbox.stateChanged.connect(handle_checkbox_change)
-                
-                container = QWidget()
-                layout = QHBoxLayout(container)
-                layout.setContentsMargins(16, 16, 16, 16)
-                layout.addWidget(checkbox, alignment=Qt.AlignCenter)
-                self.table.setCellWidget(row, 0, container)
-
-            def create_status_cell(row, col, is_pinjam):
-                """Create a status indicator cell."""
-                status_text = "Pinjam" if is_pinjam else "Tidak Pinjam"
-                status_btn = QPushButton(status_text)
-                
-                status_btn.setStyleSheet(f"""
-                    QPushButton {{
-                        background-color: {'#D1FAE5' if is_pinjam else '#FEE2E2'};
-                        color: {'#10B981' if is_pinjam else '#EF4444'};
-                        border: 1px solid {'#10B981' if is_pinjam else '#EF4444'};
-                        border-radius: 10px;
-                        padding-right: 12px;
-                        padding-left: 12px;
-                        min-height: 30px;
-                        min-width: 100px;
-                        font-family: 'Poly', sans-serif;
-                        font-weight: 500;
-                        font-size: 14px;
-                        text-align: center;
-                    }}
-                """)
-                
-                container = QWidget()
-                layout = QHBoxLayout(container)
-                layout.setContentsMargins(16, 16, 16, 16)
-                layout.addWidget(status_btn, alignment=Qt.AlignCenter)
-                self.table.setCellWidget(row, col, container)
-
-            def create_action_cell(row, record):
-                """Create an action cell with edit button."""
-                action_btn = QPushButton("✎")
-                action_btn.setStyleSheet("""
-                    QPushButton {
-                        border: none;
-                        color: #6B7280;
-                        font-size: 16px;
-                        font-family: 'Poly', sans-serif;
-                    }
-                    QPushButton:hover {
-                        color: #374151;
-                    }
-                """)
-                
-                action_btn.clicked.connect(lambda: self.EditPelanggan(record))
-                
-                container = QWidget()
-                layout = QHBoxLayout(container)
-                layout.setContentsMargins(16, 16, 16, 16)
-                layout.addWidget(action_btn, alignment=Qt.AlignCenter)
-                self.table.setCellWidget(row, 7, container)
-
             def clear_current_view():
                 """Remove all existing widgets and layouts."""
                 if hasattr(self, 'message_label'):
@@ -340,7 +328,9 @@ class PelangganController(QWidget):
             clear_current_view()
 
             if not data:
-                self.message_label = QLabel("Tidak ada data pelanggan saat ini")
+                self.message_label = QLabel(
+                    "Tidak ada pelanggan yang cocok" if self.search_text else "Tidak ada data pelanggan saat ini"
+                )
                 self.message_label.setAlignment(Qt.AlignCenter)
                 self.message_label.setStyleSheet("""
                     font-size: 42px; 
@@ -371,27 +361,13 @@ class PelangganController(QWidget):
                 
                 return
 
-            if self.table.columnCount() == 0:
+            if self.table.model() is None:
                 setup_table()
                 
             self.main_layout.addWidget(self.table)
             
-            self.table.setRowCount(len(data))
-            for row, record in enumerate(data):
-                create_checkbox(row, record['NIK'])
-                
-                for col, (key, value) in enumerate(record.items()):
-                    if key == 'StatusPinjam':
-                        create_status_cell(row, col + 1, value == 1)
-                    else:
-                        item = QTableWidgetItem(str(value))
-                        item.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-                        item.setFlags(item.flags() & ~Qt.ItemIsEditable)  # Make cell read-only
-                        self.table.setItem(row, col + 1, item)
-                
-                create_action_cell(row, record)
-                
-                self.table.setRowHeight(row, 72)
+            # Further pages are appended by the model as the table is scrolled
+            self.table_model.show_page(paginator, page)
             
             self.bottom_layout = setup_bottom_controls()
             self.main_layout.addLayout(self.bottom_layout)
@@ -404,6 +380,15 @@ class PelangganController(QWidget):
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Error loading data: {str(e)}")
 
+    def SearchPelanggan(self):
+        """Show the customers matching the search box, best match first, from the first page."""
+        text = self.search_box.text().strip()
+        if text == self.search_text:
+            return
+        self.search_text = text
+        self.current_page = 1
+        self.ShowPelanggan()
+
     def CreatePelanggan(self):
         """Create a new customer record."""
         def validate_data(data):
@@ -4,6 +4,7 @@ from PyQt5.QtGui import QRegExpValidator
 from PyQt5.QtWidgets import (
     QDialog, QVBoxLayout, QDesktopWidget, QWidget, QHBoxLayout, QLabel, QPushButton, QFrame, QLineEdit
 )
+from Database.Validators import validate_pelanggan_field
 
 class PelangganUI:
     @staticmethod
@@ -226,21 +227,9 @@ class PelangganUI:
         
         def validate_field(field, text):
             """Validate individual field input."""
-            is_valid = False
-            message = ""
-            
-            if field == 'NIK':
-                is_valid = len(text) == 16 and text.isdigit()
-                message = "NIK must be exactly 16 digits" if text and not is_valid else ""
-            elif field == 'Nama':
-                is_valid = bool(text) and all(c.isalpha() or c.isspace() for c in text)
-                message = "Name must contain only letters" if text and not is_valid else ""
-            elif field == 'Kontak':
-                is_valid = bool(text) and text.isdigit()
-                message = "Contact must contain only numbers" if text and not is_valid else ""
-            elif field == 'Alamat':
-                is_valid = bool(text) and len(text) <= 30
-                message = "Address must not be empty and max 30 characters" if text and not is_valid else ""
+            is_valid, message = validate_pelanggan_field(field, text)
+            if not text or is_valid:
+                message = ""
                 
             validation_states[field] = is_valid
             error_labels[field].setText(message)
@@ -0,0 +1,319 @@
+import sqlite3
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from Database.AvailabilityIndex import AvailabilityIndex
+from Database.ConnectionManager import ConnectionManager
+
+
+class PeminjamanConflict(Exception):
+    """Raised when a car or customer was taken, or a rental changed, since the clerk last looked."""
+
+
+class PeminjamanService:
+    """
+    Checkout and return of rentals together with the availability flags they imply.
+
+    A checkout inserts the Peminjaman row and marks the car unavailable (Mobil.StatusKetersediaan = 0)
+    and the customer as borrowing (Pelanggan.StatusPinjam = 1); a return reverses both. Each runs in
+    one BEGIN IMMEDIATE transaction, and the flags are only flipped from the state the clerk saw,
+    so when two clerks rent out the same car the second gets a PeminjamanConflict instead of a
+    double booking. Availability lists can then read the indexed flags directly.
+    """
+
+    # Partial indexes covering the availability lists of the rental form; the flag is repeated
+    # as a column because SQLite only reads an index alone if it holds every column used
+    INDEXES = [
+        """CREATE INDEX IF NOT EXISTS idx_mobil_tersedia
+           ON Mobil(NomorPlat, Model, StatusKetersediaan) WHERE StatusKetersediaan = 1""",
+        """CREATE INDEX IF NOT EXISTS idx_pelanggan_bebas
+           ON Pelanggan(NIK, Nama, Kontak, StatusPinjam) WHERE StatusPinjam = 0""",
+        # Open rentals of a car or customer, checked whenever one is returned
+        "CREATE INDEX IF NOT EXISTS idx_peminjaman_nomorplat_terbuka ON Peminjaman(NomorPlat) WHERE StatusPengembalian = 0",
+        "CREATE INDEX IF NOT EXISTS idx_peminjaman_nik_terbuka ON Peminjaman(NIK) WHERE StatusPengembalian = 0",
+    ]
+
+    @staticmethod
+    def sync_status(conn: sqlite3.Connection):
+        """
+        Derive the availability flags from the open rentals.
+
+        Customers are borrowing exactly when they have an open rental. Cars with an open rental
+        are marked unavailable; other cars keep their flag, since staff also take cars out of
+        service by hand.
+
+        Args:
+            conn: Open connection, normally inside a transaction
+        """
+        conn.execute("""
+            UPDATE Pelanggan SET StatusPinjam = EXISTS (
+                SELECT 1 FROM Peminjaman p WHERE p.NIK = Pelanggan.NIK AND p.StatusPengembalian = 0
+            )
+        """)
+        conn.execute("""
+            UPDATE Mobil SET StatusKetersediaan = 0
+            WHERE StatusKetersediaan = 1 AND NomorPlat IN (
+                SELECT NomorPlat FROM Peminjaman WHERE StatusPengembalian = 0
+            )
+        """)
+
+    @staticmethod
+    def install(conn: sqlite3.Connection):
+        """
+        Create the availability indexes and bring the flags in line with the existing rentals.
+
+        Args:
+            conn: Open connection, normally inside the migration's transaction
+        """
+        for index in PeminjamanService.INDEXES:
+            conn.execute(index)
+        PeminjamanService.sync_status(conn)
+
+    def __init__(self, db: Optional[ConnectionManager] = None):
+        """
+        Initialize the service.
+
+        Args:
+            db: Connection manager of the database (defaults to the application database)
+        """
+        self.db = db or ConnectionManager.get()
+
+    def checkout(self, data: Dict[str, Any]) -> int:
+        """
+        Rent a car out to a customer.
+
+        Args:
+            data: Peminjaman fields as entered: Nama, NIK, NomorPlat, Kontak, TanggalPeminjaman,
+                  TenggatPengembalian, TenggatPembayaran and BesarPembayaran
+
+        Returns:
+            ID of the new rental
+
+        Raises:
+            PeminjamanConflict: If the car is no longer available or the customer already borrows one
+        """
+        with self.db.transaction("IMMEDIATE") as conn:
+            cursor = conn.execute(
+                "UPDATE Mobil SET StatusKetersediaan = 0 WHERE NomorPlat = ? AND StatusKetersediaan = 1",
+                (data['NomorPlat'],)
+            )
+            if cursor.rowcount == 0:
+                raise PeminjamanConflict(f"Mobil {data['NomorPlat']} is no longer available")
+
+            cursor = conn.execute(
+                "UPDATE Pelanggan SET StatusPinjam = 1 WHERE NIK = ? AND StatusPinjam = 0",
+                (data['NIK'],)
+            )
+            if cursor.rowcount == 0:
+                raise PeminjamanConflict(f"Pelanggan {data['NIK']} is already borrowing a car")
+
+            cursor = conn.execute('''
+                INSERT INTO Peminjaman (
+                    Nama, NIK, NomorPlat, Kontak, TanggalPeminjaman, TenggatPengembalian,
+                    TenggatPembayaran, BesarPembayaran, StatusPengembalian, StatusPembayaran
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0, 0)
+            ''', (
+                data['Nama'], data['NIK'], data['NomorPlat'], data['Kontak'], data['TanggalPeminjaman'],
+                data['TenggatPengembalian'], data['TenggatPembayaran'], data['BesarPembayaran']
+            ))
+            rental_id = cursor.lastrowid
+
+        self.db.mark_changed('Peminjaman', delta=1)
+        self.db.mark_changed('Mobil', 'Pelanggan', delta=0)
+        availability = AvailabilityIndex.get(self.db)
+        availability.set_mobil_available(data['NomorPlat'], False)
+        availability.set_pelanggan_borrowing(data['NIK'], True)
+        return rental_id
+
+    @staticmethod
+    def _release(conn: sqlite3.Connection, nomor_plat: str, nik: str) -> Tuple[bool, bool]:
+        """
+        Free a car and a customer that no longer have an open rental, on an open transaction.
+
+        Returns:
+            (car freed, customer freed)
+        """
+        car_free = conn.execute("""
+            UPDATE Mobil SET StatusKetersediaan = 1 WHERE NomorPlat = ? AND NOT EXISTS (
+                SELECT 1 FROM Peminjaman WHERE NomorPlat = ? AND StatusPengembalian = 0
+            )
+        """, (nomor_plat, nomor_plat)).rowcount > 0
+        customer_free = conn.execute("""
+            UPDATE Pelanggan SET StatusPinjam = 0 WHERE NIK = ? AND NOT EXISTS (
+                SELECT 1 FROM Peminjaman WHERE NIK = ? AND StatusPengembalian = 0
+            )
+        """, (nik, nik)).rowcount > 0
+        return car_free, customer_free
+
+    def _return(self, conn: sqlite3.Connection, rental_id: int, returned: bool,
+                date: Optional[str]) -> Tuple[str, bool, str, bool, Optional[str]]:
+        """
+        Write a return (or its undoing) and the flags it implies on an open transaction.
+
+        Returns:
+            (NomorPlat, car available, NIK, customer borrowing, TanggalPengembalian) after the change
+        """
+        new_date = (date or datetime.now().strftime("%Y-%m-%d")) if returned else None
+        cursor = conn.execute(
+            "UPDATE Peminjaman SET StatusPengembalian = ?, TanggalPengembalian = ? "
+            "WHERE ID = ? AND StatusPengembalian = ?",
+            (int(returned), new_date, rental_id, int(not returned))
+        )
+        if cursor.rowcount == 0:
+            state = "returned" if returned else "open"
+            raise PeminjamanConflict(f"Peminjaman {rental_id} is already {state} or no longer exists")
+
+        nik, nomor_plat = conn.execute(
+            "SELECT NIK, NomorPlat FROM Peminjaman WHERE ID = ?", (rental_id,)
+        ).fetchone()
+
+        if returned:
+            car_free, customer_free = self._release(conn, nomor_plat, nik)
+        else:
+            car_free = customer_free = False
+            cursor = conn.execute(
+                "UPDATE Mobil SET StatusKetersediaan = 0 WHERE NomorPlat = ? AND StatusKetersediaan = 1",
+                (nomor_plat,)
+            )
+            if cursor.rowcount == 0:
+                raise PeminjamanConflict(f"Mobil {nomor_plat} has been rented out again")
+            cursor = conn.execute(
+                "UPDATE Pelanggan SET StatusPinjam = 1 WHERE NIK = ? AND StatusPinjam = 0", (nik,)
+            )
+            if cursor.rowcount == 0:
+                raise PeminjamanConflict(f"Pelanggan {nik} is already borrowing another car")
+
+        return nomor_plat, car_free, nik, not customer_free, new_date
+
+    def _pay(self, conn: sqlite3.Connection, rental_id: int, paid: bool, date: Optional[str]) -> Optional[str]:
+        """Write a payment (or its undoing) on an open transaction and return the new TanggalPembayaran."""
+        new_date = (date or datetime.now().strftime("%Y-%m-%d")) if paid else None
+        cursor = conn.execute(
+            "UPDATE Peminjaman SET StatusPembayaran = ?, TanggalPembayaran = ? "
+            "WHERE ID = ? AND StatusPembayaran = ?",
+            (int(paid), new_date, rental_id, int(not paid))
+        )
+        if cursor.rowcount == 0:
+            state = "paid" if paid else "unpaid"
+            raise PeminjamanConflict(f"Peminjaman {rental_id} is already {state} or no longer exists")
+        return new_date
+
+    def set_returned(self, rental_id: int, returned: bool, date: Optional[str] = None) -> Optional[str]:
+        """
+        Record a rental as returned, or undo a return entered by mistake.
+
+        A return frees the car and the customer unless they have another open rental; undoing
+        it takes them again, which fails if either was rented out in the meantime.
+
+        Args:
+            rental_id: Peminjaman ID
+            returned: True to return the car, False to reopen the rental
+            date: Return date (YYYY-MM-DD), today if None; ignored when reopening
+
+        Returns:
+            The rental's TanggalPengembalian after the change
+
+        Raises:
+            PeminjamanConflict: If the rental is already in that state or the car or customer was taken
+        """
+        with self.db.transaction("IMMEDIATE") as conn:
+            nomor_plat, car_free, nik, borrowing, new_date = self._return(conn, rental_id, returned, date)
+
+        self.db.mark_changed('Peminjaman', 'Mobil', 'Pelanggan', delta=0)
+        availability = AvailabilityIndex.get(self.db)
+        availability.set_mobil_available(nomor_plat, car_free)
+        availability.set_pelanggan_borrowing(nik, borrowing)
+        return new_date
+
+    def set_status(self, changes: Dict[int, Dict[str, bool]],
+                   date: Optional[str] = None) -> Tuple[Dict[int, Dict[str, Optional[str]]], Dict[int, str]]:
+        """
+        Write a batch of return and payment ticks in one transaction.
+
+        Each rental's changes are applied under their own savepoint, so a rental that was changed
+        elsewhere in the meantime is skipped and reported while the rest of the batch is kept.
+
+        Args:
+            changes: Peminjaman ID -> {status column: checked}, for StatusPengembalian and StatusPembayaran
+            date: Date (YYYY-MM-DD) recorded for returns and payments, today if None
+
+        Returns:
+            (dates, conflicts): the date columns written per rental ID, and the reason each
+            skipped rental could not be changed
+        """
+        dates: Dict[int, Dict[str, Optional[str]]] = {}
+        conflicts: Dict[int, str] = {}
+        cars: Dict[str, bool] = {}
+        customers: Dict[str, bool] = {}
+
+        with self.db.transaction("IMMEDIATE"):
+            for rental_id, statuses in changes.items():
+                written: Dict[str, Optional[str]] = {}
+                try:
+                    # A savepoint, so a conflict only undoes this rental's changes
+                    with self.db.transaction() as conn:
+                        if 'StatusPengembalian' in statuses:
+                            nomor_plat, car_free, nik, borrowing, written['TanggalPengembalian'] = self._return(
+                                conn, rental_id, statuses['StatusPengembalian'], date
+                            )
+                        if 'StatusPembayaran' in statuses:
+                            written['TanggalPembayaran'] = self._pay(
+                                conn, rental_id, statuses['StatusPembayaran'], date
+                            )
+                except PeminjamanConflict as e:
+                    conflicts[rental_id] = str(e)
+                    continue
+                dates[rental_id] = written
+                if 'StatusPengembalian' in statuses:
+                    cars[nomor_plat] = car_free
+                    customers[nik] = borrowing
+
+        if dates:
+            self.db.mark_changed('Peminjaman', delta=0)
+        if cars:
+            self.db.mark_changed('Mobil', 'Pelanggan', delta=0)
+            availability = AvailabilityIndex.get(self.db)
+            availability.set_mobil_flags(cars)
+            availability.set_pelanggan_flags(customers)
+        return dates, conflicts
+
+    def delete(self, rental_ids: Iterable[int]) -> int:
+        """
+        Delete rentals, freeing the cars and customers of open ones that have no other open rental.
+
+        Args:
+            rental_ids: Peminjaman IDs
+
+        Returns:
+            Number of rentals deleted
+        """
+        deleted = 0
+        cars: Dict[str, bool] = {}
+        customers: Dict[str, bool] = {}
+
+        with self.db.transaction("IMMEDIATE") as conn:
+            for rental_id in rental_ids:
+                row = conn.execute(
+                    "SELECT NIK, NomorPlat, StatusPengembalian FROM Peminjaman WHERE ID = ?", (rental_id,)
+                ).fetchone()
+                if row is None:
+                    continue
+                conn.execute("DELETE FROM Peminjaman WHERE ID = ?", (rental_id,))
+                deleted += 1
+
+                nik, nomor_plat, returned = row
+                if not returned:
+                    car_free, customer_free = self._release(conn, nomor_plat, nik)
+                    if car_free:
+                        cars[nomor_plat] = True
+                    if customer_free:
+                        customers[nik] = False
+
+        if deleted:
+            self.db.mark_changed('Peminjaman', delta=-deleted)
+        if cars or customers:
+            self.db.mark_changed('Mobil', 'Pelanggan', delta=0)
+            availability = AvailabilityIndex.get(self.db)
+            availability.set_mobil_flags(cars)
+            availability.set_pelanggan_flags(customers)
+        return deleted
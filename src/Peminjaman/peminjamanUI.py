@@ -1,14 +1,21 @@
 import sys
 import os
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
-                           QLabel, QTableWidget, QTableWidgetItem, QHeaderView, 
+                           QLabel, QTableView, QHeaderView, QAbstractItemView,
                            QFrame, QSizePolicy, QCheckBox, QToolButton, QDesktopWidget,QDialog,QDateEdit,QComboBox,QLineEdit,QMessageBox)
-from PyQt5.QtCore import Qt, QRect
+from PyQt5.QtCore import Qt, QRect, QTimer
 from PyQt5.QtGui import QFont, QColor, QIcon
 import sqlite3
 from .peminjamanController import PeminjamanController
+from .peminjamanService import PeminjamanConflict
 import datetime
 from pathlib import Path
+from Database.ConnectionManager import ConnectionManager
+from Database.QueryExecutor import QueryExecutor
+from Database.KeysetTableModel import KeysetTableModel
+from Component.TableDelegates import CheckBoxDelegate
+from Component.SearchableComboBox import SearchableComboBox
+from Database.Validators import validate_peminjaman_field
 
 class AddPeminjamanDialog(QDialog):
     """A dialog for adding new Peminjaman records with real-time validation and user feedback."""
@@ -151,7 +158,6 @@ class AddPeminjamanDialog(QDialog):
 
         fields = ['Nama', 'NIK', 'NomorPlat', 'Kontak', 'TanggalPeminjaman', 'TenggatPengembalian', 'TenggatPembayaran', 'BesarPembayaran']
         self.inputs = {}
-        self.pelanggan_mapping = {}
 
         for field in fields:
             field_container = QWidget()
@@ -175,18 +181,16 @@ class AddPeminjamanDialog(QDialog):
                 input_field.setCalendarPopup(True)
                 input_field.setDate(QDateEdit.date(input_field))
             elif field == 'NIK':
-                input_field = QComboBox()
-                pelanggan_data = self.controller.get_available_pelanggan()
-                for nik, nama, kontak in pelanggan_data:
-                    self.pelanggan_mapping[nik] = {'Nama': nama, 'Kontak': kontak}  # Store both Nama and Kontak
-                    input_field.addItem(nik)
-                input_field.currentIndexChanged.connect(self.update_nama_and_kontak_fields)  # Connect signal
+                # Free customers come from the in-memory availability index; type a NIK or name to search
+                input_field = SearchableComboBox(lambda row: f"{row[0]} - {row[1]}", "Type NIK or name")
+                input_field.set_rows(self.controller.get_available_pelanggan())
+                input_field.currentIndexChanged.connect(self.update_nama_and_kontak_fields)
+                input_field.editTextChanged.connect(self.update_nama_and_kontak_fields)
             elif field == 'NomorPlat':
-                input_field = QComboBox()
-                mobil_data = self.controller.get_available_mobil()
-                for nomor_plat, model in mobil_data:
-                    input_field.addItem(nomor_plat)
-                input_field.currentIndexChanged.connect(self.validate_nomor_plat_field)  # Connect signal
+                input_field = SearchableComboBox(lambda row: f"{row[0]} - {row[1]}", "Type plate or model")
+                input_field.set_rows(self.controller.get_available_mobil())
+                input_field.currentIndexChanged.connect(self.validate_nomor_plat_field)
+                input_field.editTextChanged.connect(self.validate_nomor_plat_field)
             else:
                 input_field = QLineEdit()
                 input_field.setPlaceholderText(placeholders[field])
@@ -202,16 +206,17 @@ class AddPeminjamanDialog(QDialog):
     
     def validate_nomor_plat_field(self):
         """Validate the NomorPlat field."""
-        self.validation_states['NomorPlat'] = bool(self.inputs['NomorPlat'].currentText())
+        self.validation_states['NomorPlat'] = self.inputs['NomorPlat'].current_row() is not None
         self.update_confirm_button()
 
 
     def update_nama_and_kontak_fields(self):
         """Update the Nama and Kontak fields based on the selected NIK."""
-        nik = self.inputs['NIK'].currentText()
-        if nik in self.pelanggan_mapping:
-            self.inputs['Nama'].setText(self.pelanggan_mapping[nik]['Nama'])
-            self.inputs['Kontak'].setText(self.pelanggan_mapping[nik]['Kontak'])
+        row = self.inputs['NIK'].current_row()
+        if row is not None:
+            nik, nama, kontak = row
+            self.inputs['Nama'].setText(nama)
+            self.inputs['Kontak'].setText(kontak)
             self.validation_states['NIK'] = True
             self.validation_states['Nama'] = True
             self.validation_states['Kontak'] = True
@@ -270,8 +275,8 @@ class AddPeminjamanDialog(QDialog):
             # Extract and validate data
             data = {
                 'Nama': self.inputs['Nama'].text(),
-                'NIK': self.inputs['NIK'].currentText(),
-                'Nomor Plat': self.inputs['NomorPlat'].currentText(),
+                'NIK': self.inputs['NIK'].current_key(),
+                'Nomor Plat': self.inputs['NomorPlat'].current_key(),
                 'Kontak': self.inputs['Kontak'].text(),
                 'Tanggal Peminjaman': self.inputs['TanggalPeminjaman'].date().toString("yyyy-MM-dd"),
                 'Tenggat Pengembalian': self.inputs['TenggatPengembalian'].date().toString("yyyy-MM-dd"),
@@ -292,33 +297,54 @@ class AddPeminjamanDialog(QDialog):
         """Retrieve the form data as a dictionary."""
         return {
             'Nama': self.inputs['Nama'].text(),
-            'NIK': self.inputs['NIK'].currentText(),
-            'NomorPlat': self.inputs['NomorPlat'].currentText(),
+            'NIK': self.inputs['NIK'].current_key(),
+            'NomorPlat': self.inputs['NomorPlat'].current_key(),
             'Kontak': self.inputs['Kontak'].text(),
             'TanggalPeminjaman': self.inputs['TanggalPeminjaman'].date().toString("yyyy-MM-dd"),
             'TenggatPengembalian': self.inputs['TenggatPengembalian'].date().toString("yyyy-MM-dd"),
             'TenggatPembayaran': self.inputs['TenggatPembayaran'].date().toString("yyyy-MM-dd"),
-            'BesarPembayaran': int(self.inputs['BesarPembayaran'].text()),
-            'StatusPengembalian': 1 if self.inputs['StatusPengembalian'].isChecked() else 0,
-            'StatusPembayaran': 1 if self.inputs['StatusPembayaran'].isChecked() else 0
+            'BesarPembayaran': int(self.inputs['BesarPembayaran'].text())
         }
 
 class PeminjamanUI(QWidget):
+    # Status columns and the date column each one stamps
+    STATUS_DATES = {'StatusPengembalian': 'TanggalPengembalian', 'StatusPembayaran': 'TanggalPembayaran'}
+
+    # Quiet time after the last status tick before the pending ticks are written
+    STATUS_DELAY_MS = 1500
+
+    # Fields typed into the add dialog; NIK, NomorPlat, Nama and Kontak come from existing rows
+    ENTERED_FIELDS = ['TanggalPeminjaman', 'TenggatPengembalian', 'TenggatPembayaran', 'BesarPembayaran']
+
     def __init__(self, parent=None):
         super().__init__(parent)
         
         self.setup_window_geometry()
         
         self.db_path = Path(__file__).parent.parent / "Database/CarGoOwner.db"
+        self.db = ConnectionManager.get(self.db_path)
         self.schema_path = Path(__file__).parent.parent / "schema.sql"
         self.controller = PeminjamanController()
+        self.loader = QueryExecutor(self)
+        # Counts the rentals for the page buttons, alongside the page loads
+        self.counter = QueryExecutor(self)
         self.current_page = 1
         self.items_per_page = 20
+        self.total_pages = 0  # Known once refresh_pagination() has counted the rows
         self.pagination_buttons = []  
         self.first_button = None
         self.prev_button = None
         self.next_button = None
         self.last_button = None
+
+        # Status ticks not yet written: Peminjaman ID -> {status column: checked}
+        self.pending_status = {}
+        # (ID, status column) -> (status, date) as loaded, to drop ticks that were undone
+        self.status_original = {}
+        self.status_timer = QTimer(self)
+        self.status_timer.setSingleShot(True)
+        self.status_timer.setInterval(self.STATUS_DELAY_MS)
+        self.status_timer.timeout.connect(self.flush_status_changes)
         
         # self.init_database()
         
@@ -351,65 +377,95 @@ class PeminjamanUI(QWidget):
         bottom_layout = self.setup_bottom_controls()
         layout.addLayout(bottom_layout)
 
-    def handle_status_change(self, row, col, state):
-        """Handle checkbox state changes for StatusPengembalian and StatusPembayaran."""
-        try:
-            # Determine the column name and corresponding date column
-            if col == 9:  # StatusPengembalian
-                status_column = "StatusPengembalian"
-                date_column = "TanggalPengembalian"
-            elif col == 10:  # StatusPembayaran
-                status_column = "StatusPembayaran"
-                date_column = "TanggalPembayaran"
-            else:
-                return
+    def handle_status_change(self, row, status_column, checked):
+        """Queue a StatusPengembalian or StatusPembayaran tick and show it right away."""
+        date_column = self.STATUS_DATES.get(status_column)
+        if date_column is None:
+            return
 
-            # Get the primary key (e.g., NIK)
-            nik_item = self.table.item(row, 1)
-            if not nik_item:
-                QMessageBox.warning(self, "Error", "Could not determine the record to update.")
-                return
-            nik = nik_item.text()
-
-            # Determine the new status and date
-            new_status = 1 if state == Qt.Checked else 0
-            new_date = (
-                datetime.datetime.now().strftime("%Y-%m-%d") if new_status == 1 else None
-            )
-
-            # Update the database
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute(
-                f"UPDATE Peminjaman SET {status_column} = ?, {date_column} = ? WHERE NIK = ?",
-                (new_status, new_date, nik),
-            )
-            conn.commit()
-
-            # Update the UI
-            date_item = QTableWidgetItem(new_date if new_date else "")
-            date_item.setTextAlignment(Qt.AlignCenter)
-            if col == 9:
-                self.table.setItem(row, 5, date_item)  # TanggalPengembalian is column 5
-            elif col == 10:
-                self.table.setItem(row, 6, date_item)  # TanggalPembayaran is column 6
-
-            print(f"Updated {status_column} to {new_status} and {date_column} to {new_date} for NIK {nik}.")
+        rental_id = self.table_model.key(row)
+        change = (rental_id, status_column)
+        if change not in self.status_original:
+            self.status_original[change] = (not checked, self.table_model.row(row)[date_column])
+
+        original_status, original_date = self.status_original[change]
+        if checked == original_status:
+            # Ticked back to the loaded state, so there is nothing to write
+            del self.status_original[change]
+            statuses = self.pending_status.get(rental_id, {})
+            statuses.pop(status_column, None)
+            if not statuses:
+                self.pending_status.pop(rental_id, None)
+            self.table_model.set_value(row, date_column, original_date)
+        else:
+            self.pending_status.setdefault(rental_id, {})[status_column] = checked
+            today = datetime.datetime.now().strftime("%Y-%m-%d")
+            self.table_model.set_value(row, date_column, today if checked else None)
+
+        self.status_timer.start()
+
+    def flush_status_changes(self):
+        """Write the pending status ticks in one transaction."""
+        self.status_timer.stop()
+        if not self.pending_status:
+            return
+
+        changes, self.pending_status, self.status_original = self.pending_status, {}, {}
+        try:
+            # Returns also free the car and the customer, so they go through the rental service
+            dates, conflicts = self.controller.service.set_status(changes)
         except sqlite3.Error as e:
             QMessageBox.critical(self, "Database Error", f"An error occurred: {e}")
-        finally:
-            if conn:
-                conn.close()
+            self.load_data()
+            return
+
+        rows = {self.table_model.key(number): number for number in range(self.table_model.rowCount())}
+        for rental_id, written in dates.items():
+            if rental_id in rows:
+                for date_column, date in written.items():
+                    self.table_model.set_value(rows[rental_id], date_column, date)
+        print(f"Updated the status of {len(dates)} Peminjaman.")
+
+        if conflicts:
+            QMessageBox.warning(self, "Peminjaman Changed", "\n".join(conflicts.values()))
+            self.load_data()
+
+    def mark_selected_returned(self):
+        """Tick StatusPengembalian of every selected open rental and write them together."""
+        column = self.controller.COLUMNS.index('StatusPengembalian')
+        for row in self.get_selected_rows():
+            if not self.table_model.row(row)['StatusPengembalian']:
+                self.table_model.setData(self.table_model.index(row, column), Qt.Checked, Qt.CheckStateRole)
+        self.flush_status_changes()
+
+    def hideEvent(self, event):
+        # Leaving the screen writes what is still pending
+        self.flush_status_changes()
+        super().hideEvent(event)
 
     def setup_table(self):
-        self.table = QTableWidget()
-        self.table.setColumnCount(11)
-        self.table.setHorizontalHeaderLabels([
-            "Nama", "NIK", "Nomor Plat", "Kontak", 
-            "Tanggal\nPeminjaman", "Tanggal\nPengembalian", 
-            "Tanggal\nPembayaran", "Tenggat\nPengembalian", 
-            "Besar\nPembayaran", "Status\nPengembalian", "Status\nPembayaran"
-        ])
+        self.table = QTableView()
+        self.table_model = KeysetTableModel(
+            self.controller.COLUMNS,
+            [
+                "Nama", "NIK", "Nomor Plat", "Kontak", 
+                "Tanggal\nPeminjaman", "Tanggal\nPengembalian", 
+                "Tanggal\nPembayaran", "Tenggat\nPengembalian", 
+                "Besar\nPembayaran", "Status\nPengembalian", "Status\nPembayaran"
+            ],
+            self.loader,
+            checkable=['StatusPengembalian', 'StatusPembayaran'],
+            alignment=Qt.AlignCenter,
+            parent=self
+        )
+        self.table.setModel(self.table_model)
+        self.table_model.checkToggled.connect(self.handle_status_change)
+        
+        # Status checkboxes are painted by a delegate instead of a widget per row
+        self.checkbox_delegate = CheckBoxDelegate(self.table)
+        self.table.setItemDelegateForColumn(9, self.checkbox_delegate)
+        self.table.setItemDelegateForColumn(10, self.checkbox_delegate)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
         
         # Define column percentages (total should be 100)
         column_percentages = {
@@ -433,7 +489,7 @@ class PeminjamanUI(QWidget):
         
         # Apply comprehensive table styling
         self.table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 background-color: white;
                 border: none;
                 font-family: 'Poly', sans-serif;
@@ -448,7 +504,7 @@ class PeminjamanUI(QWidget):
                 text-align: center;
                 height: 36px;
             }
-            QTableWidget::item {
+            QTableView::item {
                 border-bottom: 1px solid #F3F4F6;
                 font-family: 'Poly', sans-serif;
                 padding: 8px;
@@ -460,6 +516,7 @@ class PeminjamanUI(QWidget):
         
         self.table.setShowGrid(False)
         self.table.verticalHeader().setVisible(False)
+        self.table.verticalHeader().setDefaultSectionSize(72)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Fixed)
 
 
@@ -483,10 +540,15 @@ class PeminjamanUI(QWidget):
                 background-color: #e8e8e8;
             }
         """)
-        select_all_btn.clicked.connect(self.toggle_select_all)
+        select_all_btn.clicked.connect(lambda: self.toggle_select_all())
+
+        # Returns a batch of selected rentals in one write
+        mark_returned_btn = QPushButton("Mark Selected Returned")
+        mark_returned_btn.setStyleSheet(select_all_btn.styleSheet())
+        mark_returned_btn.clicked.connect(self.mark_selected_returned)
         
         # Set up pagination
-        pagination_container = self.setup_pagination()
+        self.pagination_container = self.setup_pagination()
         
         # Create action buttons
         add_button = QPushButton("+")
@@ -507,8 +569,9 @@ class PeminjamanUI(QWidget):
         
         # Assemble the bottom layout
         bottom_layout.addWidget(select_all_btn)
+        bottom_layout.addWidget(mark_returned_btn)
         bottom_layout.addStretch()
-        bottom_layout.addWidget(pagination_container)
+        bottom_layout.addWidget(self.pagination_container)
         bottom_layout.addStretch()
         bottom_layout.addWidget(add_button)
         bottom_layout.addSpacing(10)
@@ -523,14 +586,6 @@ class PeminjamanUI(QWidget):
         pagination_layout.setContentsMargins(0, 0, 0, 0)
         pagination_layout.setSpacing(8)
         
-        # Calculate total pages
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('SELECT COUNT(*) FROM Peminjaman')
-        total_records = cursor.fetchone()[0]
-        self.total_pages = (total_records + self.items_per_page - 1) // self.items_per_page
-        conn.close()
-        
         # Style for all pagination buttons
         button_style = """
             QPushButton {
@@ -629,21 +684,19 @@ class PeminjamanUI(QWidget):
         if 1 <= page <= self.total_pages and page != self.current_page:
             self.current_page = page
             self.load_data()
-            # Recreate pagination with updated current page
-            bottom_layout = self.findChild(QHBoxLayout)
-            if bottom_layout:
-                # Find and remove the old pagination container
-                for i in range(bottom_layout.count()):
-                    item = bottom_layout.itemAt(i)
-                    if item and isinstance(item.widget(), QWidget):
-                        if isinstance(item.widget().layout(), QHBoxLayout):
-                            item.widget().deleteLater()
-                            break
-                
-                # Create and add new pagination container
-                new_pagination = self.setup_pagination()
-                # Add it at the same position (index 2)
-                bottom_layout.insertWidget(2, new_pagination)
+
+    def refresh_pagination(self):
+        """Count the rentals off the GUI thread, then rebuild the page buttons."""
+        self.counter.submit(self.controller.paginate(self.items_per_page).count, on_result=self.show_pagination)
+
+    def show_pagination(self, total_records):
+        """Rebuild the page buttons for a record count."""
+        self.total_pages = (total_records + self.items_per_page - 1) // self.items_per_page
+
+        old_pagination = self.pagination_container
+        self.pagination_container = self.setup_pagination()
+        self.layout().replaceWidget(old_pagination, self.pagination_container)
+        old_pagination.deleteLater()
 
     def previous_page(self):
         """Navigate to the previous page."""
@@ -655,154 +708,34 @@ class PeminjamanUI(QWidget):
         if self.current_page < self.total_pages:
             self.go_to_page(self.current_page + 1)
 
-    def update_status_in_db(self, row, col, state):
-        """Update the StatusPengembalian or StatusPembayaran column in the database."""
-        try:
-            # Determine the column name based on `col`
-            column_name = "StatusPengembalian" if col == 9 else "StatusPembayaran"
-
-            # Get the primary key or unique identifier (e.g., NIK or row ID)
-            nik_item = self.table.item(row, 1)  # Assuming column 1 contains the NIK
-            if not nik_item:
-                QMessageBox.warning(self, "Error", "Could not determine the record to update.")
-                return
-            nik = nik_item.text()
-
-            # Update the database
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute(f"UPDATE Peminjaman SET {column_name} = ? WHERE NIK = ?", (state, nik))
-            conn.commit()
-
-            # Log success
-            print(f"Updated {column_name} for NIK {nik} to {state}.")
-        except sqlite3.Error as e:
-            QMessageBox.critical(self, "Database Error", f"An error occurred while updating the database: {e}")
-        finally:
-            if conn:
-                conn.close()
-
     def load_data(self):
-        # Fetch data from controller
-        offset = (self.current_page - 1) * self.items_per_page
-        records = self.controller.fetch_peminjaman(offset=offset, limit=self.items_per_page)
-        
-        if not records:
-            print("No records found.")
-            self.table.setRowCount(0)  # Clear table if no data
-            return
-
-
-        # Populate the table
-        self.table.setRowCount(len(records))
-        for row, record in enumerate(records):
-            for col, value in enumerate(record):
-                if col == 9 or col == 10:
-                    checkbox = QCheckBox()
-                    checkbox.setChecked(bool(value))  # Convert 0/1 to False/True
-                    checkbox.stateChanged.connect(lambda state, r=row, c=col: self.handle_status_change(r, c, state))
-                    container = QWidget()
-                    layout = QHBoxLayout(container)
-                    layout.setContentsMargins(0, 0, 0, 0)
-                    layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
-                    layout.addWidget(checkbox)
-
-                    self.table.setCellWidget(row, col, container)
-                
-                else:
-                    item = QTableWidgetItem(str(value) if value is not None else "")
-                    item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                    self.table.setItem(row, col, item)
-
-    def create_status_cell(self, row, col, is_pinjam):
-        """Create a styled status cell indicating whether a customer has borrowed items."""
-        status_text = "Pinjam" if is_pinjam else "Tidak Pinjam"
-        status_btn = QPushButton(status_text)
-        status_btn.setStyleSheet(f"""
-            QPushButton {{
-                background-color: {'#D1FAE5' if is_pinjam else '#FEE2E2'};
-                color: {'#10B981' if is_pinjam else '#EF4444'};
-                border: 1px solid {'#10B981' if is_pinjam else '#EF4444'};
-                border-radius: 10px;
-                padding-right: 12px;
-                padding-left: 12px;
-                min-height: 30px;
-                min-width: 100px;
-                font-family: 'Poly', sans-serif;
-                font-weight: 500;
-                font-size: 14px;
-                text-align: center;
-            }}
-        """)
-        
-        container = QWidget()
-        layout = QHBoxLayout(container)
-        layout.setContentsMargins(16, 16, 16, 16)
-        layout.addWidget(status_btn, alignment=Qt.AlignCenter)
-        self.table.setCellWidget(row, col, container)
-
-    def create_action_cell(self, row):
-        """Create a styled action cell with an edit button for each customer row."""
-        action_btn = QPushButton("✎")
-        action_btn.setStyleSheet("""
-            QPushButton {
-                border: none;
-                color: #6B7280;
-                font-size: 16px;
-                font-family: 'Poly', sans-serif;
-            }
-            QPushButton:hover {
-                color: #374151;
-            }
-        """)
-        
-        container = QWidget()
-        layout = QHBoxLayout(container)
-        layout.setContentsMargins(16, 16, 16, 16)
-        layout.addWidget(action_btn, alignment=Qt.AlignCenter)
-        self.table.setCellWidget(row, 7, container)
-        
-        # Connect the button to edit handler
-        action_btn.clicked.connect(lambda: self.handle_edit(row))
+        # Pending ticks are written first so the reloaded rows include them
+        self.flush_status_changes()
+        self.refresh_pagination()
+        # Show the current page; further rows are fetched by the model while scrolling
+        self.table_model.reset(self.controller.paginate(self.items_per_page), self.current_page)
 
     def handle_edit(self, row):
         """Handle the edit action when a customer's edit button is clicked."""
         # Get the NIK of the selected customer
-        nik_item = self.table.item(row, 1)
-        if nik_item:
-            nik = nik_item.text()
-            print(f"Editing customer with NIK: {nik}")
-            # TODO: Implement edit dialog functionality
+        nik = self.table_model.row(row)['NIK']
+        print(f"Editing customer with NIK: {nik}")
+        # TODO: Implement edit dialog functionality
 
     def toggle_select_all(self, checked=None):
-        """Toggle selection state of all checkboxes in the table."""
-        # If checked is None, determine state based on first checkbox
+        """Toggle selection state of all loaded rows in the table."""
+        # If checked is None, select everything unless every row is already selected
         if checked is None:
-            first_checkbox = self.get_checkbox(0)
-            if first_checkbox:
-                checked = not first_checkbox.isChecked()
+            checked = len(self.get_selected_rows()) < self.table_model.rowCount()
         
-        # Update all checkboxes
-        for row in range(self.table.rowCount()):
-            checkbox = self.get_checkbox(row)
-            if checkbox:
-                checkbox.setChecked(checked)
-
-    def get_checkbox(self, row):
-        """Helper method to get checkbox widget from a specific row."""
-        checkbox_container = self.table.cellWidget(row, 0)
-        if checkbox_container:
-            return checkbox_container.layout().itemAt(0).widget()
-        return None
+        if checked:
+            self.table.selectAll()
+        else:
+            self.table.clearSelection()
 
     def get_selected_rows(self):
         """Get a list of indices for all selected rows."""
-        selected_rows = []
-        for row in range(self.table.rowCount()):
-            checkbox = self.get_checkbox(row)
-            if checkbox and checkbox.isChecked():
-                selected_rows.append(row)
-        return selected_rows
+        return sorted(index.row() for index in self.table.selectionModel().selectedRows())
 
     def handle_add_peminjaman(self):
         """Handle the addition of a new peminjaman record."""
@@ -818,40 +751,23 @@ class PeminjamanUI(QWidget):
                 print("Validation failed. Missing fields:", missing_fields)
                 return
 
+            for field in self.ENTERED_FIELDS:
+                is_valid, message = validate_peminjaman_field(field, str(data[field]))
+                if not is_valid:
+                    QMessageBox.warning(self, "Validation Error", message)
+                    return
+
 
             try:
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
-
-                cursor.execute('''
-                    INSERT INTO Peminjaman (
-                        Nama, NIK, NomorPlat, Kontak, 
-                        TanggalPeminjaman, TenggatPengembalian, 
-                        TenggatPembayaran, BesarPembayaran, 
-                        StatusPengembalian, StatusPembayaran
-                    )
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    data['Nama'],
-                    data['NIK'],
-                    data['NomorPlat'],
-                    data['Kontak'],
-                    data['TanggalPeminjaman'],
-                    data['TenggatPengembalian'],
-                    data['TenggatPembayaran'],
-                    data['BesarPembayaran'],
-                    data['StatusPengembalian'],
-                    data['StatusPembayaran']
-                ))
-
-                conn.commit()
+                # Inserts the rental and takes the car and the customer in one transaction
+                self.controller.service.checkout(data)
+
                 self.load_data()
                 QMessageBox.information(self, "Success", "Peminjaman added successfully!")
 
+            except PeminjamanConflict as e:
+                QMessageBox.warning(self, "Not Available", f"{e}. Please choose again.")
             except sqlite3.IntegrityError as e:
                 QMessageBox.warning(self, "Error", f"Database Integrity Error: {e}")
             except sqlite3.Error as e:
                 QMessageBox.critical(self, "Database Error", f"An error occurred: {e}")
-            finally:
-                if conn:
-                    conn.close()